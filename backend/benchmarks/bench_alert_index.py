@@ -0,0 +1,95 @@
+"""Benchmark AlertIndex trigger matching against the previous linear scan.
+
+Run from backend/:  python -m benchmarks.bench_alert_index --alerts 1000000
+"""
+import argparse
+import random
+import time
+from src.services.AlertIndex import AlertIndex
+
+def generate_alerts(count: int, symbols: int, seed: int):
+    """Generate alerts spread across symbols with thresholds around a base price"""
+    rng = random.Random(seed)
+    names = [f'S{i:05d}' for i in range(symbols)]
+    base = {name: rng.uniform(10, 500) for name in names}
+    alerts = []
+    for alert_id in range(1, count + 1):
+        symbol = names[alert_id % symbols]
+        alerts.append({
+            'id': alert_id,
+            'symbol': symbol,
+            'price_threshold': round(base[symbol] * rng.uniform(0.8, 1.2), 2),
+            'condition': 'above' if rng.random() < 0.5 else 'below',
+            'email': f'user{alert_id % 10000}@example.com'
+        })
+    return names, base, alerts
+
+def linear_match(alerts, price):
+    """Previous behaviour: compare every alert for the symbol"""
+    return [
+        alert for alert in alerts
+        if (alert['condition'] == 'above' and price > alert['price_threshold']) or
+           (alert['condition'] == 'below' and price < alert['price_threshold'])
+    ]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alerts', type=int, default=1_000_000)
+    parser.add_argument('--symbols', type=int, default=2_000)
+    parser.add_argument('--ticks', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    names, base, alerts = generate_alerts(args.alerts, args.symbols, args.seed)
+    rng = random.Random(args.seed + 1)
+
+    index = AlertIndex()
+    start = time.perf_counter()
+    index.load(alerts)
+    build = time.perf_counter() - start
+    print(f'build: {len(index)} alerts in {build:.2f}s ({len(index) / build:,.0f} alerts/s)')
+
+    # Prime every symbol with its base price, then random-walk by up to +/-0.5% per tick
+    prices = dict(base)
+    for symbol in names:
+        index.crossed(symbol, prices[symbol])
+    ticks = []
+    for _ in range(args.ticks):
+        symbol = rng.choice(names)
+        prices[symbol] *= rng.uniform(0.995, 1.005)
+        ticks.append((symbol, prices[symbol]))
+
+    latencies = []
+    matched = 0
+    for symbol, price in ticks:
+        start = time.perf_counter()
+        matched += len(index.crossed(symbol, price))
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    print(f'crossed: {args.ticks} ticks, {matched} triggers, {args.ticks / total:,.0f} ticks/s, '
+          f'p50 {percentile(latencies, 50) * 1e6:.1f}us p99 {percentile(latencies, 99) * 1e6:.1f}us')
+
+    by_symbol = {}
+    for alert in alerts:
+        by_symbol.setdefault(alert['symbol'], []).append(alert)
+    sample = ticks[:min(len(ticks), 1000)]
+    start = time.perf_counter()
+    for symbol, price in sample:
+        linear_match(by_symbol[symbol], price)
+    linear = (time.perf_counter() - start) / len(sample)
+    print(f'linear scan baseline: {linear * 1e6:.1f}us per tick')
+
+    start = time.perf_counter()
+    for alert in alerts[:10_000]:
+        index.remove(alert['id'])
+    for alert in alerts[:10_000]:
+        index.add(alert)
+    churn = time.perf_counter() - start
+    print(f'churn: 20000 incremental updates in {churn:.2f}s ({20_000 / churn:,.0f} ops/s)')
+
+if __name__ == '__main__':
+    main()
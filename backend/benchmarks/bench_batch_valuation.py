@@ -0,0 +1,83 @@
+"""Benchmark batch portfolio revaluation against per-portfolio Python valuation.
+
+Run from backend/:  python -m benchmarks.bench_batch_valuation --portfolios 100000
+"""
+import argparse
+import time
+import numpy as np
+from src.services.BatchValuation import build_positions, revalue
+
+def generate_holdings(portfolios: int, symbols: int, mean_holdings: int, seed: int):
+    """Holdings with a popularity skew across symbols and some repeated lots"""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(mean_holdings, portfolios) + 1
+    portfolio_ids = np.repeat(np.arange(1, portfolios + 1), counts)
+    popularity = 1 / np.arange(1, symbols + 1)
+    names = np.array([f'S{i:05d}' for i in range(symbols)], dtype=object)
+    symbol_index = rng.choice(symbols, size=len(portfolio_ids), p=popularity / popularity.sum())
+    quantities = rng.integers(1, 500, size=len(portfolio_ids)).astype(float)
+    base = rng.uniform(5, 500, symbols)
+    costs = quantities * base[symbol_index] * rng.uniform(0.7, 1.3, len(portfolio_ids))
+    return portfolio_ids, names[symbol_index], quantities, costs, names, base
+
+def python_valuation(rows, prices):
+    """Previous shape of the work: walk each portfolio's holdings in Python"""
+    by_portfolio = {}
+    for portfolio_id, symbol, quantity, cost in rows:
+        by_portfolio.setdefault(portfolio_id, []).append((symbol, quantity, cost))
+
+    results = {}
+    for portfolio_id, holdings in by_portfolio.items():
+        total_value = 0
+        total_cost = 0
+        for symbol, quantity, cost in holdings:
+            total_value += quantity * prices[symbol]
+            total_cost += cost
+        allocations = {symbol: quantity * prices[symbol] / total_value * 100 for symbol, quantity, _ in holdings}
+        results[portfolio_id] = (total_value, total_cost, total_value - total_cost, allocations)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--portfolios', type=int, default=100_000)
+    parser.add_argument('--symbols', type=int, default=5_000)
+    parser.add_argument('--holdings', type=int, default=12, help='mean holdings per portfolio')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    portfolio_ids, symbols, quantities, costs, names, base = generate_holdings(
+        args.portfolios, args.symbols, args.holdings, args.seed
+    )
+    print(f'{args.portfolios:,} portfolios, {len(portfolio_ids):,} holdings, {args.symbols:,} symbols')
+
+    start = time.perf_counter()
+    positions = build_positions(portfolio_ids, symbols, quantities, costs)
+    build = time.perf_counter() - start
+    print(f'build positions: {build * 1000:.1f}ms ({len(positions.row):,} positions)')
+
+    # Prices come back from Redis in column order
+    price_by_name = dict(zip(names.tolist(), base.tolist()))
+    prices = np.array([price_by_name[name] for name in positions.symbols.tolist()])
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = revalue(positions, prices)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f'revalue: best {best * 1000:.1f}ms of {args.repeat} ({args.portfolios / best:,.0f} portfolios/s)')
+
+    rows = list(zip(portfolio_ids.tolist(), symbols.tolist(), quantities.tolist(), costs.tolist()))
+    start = time.perf_counter()
+    baseline = python_valuation(rows, price_by_name)
+    python_time = time.perf_counter() - start
+    print(f'python loop baseline: {python_time * 1000:.1f}ms ({python_time / best:.0f}x slower than revalue)')
+
+    # Sanity check: both approaches agree on portfolio values
+    sample = positions.portfolios[:1000].tolist()
+    expected = np.array([baseline[portfolio_id][0] for portfolio_id in sample])
+    assert np.allclose(result['value'][:1000], expected), 'batch and per-portfolio values disagree'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Micro-benchmarks for the quote cache, portfolio valuation, VaR, sector concentration, alert matching
+and chart downsampling.
+
+Runs against in-memory stand-ins (fakeredis, a generated price history
+table, and a fake provider transport or the replay provider) so results
+reflect our code rather than the network. Results are written as JSON; pass a previous run as
+--baseline to flag regressions (the exit status is 1 if any case's median
+slowed down by more than --threshold).
+
+Run from backend/:
+    python -m benchmarks.bench_services --output bench.json
+    python -m benchmarks.bench_services --sizes 10,100 --history 60,252 --baseline bench.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+from benchmarks.standins import (
+    use_fake_redis, use_redis_url, symbol_names, base_prices, install_symbol_index,
+    InMemoryPriceHistory, FakeProvider
+)
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(',') if size.strip()]
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        'medianMs': round(ordered[len(ordered) // 2] * 1000, 4),
+        'minMs': round(ordered[0] * 1000, 4),
+        'p95Ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        'meanMs': round(sum(ordered) / len(ordered) * 1000, 4),
+        'samples': len(ordered)
+    }
+
+async def measure(func: Callable[[], Awaitable], repeat: int, number: int = 1,
+                  setup: Callable[[], None] = None) -> Dict:
+    """Per-call timings over `repeat` samples of `number` calls each; setup runs untimed before every call"""
+    if setup:
+        setup()
+    await func()
+    samples = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            await func()
+            elapsed += time.perf_counter() - start
+        samples.append(elapsed / number)
+    return summarize(samples)
+
+def make_holdings(symbols: List[str], prices: Dict[str, float], seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    return [{
+        'id': i + 1,
+        'portfolio_id': 1,
+        'symbol': symbol,
+        'quantity': rng.randint(1, 500),
+        'purchase_price': round(prices[symbol] * rng.uniform(0.7, 1.3), 2)
+    } for i, symbol in enumerate(symbols)]
+
+def make_alerts(count: int, symbols: List[str], prices: Dict[str, float], seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    return [{
+        'id': alert_id,
+        'symbol': symbols[alert_id % len(symbols)],
+        'price_threshold': round(prices[symbols[alert_id % len(symbols)]] * rng.uniform(0.8, 1.2), 2),
+        'condition': 'above' if rng.random() < 0.5 else 'below',
+        'email': f'user{alert_id % 10000}@example.com'
+    } for alert_id in range(1, count + 1)]
+
+async def run_suite(args) -> Dict[str, Dict]:
+    sizes = parse_sizes(args.sizes)
+    symbols = symbol_names(max(sizes))
+    prices = base_prices(symbols, args.seed)
+
+    # Imported here: service singletons connect to Redis on import
+    from src.services.StockService import get_stock_service
+    from src.services.RiskService import get_risk_service
+    from src.services.AlertIndex import AlertIndex
+    from src.config.redis import get_redis
+    from src.providers.AlphaVantageProvider import AlphaVantageProvider
+    from src.providers.ReplayProvider import ReplayProvider
+
+    redis = get_redis()
+    stock_service = get_stock_service()
+    risk_service = get_risk_service()
+    if args.provider == 'replay':
+        # Generated walks stepped once per fetch: deterministic and network-free end to end
+        stock_service.provider = ReplayProvider()
+        stock_service.provider.speed = 0
+        stock_service.provider.latency = args.provider_latency_ms / 1000
+    else:
+        # The Alpha Vantage client, parsing responses from a fake HTTP transport
+        stock_service.provider = AlphaVantageProvider(FakeProvider(prices, args.provider_latency_ms).transport())
+    install_symbol_index(symbols)
+
+    def drop_quotes(names: List[str]):
+        redis.delete(*[f'stock:{name}' for name in names])
+
+    results = {}
+
+    def record(name: str, stats: Dict):
+        results[name] = stats
+        print(f"{name:<40} median {stats['medianMs']:>10.4f}ms  p95 {stats['p95Ms']:>10.4f}ms")
+
+    # Warm the quote cache through the provider path
+    for symbol in symbols:
+        await stock_service.get_stock_price(symbol, refresh=True)
+
+    record('quote/hit', await measure(lambda: stock_service.get_stock_price(symbols[0]), args.repeat, 200))
+    record('quote/miss', await measure(
+        lambda: stock_service.get_stock_price(symbols[0], refresh=True), args.repeat, 20
+    ))
+
+    for size in sizes:
+        holdings = make_holdings(symbols[:size], prices, args.seed)
+        names = symbols[:size]
+        record(f'valuation/warm/holdings={size}', await measure(
+            lambda: risk_service.calculate_portfolio_value(None, holdings), args.repeat
+        ))
+        record(f'valuation/cold/holdings={size}', await measure(
+            lambda: risk_service.calculate_portfolio_value(None, holdings), args.repeat,
+            setup=lambda: drop_quotes(names)
+        ))
+        portfolio_value = await risk_service.calculate_portfolio_value(None, holdings)
+        record(f'sectors/holdings={size}', await measure(
+            lambda: risk_service.analyze_sector_concentration(None, holdings, portfolio_value), args.repeat
+        ))
+
+    for length in parse_sizes(args.history):
+        InMemoryPriceHistory(prices, length, args.seed).install()
+        for size in sizes:
+            holdings = make_holdings(symbols[:size], prices, args.seed)
+            # VaR caches its result; drop it so every call computes
+            record(f'var/holdings={size}/history={length}', await measure(
+                lambda: risk_service.calculate_value_at_risk(None, holdings), args.repeat,
+                setup=lambda: redis.delete('portfolio:var:0.95')
+            ))
+
+    rng = random.Random(args.seed)
+    for count in parse_sizes(args.alerts):
+        index = AlertIndex()
+        index.load(make_alerts(count, symbols, prices, args.seed))
+        walk = dict(prices)
+        for symbol in symbols:
+            index.crossed(symbol, walk[symbol])
+        ticks = []
+        for _ in range(10_000):
+            symbol = rng.choice(symbols)
+            walk[symbol] *= rng.uniform(0.995, 1.005)
+            ticks.append((symbol, walk[symbol]))
+        position = {'next': 0}
+
+        async def match_tick():
+            symbol, price = ticks[position['next'] % len(ticks)]
+            position['next'] += 1
+            index.crossed(symbol, price)
+
+        record(f'alerts/crossed/alerts={count}', await measure(match_tick, args.repeat, 1000))
+
+    from src.services.Downsample import downsample
+    for length in parse_sizes(args.series):
+        series = InMemoryPriceHistory({symbols[0]: prices[symbols[0]]}, length, args.seed).rows[symbols[0]]
+        for method in ('lttb', 'minmax'):
+            async def reduce_series():
+                downsample(series, 1000, method)
+
+            record(f'downsample/{method}/points={length}', await measure(reduce_series, args.repeat))
+
+    return results
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Print median changes against the baseline; returns the cases that regressed"""
+    regressions = []
+    print(f"\n{'case':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            print(f"{name:<40} {'-':>12} {stats['medianMs']:>10.4f}ms {'new':>9}")
+            continue
+        change = stats['medianMs'] / before['medianMs'] - 1 if before['medianMs'] else 0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40} {before['medianMs']:>10.4f}ms {stats['medianMs']:>10.4f}ms {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000', help='portfolio sizes (holdings)')
+    parser.add_argument('--history', default='60,252', help='price history lengths (days)')
+    parser.add_argument('--alerts', default='10000,1000000', help='active alert counts')
+    parser.add_argument('--series', default='10000,100000', help='history lengths downsampled to 1000 points')
+    parser.add_argument('--repeat', type=int, default=30, help='samples per case')
+    parser.add_argument('--provider', choices=['http', 'replay'], default='http',
+                        help='Alpha Vantage client over a fake transport, or the replay provider')
+    parser.add_argument('--provider-latency-ms', type=float, default=0, help='simulated provider latency')
+    parser.add_argument('--redis-url', help='use a scratch database of a local Redis (it is flushed) instead of fakeredis')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='median slowdown counted as a regression')
+    args = parser.parse_args()
+
+    if args.redis_url:
+        use_redis_url(args.redis_url)
+    else:
+        use_fake_redis()
+
+    results = asyncio.run(run_suite(args))
+    report = {
+        'meta': {
+            'createdAt': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}')
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""In-memory stand-ins for Redis, Postgres and the quote provider used by the benchmark suite.
+
+Install them before importing any service module: services connect to
+Redis when their singletons are created.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Dict, List
+import httpx
+import numpy as np
+from redis import ConnectionPool
+from src.config.redis import redis_client, TimedRedis
+from src.config.metrics import timed_query
+
+SECTORS = ['Technology', 'Healthcare', 'Financial Services', 'Energy', 'Consumer Cyclical', 'Industrials', 'Utilities']
+
+def use_fake_redis():
+    """Point the shared Redis client at an in-process fakeredis server"""
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit('In-memory Redis needs fakeredis: pip install -r benchmarks/requirements.txt')
+    pool = ConnectionPool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer(), decode_responses=True)
+    # Same client class as production so command timing and tracing overhead are included
+    redis_client.client = TimedRedis(connection_pool=pool)
+
+def use_redis_url(url: str):
+    """Point the shared Redis client at a scratch database of a local Redis; it is flushed"""
+    redis_client.client = TimedRedis.from_url(url, decode_responses=True)
+    redis_client.client.flushdb()
+
+def symbol_names(count: int) -> List[str]:
+    return [f'S{i:05d}' for i in range(count)]
+
+def base_prices(symbols: List[str], seed: int) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    return dict(zip(symbols, np.round(rng.uniform(5, 500, len(symbols)), 2).tolist()))
+
+class InMemoryPriceHistory:
+    """Stand-in for the price_history table: a daily random walk per symbol served through PriceHistory"""
+
+    def __init__(self, prices: Dict[str, float], length: int, seed: int):
+        rng = np.random.default_rng(seed)
+        start = datetime(2024, 1, 1)
+        dates = [start + timedelta(days=day) for day in range(length)]
+        self.rows: Dict[str, List[Dict]] = {}
+        row_id = 0
+        for symbol, price in prices.items():
+            # Anchor the walk so the series ends at the current price
+            log_walk = np.cumsum(rng.normal(0, 0.02, length))
+            walk = price * np.exp(log_walk - log_walk[-1])
+            series = []
+            for date, close in zip(dates, np.round(walk, 2).tolist()):
+                row_id += 1
+                series.append({'id': row_id, 'symbol': symbol, 'price': close, 'volume': 1_000_000, 'date': date})
+            self.rows[symbol] = series
+
+    def find_by_symbol(self, conn, symbol: str, limit: int = 100) -> List[Dict]:
+        # Oldest first, like the model
+        return self.rows.get(symbol, [])[-limit:]
+
+    def install(self):
+        """Serve PriceHistory.find_by_symbol from memory, keeping the model's metrics and tracing wrapper"""
+        from src.models.PriceHistory import PriceHistory
+        PriceHistory.find_by_symbol = staticmethod(timed_query('PriceHistory', 'find_by_symbol', self.find_by_symbol))
+
+def install_symbol_index(symbols: List[str]):
+    """Fill the symbol reference snapshot without loading it from Postgres"""
+    from src.services.SymbolIndex import get_symbol_index, SymbolInfo
+    get_symbol_index().entries = MappingProxyType({
+        symbol: SymbolInfo(symbol, f'{symbol} Inc.', SECTORS[i % len(SECTORS)], None, 'NASDAQ', 'USD')
+        for i, symbol in enumerate(symbols)
+    })
+
+class FakeProvider:
+    """httpx transport answering GLOBAL_QUOTE requests the way Alpha Vantage does"""
+
+    def __init__(self, prices: Dict[str, float], latency_ms: float = 0):
+        self.prices = prices
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        symbol = request.url.params.get('symbol')
+        price = self.prices.get(symbol)
+        if price is None:
+            return httpx.Response(200, json={'Global Quote': {}})
+        return httpx.Response(200, json={'Global Quote': {
+            '01. symbol': symbol,
+            '05. price': f'{price:.4f}',
+            '06. volume': '1000000',
+            '09. change': '0.0000',
+            '10. change percent': '0.0000%'
+        }})
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return httpx.MockTransport(self.handle)
@@ -11,29 +11,49 @@ class EmailService:
         self.service = os.getenv('EMAIL_SERVICE', 'smtp.gmail.com')
         self.user = os.getenv('EMAIL_USER', '')
         self.password = os.getenv('EMAIL_PASSWORD', '')
-        self.port = 587
-        self.is_production = os.getenv('NODE_ENV') == 'production'
+        self.sender = os.getenv('EMAIL_FROM', self.user) or 'alerts@localhost'
+        self.port = int(os.getenv('EMAIL_PORT', '587'))
+        self.use_tls = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
+        # 'smtp' delivers, 'console' only prints; defaults to smtp in production
+        default_transport = 'smtp' if os.getenv('NODE_ENV') == 'production' else 'console'
+        self.transport = os.getenv('EMAIL_TRANSPORT', default_transport).lower()
+    
+    def build_message(self, to: str, subject: str, html_content: str) -> MIMEMultipart:
+        """Build an HTML email message"""
+        message = MIMEMultipart('alternative')
+        message['From'] = self.sender
+        message['To'] = to
+        message['Subject'] = subject
+        
+        html_part = MIMEText(html_content, 'html')
+        message.attach(html_part)
+        return message
+    
+    def open_connection(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP session that can send several messages"""
+        server = smtplib.SMTP(self.service, self.port, timeout=10)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
     
     def send_email(self, to: str, subject: str, html_content: str):
         """Send an email"""
         try:
-            if not self.is_production:
-                print(f"[DEV MODE] Email not sent - would send to {to}")
+            if self.transport == 'console':
+                print(f"[CONSOLE] Email not sent - would send to {to}")
                 print(f"Subject: {subject}")
                 print(f"Content: {html_content[:100]}...")
                 return True
             
-            message = MIMEMultipart('alternative')
-            message['From'] = self.user
-            message['To'] = to
-            message['Subject'] = subject
-            
-            html_part = MIMEText(html_content, 'html')
-            message.attach(html_part)
+            message = self.build_message(to, subject, html_content)
             
-            with smtplib.SMTP(self.service, self.port) as server:
-                server.starttls()
-                server.login(self.user, self.password)
+            with self.open_connection() as server:
                 server.send_message(message)
             
             print(f"Email sent successfully to {to}")
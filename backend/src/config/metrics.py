@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import functools
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from .tracing import span
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+load_dotenv()
+
+# With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by them
+# (before start-up); every process then writes its samples there and /metrics aggregates them.
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by tier and result (hit, miss, stale)',
+    ['tier', 'result']
+)
+
+PROVIDER_REQUEST_DURATION = Histogram(
+    'provider_request_duration_seconds', 'Quote provider call latency',
+    ['provider', 'outcome'], buckets=LATENCY_BUCKETS
+)
+PROVIDER_ERRORS = Counter(
+    'provider_errors_total', 'Failed quote provider calls by reason',
+    ['provider', 'reason']
+)
+PROVIDER_QUOTA_REMAINING = Gauge(
+    'provider_quota_remaining', 'Provider calls the poller may still make right now (token bucket level)',
+    ['provider'], multiprocess_mode='livemax'
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    'circuit_breaker_state', 'Breaker state: 0 closed, 1 half-open, 2 open', ['breaker'], multiprocess_mode='livemax'
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    'circuit_breaker_transitions_total', 'Breaker state changes by the state entered', ['breaker', 'state']
+)
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    'circuit_breaker_rejections_total', 'Calls short-circuited by an open breaker', ['breaker']
+)
+SYMBOL_BREAKERS_OPEN = Gauge(
+    'symbol_breakers_open', 'Symbols whose own breaker is open or half-open', multiprocess_mode='livesum'
+)
+
+HISTORY_TICKS = Counter(
+    'history_ticks_total', 'Ticks offered to price_history by outcome (written, suppressed as unchanged)', ['result']
+)
+
+DB_POOL_WAIT = Histogram(
+    'db_pool_checkout_seconds', 'Time spent waiting for a free pool connection', buckets=LATENCY_BUCKETS
+)
+DB_POOL_EXHAUSTED = Counter(
+    'db_pool_exhausted_total', 'Checkouts that gave up after DB_POOL_TIMEOUT with every connection in use'
+)
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Connections checked out of the pool', multiprocess_mode='livesum'
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Model method duration',
+    ['model', 'method'], buckets=LATENCY_BUCKETS
+)
+
+ALERT_EVALUATIONS = Counter(
+    'alert_evaluations_total', 'Alert engine tick outcomes (evaluated, triggered, suppressed, skipped)',
+    ['result']
+)
+
+JOB_RUN_DURATION = Histogram(
+    'job_run_duration_seconds', 'Scheduled job run duration', ['job'], buckets=LATENCY_BUCKETS
+)
+JOB_LAG = Histogram(
+    'job_lag_seconds', 'How late a scheduled job started relative to its schedule', ['job'], buckets=LATENCY_BUCKETS
+)
+JOB_FAILURES = Counter('job_failures_total', 'Scheduled job runs that raised', ['job'])
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds', 'Delay of the event loop in waking a timer', buckets=LATENCY_BUCKETS
+)
+
+# Time spent per dependency kind (db, redis, http) during the current request, as [calls, seconds].
+# Set by the profiling middleware; None outside profiled requests so recording costs nothing there.
+request_breakdown: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar('request_breakdown', default=None)
+
+def record_time(kind: str, seconds: float):
+    """Attribute time to a dependency in the current request's breakdown, if one is being collected"""
+    breakdown = request_breakdown.get()
+    if breakdown is not None:
+        entry = breakdown.setdefault(kind, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+def timed_query(model: str, method: str, func):
+    """Wrap a model method so its duration is recorded and traced"""
+    histogram = DB_QUERY_DURATION.labels(model, method)
+    name = f'{model}.{method}'
+    attributes = {'db.system': 'postgresql'}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with span(name, 'client', attributes):
+                return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            histogram.observe(elapsed)
+            record_time('db', elapsed)
+    return wrapper
+
+def instrument_model(cls):
+    """Class decorator: time every static query method of a model"""
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod):
+            setattr(cls, name, staticmethod(timed_query(cls.__name__, name, attr.__func__)))
+    return cls
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Measure how late the loop wakes from a sleep; sustained lag means blocking work on the loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - started - interval, 0))
+
+def render_metrics():
+    """Latest samples in the Prometheus text format, aggregated across processes when enabled"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead():
+    """Drop this process's live gauges from the shared directory on shutdown"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,10 +1,40 @@
 import os
+import time
 from dotenv import load_dotenv
-import redis
 from redis import Redis
+from redis.client import Pipeline
+from .metrics import record_time
+from .tracing import span
 
 load_dotenv()
 
+class TimedPipeline(Pipeline):
+    def execute(self, raise_on_error=True):
+        started = time.perf_counter()
+        attributes = {'db.system': 'redis', 'db.redis.commands': len(self.command_stack)}
+        try:
+            with span('redis pipeline', 'client', attributes):
+                return super().execute(raise_on_error)
+        finally:
+            record_time('redis', time.perf_counter() - started)
+
+class TimedRedis(Redis):
+    """Redis client that attributes command time to the current request's breakdown and trace"""
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        attributes = {'db.system': 'redis', 'db.operation': args[0]}
+        if len(args) > 1 and isinstance(args[1], str):
+            attributes['db.redis.key'] = args[1]
+        try:
+            with span(f'redis {args[0]}', 'client', attributes):
+                return super().execute_command(*args, **options)
+        finally:
+            record_time('redis', time.perf_counter() - started)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 class RedisClient:
     def __init__(self):
         self.client: Redis = None
@@ -14,7 +44,7 @@ class RedisClient:
         try:
             redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
             
-            self.client = redis.from_url(
+            self.client = TimedRedis.from_url(
                 redis_url,
                 decode_responses=True,
                 socket_connect_timeout=2,
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import random
+import asyncio
+import inspect
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# TRACE_EXPORTER: 'none' disables tracing entirely, 'file' appends spans as JSON lines to TRACE_FILE,
+# 'otlp' posts them to an OpenTelemetry collector's OTLP/HTTP JSON endpoint
+EXPORTER = os.getenv('TRACE_EXPORTER', 'none').lower()
+ENABLED = EXPORTER in ('file', 'otlp')
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces/spans.jsonl')
+OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '1'))
+SERVICE_NAME = os.getenv('TRACE_SERVICE_NAME', 'stock-portfolio-api')
+FLUSH_SECONDS = float(os.getenv('TRACE_FLUSH_SECONDS', '2'))
+# Finished spans waiting for export; the oldest are dropped if the exporter falls behind
+BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '50000'))
+
+# OTLP span kinds
+KINDS = {'internal': 1, 'server': 2, 'client': 3, 'consumer': 5}
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ('name', 'kind', 'context', 'parent_id', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.kind = kind
+        self.context = SpanContext(trace_id, os.urandom(8).hex())
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            'traceId': self.context.trace_id,
+            'spanId': self.context.span_id,
+            'parentId': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'service': SERVICE_NAME,
+            'start': self.start_ns / 1e9,
+            'durationMs': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+    def to_otlp(self) -> Dict:
+        span = {
+            'traceId': self.context.trace_id,
+            'spanId': self.context.span_id,
+            'name': self.name,
+            'kind': KINDS.get(self.kind, 1),
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [otlp_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+def otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+# Innermost open span of the current task; asyncio tasks and to_thread calls inherit it
+current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+finished: deque = deque(maxlen=BUFFER_SIZE)
+
+def current_context() -> Optional[SpanContext]:
+    """Context of the open span, to hand to work that does not inherit context vars (queues, threads)"""
+    active = current_span.get()
+    return active.context if active else None
+
+@contextmanager
+def span(name: str, kind: str = 'internal', attributes: Dict = None, root: bool = False,
+         parent: Optional[SpanContext] = None):
+    """Time a block as a child of the open span.
+
+    Outside a trace this does nothing unless root=True, which starts a new
+    (sampled) trace; request handlers and scheduled jobs are roots, so Redis
+    and DB calls made by idle background loops do not produce orphan spans.
+    """
+    if not ENABLED:
+        yield None
+        return
+    if parent is None:
+        active = current_span.get()
+        if active:
+            parent = active.context
+        elif not root or random.random() >= SAMPLE_RATE:
+            yield None
+            return
+
+    new_span = Span(
+        name, kind,
+        parent.trace_id if parent else os.urandom(16).hex(),
+        parent.span_id if parent else None,
+        dict(attributes or {})
+    )
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        current_span.reset(token)
+        new_span.end_ns = time.time_ns()
+        finished.append(new_span)
+
+def traced(name: str = None, kind: str = 'internal'):
+    """Decorator: run a function (sync or async) inside a span named after it"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Parent context from a W3C traceparent header (00-<trace id>-<span id>-<flags>)"""
+    parts = (header or '').split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+class TraceExporter:
+    """Periodically drains finished spans to the configured exporter"""
+
+    def __init__(self):
+        self.task: asyncio.Task = None
+        # Flushes come from the export loop, stop() and to_thread; keep file appends whole
+        self.lock = threading.Lock()
+
+    def drain(self) -> List[Span]:
+        spans = []
+        while finished:
+            try:
+                spans.append(finished.popleft())
+            except IndexError:
+                break
+        return spans
+
+    def write_file(self, spans: List[Span]):
+        directory = os.path.dirname(TRACE_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock, open(TRACE_FILE, 'a') as f:
+            f.writelines(json.dumps(s.to_dict(), default=str) + '\n' for s in spans)
+
+    def otlp_payload(self, spans: List[Span]) -> Dict:
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [otlp_attribute('service.name', SERVICE_NAME)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'stockify'},
+                    'spans': [s.to_otlp() for s in spans]
+                }]
+            }]
+        }
+
+    async def flush(self):
+        spans = self.drain()
+        if not spans:
+            return
+        try:
+            if EXPORTER == 'otlp':
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.post(OTLP_ENDPOINT, json=self.otlp_payload(spans))
+                    response.raise_for_status()
+            else:
+                await asyncio.to_thread(self.write_file, spans)
+        except Exception as e:
+            print(f'Error exporting {len(spans)} spans: {e}')
+
+    async def export_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_SECONDS)
+            await self.flush()
+
+    def start(self):
+        if ENABLED and not self.task:
+            self.task = asyncio.create_task(self.export_loop())
+            print(f'Tracing enabled: exporting spans to {OTLP_ENDPOINT if EXPORTER == "otlp" else TRACE_FILE}')
+
+    async def stop(self):
+        """Stop the export loop and flush what is left"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            await self.flush()
+
+# Singleton instance
+trace_exporter = TraceExporter()
+
+def get_trace_exporter() -> TraceExporter:
+    """Get trace exporter instance"""
+    return trace_exporter
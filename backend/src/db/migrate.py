@@ -69,6 +69,143 @@ def create_tables():
         """)
         print("✓ alerts table created")
         
+        # Symbols reference table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol VARCHAR(10) PRIMARY KEY,
+                name VARCHAR(255),
+                sector VARCHAR(100),
+                industry VARCHAR(100),
+                exchange VARCHAR(20),
+                currency VARCHAR(3) DEFAULT 'USD',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        print("✓ symbols table created")
+        
+        # Compact cold history: one row per symbol and day, prices as deltas in 1/10000ths
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_history_compact (
+                symbol VARCHAR(10) NOT NULL,
+                day DATE NOT NULL,
+                base_price DECIMAL(18, 4) NOT NULL,
+                price_deltas INTEGER[] NOT NULL,
+                volumes BIGINT[] NOT NULL,
+                offsets_us BIGINT[] NOT NULL,
+                PRIMARY KEY (symbol, day)
+            );
+        """)
+        print("✓ price_history_compact table created")
+        
+        # One compacted day decoded back into rows
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION price_history_decode(c price_history_compact)
+            RETURNS TABLE (price DECIMAL(18, 4), volume BIGINT, date TIMESTAMP)
+            LANGUAGE sql IMMUTABLE AS $$
+                SELECT (c.base_price + SUM(d.delta) OVER (ORDER BY d.n) / 10000.0)::DECIMAL(18, 4),
+                       c.volumes[d.n],
+                       c.day + c.offsets_us[d.n] * INTERVAL '1 microsecond'
+                FROM unnest(c.price_deltas) WITH ORDINALITY AS d(delta, n)
+            $$;
+        """)
+        
+        # Raw and compacted history as one set of rows, read when PRICE_HISTORY_COMPACT=true
+        cursor.execute("""
+            CREATE OR REPLACE VIEW price_history_all AS
+            SELECT id, symbol, price, volume, date FROM price_history
+            UNION ALL
+            SELECT NULL::INTEGER, c.symbol, t.price::DECIMAL(18, 4), t.volume, t.date
+            FROM price_history_compact c
+            CROSS JOIN LATERAL price_history_decode(c) t;
+        """)
+        
+        # The view cannot push a date range into the compacted days, so bounded reads
+        # decode only the days that can hold matching rows
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION price_history_between(symbols TEXT[], start_at TIMESTAMP, end_at TIMESTAMP)
+            RETURNS SETOF price_history_all
+            LANGUAGE sql STABLE AS $$
+                SELECT p.id, p.symbol, p.price, p.volume, p.date
+                FROM price_history p
+                WHERE p.symbol = ANY(symbols) AND p.date BETWEEN start_at AND end_at
+                UNION ALL
+                SELECT NULL::INTEGER, c.symbol, t.price::DECIMAL(18, 4), t.volume, t.date
+                FROM price_history_compact c
+                CROSS JOIN LATERAL price_history_decode(c) t
+                WHERE c.symbol = ANY(symbols) AND c.day BETWEEN start_at::date AND end_at::date
+                  AND t.date BETWEEN start_at AND end_at
+            $$;
+        """)
+        
+        # Latest row_limit rows per symbol before a point in time (NULL for no bound): raw rows
+        # first, then compacted days newest first until they hold enough ticks to compete
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION price_history_latest(symbols TEXT[], before_at TIMESTAMP, row_limit INTEGER)
+            RETURNS SETOF price_history_all
+            LANGUAGE sql STABLE AS $$
+                SELECT latest.*
+                FROM unnest(symbols) AS s(symbol)
+                CROSS JOIN LATERAL (
+                    WITH RECURSIVE recent AS (
+                        SELECT p.id, p.symbol, p.price, p.volume, p.date
+                        FROM price_history p
+                        WHERE p.symbol = s.symbol AND p.date < COALESCE(before_at, 'infinity')
+                        ORDER BY p.date DESC
+                        LIMIT row_limit
+                    ), bound AS (
+                        -- Days older than a full set of raw rows cannot contribute
+                        SELECT CASE WHEN COUNT(*) = row_limit THEN MIN(r.date)::date ELSE '-infinity'::date END AS day
+                        FROM recent r
+                    ), days AS (
+                        -- Ticks on the day of before_at may all fall after it, so that day counts for none
+                        (SELECT c.day, CASE WHEN c.day = before_at::date THEN 0 ELSE cardinality(c.price_deltas) END AS ticks
+                         FROM price_history_compact c, bound b
+                         WHERE c.symbol = s.symbol AND c.day <= COALESCE(before_at, 'infinity')::date AND c.day >= b.day
+                         ORDER BY c.day DESC
+                         LIMIT 1)
+                        UNION ALL
+                        SELECT older.day, d.ticks + cardinality(older.price_deltas)
+                        FROM days d
+                        CROSS JOIN bound b
+                        CROSS JOIN LATERAL (
+                            SELECT c.day, c.price_deltas
+                            FROM price_history_compact c
+                            WHERE c.symbol = s.symbol AND c.day < d.day AND c.day >= b.day
+                            ORDER BY c.day DESC
+                            LIMIT 1
+                        ) older
+                        WHERE d.ticks < row_limit
+                    )
+                    SELECT * FROM recent
+                    UNION ALL
+                    SELECT NULL::INTEGER, c.symbol, t.price::DECIMAL(18, 4), t.volume, t.date
+                    FROM price_history_compact c
+                    CROSS JOIN LATERAL price_history_decode(c) t
+                    WHERE c.symbol = s.symbol AND c.day IN (SELECT day FROM days)
+                      AND t.date < COALESCE(before_at, 'infinity')
+                    ORDER BY date DESC
+                    LIMIT row_limit
+                ) latest
+            $$;
+        """)
+        print("✓ price_history_all view and read functions created")
+        
+        # Backfill progress, one row per symbol and bar size
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                symbol VARCHAR(10) NOT NULL,
+                bar_size VARCHAR(10) NOT NULL,
+                status VARCHAR(10) NOT NULL,
+                rows_fetched INTEGER DEFAULT 0,
+                rows_inserted INTEGER DEFAULT 0,
+                last_date TIMESTAMP,
+                error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, bar_size)
+            );
+        """)
+        print("✓ backfill_checkpoints table created")
+        
         # Create indexes
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_portfolio_user ON portfolios(user_id);
@@ -85,6 +222,9 @@ def create_tables():
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_price_date ON price_history(date);
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_price_symbol_date ON price_history(symbol, date);
+        """)
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_alert_portfolio ON alerts(portfolio_id);
         """)
@@ -0,0 +1,107 @@
+"""Market-data ingestion worker.
+
+Owns provider calls when INGEST_MODE=stream: polls quotes within the rate
+limit, publishes normalized ticks to the Redis tick stream and writes them
+to price history through the history-writer consumer group.
+
+    python -m src.ingest [--roles poller,history]
+"""
+import os
+import asyncio
+import signal
+import argparse
+from typing import Dict, List
+from dotenv import load_dotenv
+
+from .config.database import db
+from .config.redis import redis_client
+from .config.tracing import get_trace_exporter
+from .models.PriceHistory import PriceHistory
+from .services.SymbolIndex import get_symbol_index
+from .services.AlertService import get_alert_service
+from .services.ClusterMembership import get_cluster_membership
+from .services.ClusterBus import get_cluster_bus
+from .services.Scheduler import get_job_scheduler
+from .services.PollingScheduler import get_price_poller
+from .services.TickStream import get_tick_stream, HISTORY_GROUP
+from .services.TickDedup import get_tick_deduper
+from .services.ValuationService import get_valuation_service
+
+load_dotenv()
+
+ROLES = ('poller', 'history')
+
+async def write_history(ticks: List[Dict]):
+    """Persist a batch of streamed ticks, skipping unchanged ones"""
+    tick_deduper = get_tick_deduper()
+    ticks = tick_deduper.filter(ticks)
+    if not ticks:
+        return
+    conn = await db.get_connection_async()
+    try:
+        PriceHistory.create_many(conn, ticks)
+        tick_deduper.mark_written(ticks)
+    finally:
+        db.return_connection(conn)
+
+async def run(roles: List[str]):
+    """Run the selected ingestion roles until SIGINT/SIGTERM"""
+    tick_stream = get_tick_stream()
+    if not tick_stream.enabled:
+        print('Warning: INGEST_MODE is not "stream"; API workers will keep polling providers themselves')
+
+    db.connect()
+    redis_client.connect()
+    print(f'Starting ingestion worker ({", ".join(roles)})')
+
+    trace_exporter = get_trace_exporter()
+    trace_exporter.start()
+    symbol_index = get_symbol_index()
+    symbol_index.start()
+    # Registers for fetched ticks so materialized portfolio valuations follow ingested prices
+    get_valuation_service()
+    worker_id = get_cluster_membership().worker_id
+
+    job_scheduler = get_job_scheduler()
+    cluster_bus = get_cluster_bus()
+    if 'poller' in roles:
+        # Alert thresholds feed polling priorities; changes arrive over the cluster bus
+        get_alert_service().load_index()
+        cluster_bus.start()
+        # Several ingestion workers may run for failover; the lease keeps polling on one of them
+        job_scheduler.register('price_poll', get_price_poller().poll, float(os.getenv('POLL_TICK_SECONDS', '1')))
+        job_scheduler.start()
+
+    if 'history' in roles:
+        # Start from the beginning of the stream the first time so no retained tick is missed
+        tick_stream.consume(HISTORY_GROUP, worker_id, write_history, start='0')
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    print('Stopping ingestion worker...')
+    job_scheduler.stop()
+    tick_stream.stop()
+    cluster_bus.stop()
+    symbol_index.stop()
+    await trace_exporter.stop()
+    db.close_all()
+    redis_client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Market-data ingestion worker')
+    parser.add_argument('--roles', default=','.join(ROLES),
+                        help=f'comma-separated roles to run (default: {",".join(ROLES)})')
+    args = parser.parse_args()
+
+    roles = [role.strip() for role in args.roles.split(',') if role.strip()]
+    unknown = set(roles) - set(ROLES)
+    if unknown:
+        parser.error(f'unknown roles: {", ".join(sorted(unknown))}')
+    asyncio.run(run(roles))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import io
+import os
+import re
+import json
+import time
+import pstats
+import random
+import asyncio
+import cProfile
+from datetime import datetime
+from typing import Dict
+from dotenv import load_dotenv
+from ..config.metrics import request_breakdown
+
+load_dotenv()
+
+class ProfilingMiddleware:
+    """Opt-in request profiling.
+
+    A request is profiled with cProfile when it carries the profile header
+    or falls in the sampled fraction of traffic. Every request also collects
+    a breakdown of time spent in DB, Redis and HTTP calls; it is written out
+    for profiled requests and for any request slower than the threshold
+    (except event streams, which stay open by design).
+
+    cProfile sees everything the event loop thread runs while it is enabled,
+    including other requests' coroutines, and nothing that runs in worker
+    threads. Reports count the requests that overlapped the profile; with
+    PROFILE_EXCLUSIVE=true new requests wait while a profile runs, and the
+    profiled request first waits (up to PROFILE_DRAIN_SECONDS) for in-flight
+    ones to finish, so the profile covers that request alone. A profile stops
+    after PROFILE_MAX_SECONDS even if its request is still running.
+
+    Event streams (PROFILE_SKIP_PATHS, or requests accepting
+    text/event-stream) pass straight through: they are never profiled, held
+    back or waited for.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = os.getenv('PROFILE_DIR', 'profiles')
+        self.sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+        self.slow_ms = float(os.getenv('PROFILE_SLOW_MS', '1000'))
+        self.header = os.getenv('PROFILE_HEADER', 'X-Profile').lower().encode()
+        self.exclusive = os.getenv('PROFILE_EXCLUSIVE', 'false').lower() == 'true'
+        self.drain_seconds = float(os.getenv('PROFILE_DRAIN_SECONDS', '5'))
+        self.max_seconds = float(os.getenv('PROFILE_MAX_SECONDS', '30'))
+        self.skip_paths = tuple(p.strip() for p in os.getenv('PROFILE_SKIP_PATHS', '/api/live/sse').split(',') if p.strip())
+        # cProfile hooks the whole thread, so only one request can be profiled at a time
+        self.profiling = False
+        # In-flight requests, and how many others ran while the current profile was enabled
+        self.active = 0
+        self.overlapping = 0
+        self.gate = asyncio.Condition()
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def enter(self, profiling: bool):
+        """Count the request in; in exclusive mode hold it back while another request is profiled"""
+        if self.exclusive and not profiling and self.profiling:
+            async with self.gate:
+                await self.gate.wait_for(lambda: not self.profiling)
+        self.active += 1
+        if self.profiling and not profiling:
+            self.overlapping += 1
+
+    async def leave(self):
+        self.active -= 1
+        if self.exclusive:
+            await self.notify()
+
+    async def notify(self):
+        async with self.gate:
+            self.gate.notify_all()
+
+    def is_stream(self, scope) -> bool:
+        """Event-stream requests stay open indefinitely, so they are kept out of profiling"""
+        if scope['path'].startswith(self.skip_paths):
+            return True
+        return b'text/event-stream' in dict(scope['headers']).get(b'accept', b'')
+
+    def stop_profile(self, profiler, state: Dict, capped: bool = False):
+        """Disable the profiler once, and let requests held back by it through"""
+        if state.get('stopped'):
+            return
+        profiler.disable()
+        state.update(stopped=True, capped=capped, overlapping=self.overlapping)
+        self.profiling = False
+        if capped and self.exclusive:
+            asyncio.ensure_future(self.notify())
+
+    async def drain(self):
+        """Wait for in-flight requests other than the profiled one, bounded so streams cannot block it"""
+        try:
+            async with self.gate:
+                await asyncio.wait_for(self.gate.wait_for(lambda: self.active <= 1), self.drain_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or self.is_stream(scope):
+            return await self.app(scope, receive, send)
+
+        requested = dict(scope['headers']).get(self.header) in (b'1', b'true')
+        profiler = None
+        if (requested or random.random() < self.sample_rate) and not self.profiling:
+            self.profiling = True
+            profiler = cProfile.Profile()
+
+        await self.enter(profiler is not None)
+        if profiler and self.exclusive:
+            await self.drain()
+
+        breakdown: Dict = {}
+        token = request_breakdown.set(breakdown)
+        started = time.perf_counter()
+        status = {'code': 500, 'stream': False}
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                content_type = dict(message.get('headers', [])).get(b'content-type', b'')
+                status['stream'] = content_type.startswith(b'text/event-stream')
+                if requested:
+                    # Server-Timing shows the breakdown in browser dev tools
+                    parts = [f'{kind};dur={seconds * 1000:.1f}' for kind, (_, seconds) in breakdown.items()]
+                    parts.append(f'total;dur={(time.perf_counter() - started) * 1000:.1f}')
+                    message['headers'] = list(message.get('headers', [])) + [(b'server-timing', ', '.join(parts).encode())]
+            await send(message)
+
+        profile: Dict = {}
+        cap = None
+        try:
+            if profiler:
+                # Requests already in flight run alongside the profile too
+                self.overlapping = self.active - 1
+                profiler.enable()
+                cap = asyncio.get_running_loop().call_later(self.max_seconds, self.stop_profile, profiler, profile, True)
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if profiler:
+                cap.cancel()
+                self.stop_profile(profiler, profile)
+            await self.leave()
+            request_breakdown.reset(token)
+            elapsed = time.perf_counter() - started
+            slow = elapsed * 1000 >= self.slow_ms > 0 and not status['stream']
+            if profiler or slow:
+                report = self.build_report(scope, status['code'], elapsed, breakdown, profiler, profile)
+                asyncio.get_running_loop().run_in_executor(None, self.write_report, report, profiler)
+
+    def build_report(self, scope, status: int, elapsed: float, breakdown: Dict, profiler, profile: Dict) -> Dict:
+        route = scope.get('route')
+        dependencies = {
+            kind: {'calls': calls, 'ms': round(seconds * 1000, 2)}
+            for kind, (calls, seconds) in sorted(breakdown.items())
+        }
+        # Waits can overlap when calls run concurrently, so the remainder is a lower bound for Python time
+        other = elapsed - sum(seconds for _, seconds in breakdown.values())
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'method': scope['method'],
+            'path': scope['path'],
+            'query': scope.get('query_string', b'').decode(),
+            'route': route.path if route else None,
+            'status': status,
+            'durationMs': round(elapsed * 1000, 2),
+            'reason': 'profiled' if profiler else 'slow',
+            'breakdown': {**dependencies, 'other': {'ms': round(max(other, 0) * 1000, 2)}}
+        }
+        if profiler:
+            # Other requests' event-loop work is mixed into the profile; worker-thread work is absent
+            report['overlappingRequests'] = profile['overlapping']
+            report['profileScope'] = 'event loop thread; includes overlapping requests' if profile['overlapping'] else 'event loop thread'
+            if profile['capped']:
+                report['profileCappedAtMs'] = round(self.max_seconds * 1000)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(40)
+            report['topFunctions'] = out.getvalue()
+        return report
+
+    def write_report(self, report: Dict, profiler):
+        """Write <time>-<method>-<path>-<ms>ms.json, plus a .prof file loadable by pstats/snakeviz"""
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', report['path']).strip('_') or 'root'
+        stem = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{report['method']}-{slug}-{int(report['durationMs'])}ms"
+        try:
+            with open(os.path.join(self.directory, f'{stem}.json'), 'w') as f:
+                json.dump(report, f, indent=2)
+            if profiler:
+                profiler.dump_stats(os.path.join(self.directory, f'{stem}.prof'))
+        except Exception as e:
+            print(f'Error writing profile {stem}: {e}')
@@ -0,0 +1,37 @@
+from ..config.tracing import span, parse_traceparent
+
+class TracingMiddleware:
+    """Opens the root span of every HTTP request, continuing an incoming W3C traceparent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope['headers'])
+        parent = parse_traceparent(headers.get(b'traceparent', b'').decode())
+        attributes = {'http.method': scope['method'], 'http.target': scope['path']}
+
+        with span(f"{scope['method']} {scope['path']}", 'server', attributes, root=True, parent=parent) as request_span:
+            if request_span is None:
+                return await self.app(scope, receive, send)
+
+            async def send_with_trace_id(message):
+                if message['type'] == 'http.response.start':
+                    request_span.set_attribute('http.status_code', message['status'])
+                    # Lets a client or log line be matched to its trace in the exported spans
+                    message['headers'] = list(message.get('headers', [])) + [
+                        (b'x-trace-id', request_span.context.trace_id.encode())
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                # The router sets the matched route on the scope; name spans by template to group them
+                route = scope.get('route')
+                if route:
+                    request_span.name = f"{scope['method']} {route.path}"
+                    request_span.set_attribute('http.route', route.path)
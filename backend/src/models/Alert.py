@@ -1,5 +1,7 @@
 from typing import Optional, List
+from ..config.metrics import instrument_model
 
+@instrument_model
 class Alert:
     @staticmethod
     def create(conn, portfolio_id: int, symbol: str, price_threshold: float, condition: str, email: str):
@@ -120,3 +122,11 @@ class Alert:
         with conn.cursor() as cursor:
             cursor.execute(query, (alert_id,))
             conn.commit()
+    
+    @staticmethod
+    def find_active_symbols(conn):
+        """Distinct symbols with at least one active alert"""
+        query = "SELECT DISTINCT symbol FROM alerts WHERE is_active = true"
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return [row[0] for row in cursor.fetchall()]
@@ -1,6 +1,8 @@
 from typing import Optional, List
 from decimal import Decimal
+from ..config.metrics import instrument_model
 
+@instrument_model
 class Holding:
     @staticmethod
     def create(conn, portfolio_id: int, symbol: str, quantity: float, purchase_price: float):
@@ -102,3 +104,24 @@ class Holding:
         with conn.cursor() as cursor:
             cursor.execute(query, (holding_id,))
             conn.commit()
+    
+    @staticmethod
+    def find_quantities_by_symbol(conn):
+        """Total quantity held per symbol across all portfolios"""
+        query = "SELECT symbol, SUM(quantity) FROM holdings GROUP BY symbol"
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            
+            return {row[0]: float(row[1]) for row in rows}
+    
+    @staticmethod
+    def find_all_positions(conn):
+        """Every holding as (portfolio_id, symbol, quantity, cost basis) tuples, for batch valuation"""
+        query = """
+            SELECT portfolio_id, symbol, quantity::float8, (quantity * purchase_price)::float8
+            FROM holdings
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
@@ -1,6 +1,8 @@
 from typing import Optional, List
 from datetime import datetime
+from ..config.metrics import instrument_model
 
+@instrument_model
 class Portfolio:
     @staticmethod
     def create(conn, user_id: int, name: str):
@@ -1,6 +1,22 @@
-from typing import Optional, List
+import os
+from typing import Optional, List, Dict
 from datetime import datetime
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+from ..config.metrics import instrument_model
 
+load_dotenv()
+
+# With compact storage, cold days live in price_history_compact and reads go through
+# the price_history_all view, which decodes them back into rows (with a NULL id)
+COMPACT = os.getenv('PRICE_HISTORY_COMPACT', 'false').lower() == 'true'
+SOURCE = 'price_history_all' if COMPACT else 'price_history'
+# Bounded reads go through functions that decode only the compacted days they can use; the
+# WHERE clauses still apply, so the same queries read price_history directly without compaction
+RANGE_SOURCE = 'price_history_between(%(symbols)s, %(start)s, %(end)s)' if COMPACT else 'price_history'
+LATEST_SOURCE = 'price_history_latest(%(symbols)s, %(before)s, %(limit)s)' if COMPACT else 'price_history'
+
+@instrument_model
 class PriceHistory:
     @staticmethod
     def create(conn, symbol: str, price: float, volume: int = 0):
@@ -25,17 +41,32 @@ class PriceHistory:
                 }
         return None
     
+    @staticmethod
+    def create_many(conn, ticks: List[Dict]) -> int:
+        """Insert a batch of ticks ({'symbol', 'price', 'volume', 'timestamp'}) in one statement"""
+        if not ticks:
+            return 0
+        query = """
+            INSERT INTO price_history (symbol, price, volume, date)
+            VALUES %s;
+        """
+        values = [(t['symbol'], t['price'], t.get('volume', 0), t['timestamp']) for t in ticks]
+        with conn.cursor() as cursor:
+            execute_values(cursor, query, values, page_size=1000)
+            conn.commit()
+        return len(values)
+    
     @staticmethod
     def find_by_symbol(conn, symbol: str, limit: int = 100):
         """Find price history by symbol"""
-        query = """
-            SELECT * FROM price_history
-            WHERE symbol = %s
+        query = f"""
+            SELECT * FROM {LATEST_SOURCE}
+            WHERE symbol = %(symbol)s
             ORDER BY date DESC
-            LIMIT %s;
+            LIMIT %(limit)s;
         """
         with conn.cursor() as cursor:
-            cursor.execute(query, (symbol, limit))
+            cursor.execute(query, {'symbol': symbol, 'symbols': [symbol], 'before': None, 'limit': limit})
             rows = cursor.fetchall()
             
             # Reverse to get oldest first for charting
@@ -52,13 +83,13 @@ class PriceHistory:
     @staticmethod
     def find_by_symbol_and_date_range(conn, symbol: str, start_date: datetime, end_date: datetime):
         """Find price history by symbol and date range"""
-        query = """
-            SELECT * FROM price_history
-            WHERE symbol = %s AND date BETWEEN %s AND %s
+        query = f"""
+            SELECT * FROM {RANGE_SOURCE}
+            WHERE symbol = %(symbol)s AND date BETWEEN %(start)s AND %(end)s
             ORDER BY date ASC;
         """
         with conn.cursor() as cursor:
-            cursor.execute(query, (symbol, start_date, end_date))
+            cursor.execute(query, {'symbol': symbol, 'symbols': [symbol], 'start': start_date, 'end': end_date})
             rows = cursor.fetchall()
             
             return [{
@@ -72,14 +103,14 @@ class PriceHistory:
     @staticmethod
     def get_latest_price(conn, symbol: str):
         """Get latest price for a symbol"""
-        query = """
-            SELECT * FROM price_history
-            WHERE symbol = %s
+        query = f"""
+            SELECT * FROM {LATEST_SOURCE}
+            WHERE symbol = %(symbol)s
             ORDER BY date DESC
             LIMIT 1;
         """
         with conn.cursor() as cursor:
-            cursor.execute(query, (symbol,))
+            cursor.execute(query, {'symbol': symbol, 'symbols': [symbol], 'before': None, 'limit': 1})
             row = cursor.fetchone()
             
             if row:
@@ -91,3 +122,61 @@ class PriceHistory:
                     'date': row[4]
                 }
         return None
+    
+    @staticmethod
+    def find_bucketed_by_symbols(conn, symbols: List[str], start_date: datetime, end_date: datetime, bucket_seconds: int):
+        """Find the last price in each time bucket for several symbols"""
+        query = f"""
+            SELECT symbol,
+                   floor(extract(epoch FROM date) / %(bucket)s) * %(bucket)s AS bucket,
+                   (array_agg(price ORDER BY date DESC))[1] AS price
+            FROM {RANGE_SOURCE}
+            WHERE symbol = ANY(%(symbols)s) AND date BETWEEN %(start)s AND %(end)s
+            GROUP BY symbol, bucket
+            ORDER BY symbol, bucket ASC;
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(query, {'bucket': bucket_seconds, 'symbols': list(symbols), 'start': start_date, 'end': end_date})
+            rows = cursor.fetchall()
+            
+            return [{
+                'symbol': row[0],
+                'bucket': int(row[1]),
+                'price': float(row[2])
+            } for row in rows]
+    
+    @staticmethod
+    def get_latest_prices_before(conn, symbols: List[str], before: datetime):
+        """Get the last price recorded before a point in time for several symbols"""
+        query = f"""
+            SELECT DISTINCT ON (symbol) *
+            FROM {LATEST_SOURCE}
+            WHERE symbol = ANY(%(symbols)s) AND date < %(before)s
+            ORDER BY symbol, date DESC;
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(query, {'symbols': list(symbols), 'before': before, 'limit': 1})
+            rows = cursor.fetchall()
+            
+            return [{
+                'id': row[0],
+                'symbol': row[1],
+                'price': float(row[2]),
+                'volume': row[3],
+                'date': row[4]
+            } for row in rows]
+    
+    @staticmethod
+    def get_latest_dates(conn, symbols: List[str], before: Optional[datetime] = None):
+        """Get the timestamp of the most recent price for several symbols, optionally before a point in time"""
+        query = f"""
+            SELECT symbol, MAX(date)
+            FROM {LATEST_SOURCE}
+            WHERE symbol = ANY(%(symbols)s) AND date < COALESCE(%(before)s, 'infinity'::timestamp)
+            GROUP BY symbol;
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(query, {'symbols': list(symbols), 'before': before, 'limit': 1})
+            rows = cursor.fetchall()
+            
+            return {row[0]: row[1] for row in rows}
@@ -0,0 +1,64 @@
+from typing import List, Dict
+from psycopg2.extras import execute_values
+from ..config.metrics import instrument_model
+
+@instrument_model
+class Symbol:
+    @staticmethod
+    def find_all(conn):
+        """Find all reference symbols"""
+        query = "SELECT symbol, name, sector, industry, exchange, currency, updated_at FROM symbols"
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            
+            return [{
+                'symbol': row[0],
+                'name': row[1],
+                'sector': row[2],
+                'industry': row[3],
+                'exchange': row[4],
+                'currency': row[5],
+                'updated_at': row[6]
+            } for row in rows]
+    
+    @staticmethod
+    def get_version(conn):
+        """Get a version marker that changes whenever the table changes"""
+        query = "SELECT COUNT(*), MAX(updated_at) FROM symbols"
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            row = cursor.fetchone()
+            
+            return f"{row[0]}:{row[1].isoformat() if row[1] else ''}"
+    
+    @staticmethod
+    def bulk_upsert(conn, symbols: List[Dict]):
+        """Insert or update reference symbols, touching only rows that changed"""
+        query = """
+            INSERT INTO symbols (symbol, name, sector, industry, exchange, currency)
+            VALUES %s
+            ON CONFLICT (symbol) DO UPDATE
+            SET name = EXCLUDED.name,
+                sector = EXCLUDED.sector,
+                industry = EXCLUDED.industry,
+                exchange = EXCLUDED.exchange,
+                currency = EXCLUDED.currency,
+                updated_at = NOW()
+            WHERE (symbols.name, symbols.sector, symbols.industry, symbols.exchange, symbols.currency)
+                IS DISTINCT FROM
+                (EXCLUDED.name, EXCLUDED.sector, EXCLUDED.industry, EXCLUDED.exchange, EXCLUDED.currency);
+        """
+        values = [(
+            s['symbol'],
+            s.get('name'),
+            s.get('sector'),
+            s.get('industry'),
+            s.get('exchange'),
+            s.get('currency') or 'USD'
+        ) for s in symbols]
+        
+        with conn.cursor() as cursor:
+            execute_values(cursor, query, values, page_size=1000)
+            conn.commit()
+        return len(values)
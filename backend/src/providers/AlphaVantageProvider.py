@@ -0,0 +1,85 @@
+import os
+import httpx
+from datetime import datetime
+from typing import Dict, List
+from dotenv import load_dotenv
+from .QuoteProvider import QuoteProvider, ProviderError, RateLimitedError, InvalidSymbolError
+
+load_dotenv()
+
+class AlphaVantageProvider(QuoteProvider):
+    """GLOBAL_QUOTE lookups against the Alpha Vantage REST API"""
+
+    name = 'alphavantage'
+
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        self.api_key = os.getenv('ALPHA_VANTAGE_API_KEY', '')
+        self.base_url = 'https://www.alphavantage.co/query'
+        self.timeout = float(os.getenv('PROVIDER_TIMEOUT', '5'))
+        # httpx transport; None uses the network, benchmarks inject a fake one
+        self.transport = transport
+
+    async def fetch_quote(self, symbol: str) -> Dict:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            response = await client.get(
+                self.base_url,
+                params={
+                    'function': 'GLOBAL_QUOTE',
+                    'symbol': symbol,
+                    'apikey': self.api_key
+                }
+            )
+            data = response.json()
+
+        # Exhausted quota comes back as a 200 with a Note/Information message instead of a quote
+        if 'Note' in data or 'Information' in data:
+            raise RateLimitedError(f'Rate limited fetching {symbol}')
+        quote_data = data.get('Global Quote')
+        if quote_data == {}:
+            raise InvalidSymbolError(f'Unknown symbol {symbol}')
+        if not quote_data or '05. price' not in quote_data:
+            raise ProviderError(f'Invalid response for symbol {symbol}', 'invalid_response')
+
+        return {
+            'symbol': symbol,
+            'price': float(quote_data['05. price']),
+            'volume': int(quote_data.get('06. volume', 0)),
+            'change': float(quote_data.get('09. change', 0)),
+            'changePercent': float(quote_data.get('10. change percent', '0%').replace('%', '')),
+            'timestamp': datetime.now().isoformat()
+        }
+
+    async def fetch_history(self, symbol: str, interval: str = 'daily') -> List[Dict]:
+        """TIME_SERIES_DAILY or TIME_SERIES_INTRADAY with outputsize=full"""
+        params = {'symbol': symbol, 'outputsize': 'full', 'apikey': self.api_key}
+        if interval == 'daily':
+            params['function'] = 'TIME_SERIES_DAILY'
+            series_key = 'Time Series (Daily)'
+        else:
+            params['function'] = 'TIME_SERIES_INTRADAY'
+            params['interval'] = interval
+            series_key = f'Time Series ({interval})'
+        # Full series are large; allow them longer than a quote
+        async with httpx.AsyncClient(timeout=self.timeout * 6, transport=self.transport) as client:
+            response = await client.get(self.base_url, params=params)
+            data = response.json()
+
+        if 'Note' in data or 'Information' in data:
+            raise RateLimitedError(f'Rate limited fetching {symbol} history')
+        if 'Error Message' in data:
+            raise InvalidSymbolError(f'Unknown symbol {symbol}')
+        series = data.get(series_key)
+        if series is None:
+            raise ProviderError(f'Invalid history response for symbol {symbol}', 'invalid_response')
+
+        bars = []
+        for stamp, bar in series.items():
+            # Daily bars are closes; stamp them at the close like live ticks would be
+            timestamp = f'{stamp} 16:00:00' if interval == 'daily' else stamp
+            bars.append({
+                'price': float(bar['4. close']),
+                'volume': int(bar.get('5. volume', 0)),
+                'timestamp': timestamp
+            })
+        bars.sort(key=lambda b: b['timestamp'])
+        return bars
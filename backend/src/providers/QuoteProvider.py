@@ -0,0 +1,62 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class ProviderError(Exception):
+    """A quote could not be fetched; reason labels the provider_errors_total metric"""
+
+    reason = 'http'
+
+    def __init__(self, message: str, reason: str = None):
+        super().__init__(message)
+        if reason:
+            self.reason = reason
+
+class RateLimitedError(ProviderError):
+    """The provider refused the call because its quota is exhausted"""
+
+    reason = 'rate_limited'
+
+class InvalidSymbolError(ProviderError):
+    """The provider does not know the symbol"""
+
+    reason = 'invalid_symbol'
+
+class QuoteProvider(ABC):
+    """Source of normalized quotes.
+
+    fetch_quote returns {'symbol', 'price', 'volume', 'change',
+    'changePercent', 'timestamp'} or raises a ProviderError.
+    fetch_history returns the provider's full series for a symbol as
+    [{'price', 'volume', 'timestamp'}] oldest first, for the backfill job.
+    """
+
+    name = 'provider'
+
+    # Bar sizes fetch_history accepts
+    INTERVALS = ('daily', '1min', '5min', '15min', '30min', '60min')
+
+    @abstractmethod
+    async def fetch_quote(self, symbol: str) -> Dict:
+        ...
+
+    @abstractmethod
+    async def fetch_history(self, symbol: str, interval: str = 'daily') -> List[Dict]:
+        ...
+
+    def get_stats(self) -> Dict:
+        return {'provider': self.name}
+
+def create_provider(name: str = None) -> QuoteProvider:
+    """Provider selected by QUOTE_PROVIDER (alphavantage or replay)"""
+    name = (name or os.getenv('QUOTE_PROVIDER', 'alphavantage')).lower()
+    if name == 'alphavantage':
+        from .AlphaVantageProvider import AlphaVantageProvider
+        return AlphaVantageProvider()
+    if name == 'replay':
+        from .ReplayProvider import ReplayProvider
+        return ReplayProvider()
+    raise ValueError(f'Unknown QUOTE_PROVIDER: {name}')
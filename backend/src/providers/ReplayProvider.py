@@ -0,0 +1,231 @@
+import os
+import csv
+import json
+import math
+import time
+import random
+import asyncio
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple
+from dotenv import load_dotenv
+from .QuoteProvider import QuoteProvider, ProviderError, RateLimitedError, InvalidSymbolError
+
+load_dotenv()
+
+class Series(NamedTuple):
+    times: List[float]
+    prices: List[float]
+    volumes: List[int]
+
+def parse_time(value: str) -> float:
+    """Epoch seconds from an epoch number or an ISO-8601 timestamp"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def load_ticks(path: str) -> Dict[str, Series]:
+    """Read a tick file (CSV with symbol,price,volume,timestamp columns, or JSON lines with those keys)"""
+    with open(path, newline='') as f:
+        if path.endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    ticks: Dict[str, List[tuple]] = {}
+    for row in rows:
+        ticks.setdefault(row['symbol'].strip().upper(), []).append(
+            (parse_time(str(row['timestamp'])), float(row['price']), int(float(row.get('volume') or 0)))
+        )
+    series = {}
+    for symbol, entries in ticks.items():
+        entries.sort()
+        times, prices, volumes = zip(*entries)
+        series[symbol] = Series(list(times), list(prices), list(volumes))
+    return series
+
+class ReplayProvider(QuoteProvider):
+    """Deterministic quotes for load tests and benchmarks, with injectable faults.
+
+    Quotes come from a recorded tick file (REPLAY_FILE) or, for symbols
+    not in it, from a random walk seeded by REPLAY_SEED and the symbol.
+    The replay clock starts at the first fetch and runs REPLAY_SPEED times
+    faster than wall time; with REPLAY_SPEED=0 every fetch of a symbol
+    steps it one tick, so a run is reproducible regardless of timing.
+    History for the backfill job is the recorded series, or
+    REPLAY_HISTORY_POINTS generated bars.
+    """
+
+    name = 'replay'
+
+    def __init__(self):
+        self.path = os.getenv('REPLAY_FILE', '')
+        self.speed = float(os.getenv('REPLAY_SPEED', '1'))
+        self.loop = os.getenv('REPLAY_LOOP', 'true').lower() == 'true'
+        self.seed = os.getenv('REPLAY_SEED', '42')
+        # Generated walks: seconds between ticks and whether unknown symbols get one at all
+        self.tick_seconds = float(os.getenv('REPLAY_TICK_SECONDS', '60'))
+        self.generate = os.getenv('REPLAY_GENERATE', 'true').lower() == 'true'
+        self.history_points = int(os.getenv('REPLAY_HISTORY_POINTS', '252'))
+        # Fault injection
+        self.latency = float(os.getenv('REPLAY_LATENCY_MS', '0')) / 1000
+        self.jitter = float(os.getenv('REPLAY_LATENCY_JITTER_MS', '0')) / 1000
+        self.error_rate = float(os.getenv('REPLAY_ERROR_RATE', '0'))
+        self.rate_limit = int(os.getenv('REPLAY_RATE_LIMIT_PER_MINUTE', '0'))
+
+        self.series: Dict[str, Series] = load_ticks(self.path) if self.path else {}
+        self.start = min((s.times[0] for s in self.series.values()), default=0.0)
+        self.end = max((s.times[-1] for s in self.series.values()), default=0.0)
+        self.walks: Dict[str, List[float]] = {}
+        self.walk_rngs: Dict[str, random.Random] = {}
+        self.cursors: Dict[str, int] = {}
+        self.started_at = None
+        # Fault decisions come from their own seeded stream so a run's failures repeat too
+        self.faults = random.Random(f'{self.seed}:faults')
+        self.window = deque()
+        self.calls = 0
+        self.injected_errors = 0
+        self.rate_limited = 0
+        if self.series:
+            print(f'Replay provider loaded {len(self.series)} symbols from {self.path}')
+
+    def elapsed(self) -> float:
+        """Replay-clock seconds since the first fetch"""
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        return (time.monotonic() - self.started_at) * self.speed
+
+    def index(self, symbol: str, length: int = None) -> int:
+        """Position of the current tick for a symbol; length bounds recorded series"""
+        if self.speed == 0:
+            position = self.cursors.get(symbol, 0)
+            self.cursors[symbol] = position + 1
+        elif length is None:
+            return int(self.elapsed() // self.tick_seconds)
+        else:
+            series = self.series[symbol]
+            span = self.end - self.start
+            offset = self.elapsed()
+            if self.loop and span > 0:
+                offset %= span + self.tick_seconds
+            position = max(bisect_right(series.times, self.start + offset) - 1, 0)
+        if length is None:
+            return position
+        return position % length if self.loop else min(position, length - 1)
+
+    def walk(self, symbol: str, index: int) -> List[float]:
+        """Generated prices up to index, extended lazily and identical for a given seed and symbol"""
+        prices = self.walks.get(symbol)
+        if prices is None:
+            self.walk_rngs[symbol] = random.Random(f'{self.seed}:{symbol}')
+            prices = self.walks[symbol] = [round(self.walk_rngs[symbol].uniform(20, 500), 2)]
+        rng = self.walk_rngs[symbol]
+        while len(prices) <= index:
+            prices.append(round(prices[-1] * math.exp(rng.gauss(0, 0.002)), 4))
+        return prices
+
+    async def inject_faults(self, symbol: str):
+        if self.rate_limit:
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            if len(self.window) >= self.rate_limit:
+                self.rate_limited += 1
+                raise RateLimitedError(f'Rate limited fetching {symbol}')
+            self.window.append(now)
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(self.faults.gauss(self.latency, self.jitter), 0))
+        if self.error_rate and self.faults.random() < self.error_rate:
+            self.injected_errors += 1
+            raise ProviderError(f'Injected failure fetching {symbol}')
+
+    async def fetch_quote(self, symbol: str) -> Dict:
+        self.calls += 1
+        await self.inject_faults(symbol)
+
+        key = symbol.upper()
+        series = self.series.get(key)
+        if series:
+            i = self.index(key, len(series.prices))
+            price, volume = series.prices[i], series.volumes[i]
+            previous = series.prices[i - 1] if i > 0 else price
+        elif self.generate:
+            i = self.index(key)
+            prices = self.walk(key, i)
+            price, volume = prices[i], 1_000_000
+            previous = prices[i - 1] if i > 0 else price
+        else:
+            raise InvalidSymbolError(f'Unknown symbol {symbol}')
+
+        change = price - previous
+        return {
+            'symbol': symbol,
+            'price': round(price, 4),
+            'volume': volume,
+            'change': round(change, 4),
+            'changePercent': round(change / previous * 100, 4) if previous else 0.0,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def history_times(self, interval: str) -> List[datetime]:
+        """Bar times for a generated history: weekday closes, or intraday bars up to now"""
+        times = []
+        if interval == 'daily':
+            current = datetime.combine(datetime.now().date(), datetime.min.time()).replace(hour=16)
+            while len(times) < self.history_points:
+                current -= timedelta(days=1)
+                if current.weekday() < 5:
+                    times.append(current)
+        else:
+            step = timedelta(minutes=int(interval.replace('min', '')))
+            current = datetime.now().replace(second=0, microsecond=0)
+            current -= timedelta(minutes=current.minute % (step.seconds // 60))
+            for _ in range(self.history_points):
+                times.append(current)
+                current -= step
+        return list(reversed(times))
+
+    async def fetch_history(self, symbol: str, interval: str = 'daily') -> List[Dict]:
+        """Recorded ticks for the symbol, or a generated walk that ends where its live quotes start"""
+        self.calls += 1
+        await self.inject_faults(symbol)
+
+        key = symbol.upper()
+        series = self.series.get(key)
+        if series:
+            return [{
+                'price': price,
+                'volume': volume,
+                'timestamp': datetime.fromtimestamp(stamp).isoformat(sep=' ')
+            } for stamp, price, volume in zip(series.times, series.prices, series.volumes)]
+        if not self.generate:
+            raise InvalidSymbolError(f'Unknown symbol {symbol}')
+
+        # Walk backwards from the first live price so history and quotes join up
+        rng = random.Random(f'{self.seed}:{key}:{interval}')
+        times = self.history_times(interval)
+        volatility = 0.015 if interval == 'daily' else 0.002
+        prices = [self.walk(key, 0)[0]]
+        for _ in range(len(times) - 1):
+            prices.append(round(prices[-1] / math.exp(rng.gauss(0, volatility)), 4))
+        prices.reverse()
+        return [{
+            'price': price,
+            'volume': rng.randint(100_000, 20_000_000),
+            'timestamp': stamp.isoformat(sep=' ')
+        } for stamp, price in zip(times, prices)]
+
+    def get_stats(self) -> Dict:
+        return {
+            'provider': self.name,
+            'file': self.path or None,
+            'recordedSymbols': len(self.series),
+            'generatedSymbols': len(self.walks),
+            'speed': self.speed,
+            'replaySeconds': round(self.elapsed(), 2) if self.started_at is not None else 0,
+            'calls': self.calls,
+            'injectedErrors': self.injected_errors,
+            'rateLimited': self.rate_limited
+        }
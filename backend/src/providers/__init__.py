@@ -0,0 +1 @@
+# Providers module
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from ..config.database import get_db
 from ..models.Alert import Alert
+from ..services.AlertService import get_alert_service
 
 router = APIRouter()
+alert_service = get_alert_service()
 
 class CreateAlertRequest(BaseModel):
     portfolioId: int
@@ -16,6 +18,9 @@ class CreateAlertRequest(BaseModel):
 async def create_alert(request: CreateAlertRequest, conn=Depends(get_db)):
     """Create a new alert"""
     try:
+        if request.condition not in ('above', 'below'):
+            raise HTTPException(status_code=400, detail="Condition must be 'above' or 'below'")
+        
         alert = Alert.create(
             conn,
             request.portfolioId,
@@ -24,10 +29,18 @@ async def create_alert(request: CreateAlertRequest, conn=Depends(get_db)):
             request.condition,
             request.email
         )
+        alert_service.add_alert(alert)
         return alert
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/engine/stats")
+async def get_alert_engine_stats():
+    """Get alert evaluation throughput and latency"""
+    return alert_service.get_stats()
+
 @router.get("/{portfolio_id}")
 async def get_alerts(portfolio_id: int, conn=Depends(get_db)):
     """Get all active alerts for a portfolio"""
@@ -42,6 +55,7 @@ async def deactivate_alert(alert_id: int, conn=Depends(get_db)):
     """Deactivate an alert"""
     try:
         alert = Alert.deactivate(conn, alert_id)
+        alert_service.remove_alert(alert_id)
         return alert
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -51,6 +65,7 @@ async def delete_alert(alert_id: int, conn=Depends(get_db)):
     """Delete an alert"""
     try:
         Alert.delete(conn, alert_id)
+        alert_service.remove_alert(alert_id)
         return {"message": "Alert deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,8 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from ..config.database import get_db
 from ..models.Holding import Holding
+from ..services.PerformanceService import get_performance_service
+from ..services.LiveHub import get_live_hub
+from ..services.ValuationService import get_valuation_service
 
 router = APIRouter()
+performance_service = get_performance_service()
+live_hub = get_live_hub()
+valuation_service = get_valuation_service()
+
+async def holdings_changed(conn, portfolio_id: int):
+    """Refresh everything derived from a portfolio's holdings"""
+    performance_service.bump_holdings_version(portfolio_id)
+    await valuation_service.rebuild(conn, portfolio_id)
+    live_hub.holdings_changed(portfolio_id)
 
 class AddHoldingRequest(BaseModel):
     portfolioId: int
@@ -29,6 +41,7 @@ async def add_holding(request: AddHoldingRequest, conn=Depends(get_db)):
             request.quantity,
             request.purchasePrice
         )
+        await holdings_changed(conn, request.portfolioId)
         return holding
     except HTTPException:
         raise
@@ -49,6 +62,8 @@ async def update_holding(holding_id: int, request: UpdateHoldingRequest, conn=De
     """Update a holding"""
     try:
         holding = Holding.update(conn, holding_id, request.quantity, request.purchasePrice)
+        if holding:
+            await holdings_changed(conn, holding['portfolio_id'])
         return holding
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -57,7 +72,10 @@ async def update_holding(holding_id: int, request: UpdateHoldingRequest, conn=De
 async def delete_holding(holding_id: int, conn=Depends(get_db)):
     """Delete a holding"""
     try:
+        holding = Holding.find_by_id(conn, holding_id)
         Holding.delete(conn, holding_id)
+        if holding:
+            await holdings_changed(conn, holding['portfolio_id'])
         return {"message": "Holding deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,28 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from ..services.BatchValuationService import get_batch_valuation_service
+
+router = APIRouter()
+batch_valuation_service = get_batch_valuation_service()
+
+@router.post("/revaluations")
+async def run_revaluation():
+    """Revalue every portfolio now and store the snapshot"""
+    try:
+        # Loading holdings and vectorized math block; keep them off the event loop
+        return await asyncio.to_thread(batch_valuation_service.run_with_connection)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/revaluations/latest")
+async def get_latest_revaluation(portfolioIds: str = Query(default='')):
+    """Latest batch revaluation metadata, plus results for the given comma-separated portfolio ids"""
+    try:
+        portfolio_ids = [int(portfolio_id) for portfolio_id in portfolioIds.split(',') if portfolio_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="portfolioIds must be comma-separated integers")
+
+    try:
+        return batch_valuation_service.get_snapshot(portfolio_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
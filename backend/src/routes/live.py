@@ -0,0 +1,99 @@
+import os
+import json
+import asyncio
+from typing import List
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from psycopg2.pool import PoolError
+from ..services.LiveHub import get_live_hub
+
+router = APIRouter()
+live_hub = get_live_hub()
+
+SSE_KEEPALIVE_SECONDS = float(os.getenv('LIVE_SSE_KEEPALIVE', '15'))
+
+def parse_symbols(value: str) -> List[str]:
+    return [symbol.strip().upper() for symbol in value.split(',') if symbol.strip()]
+
+def parse_portfolios(value: str) -> List[int]:
+    return [int(portfolio_id) for portfolio_id in value.split(',') if portfolio_id.strip()]
+
+async def send_messages(websocket: WebSocket, connection):
+    """Drain a connection's outbox onto its socket"""
+    while True:
+        await websocket.send_text(await connection.queue.get())
+
+@router.websocket("/ws")
+async def live_socket(websocket: WebSocket):
+    """Live price ticks and valuation deltas.
+
+    Clients send {"action": "subscribe" | "unsubscribe", "symbols": [...], "portfolios": [...]}.
+    """
+    await websocket.accept()
+    connection = live_hub.connect()
+    sender = asyncio.create_task(send_messages(websocket, connection))
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message.get('action')
+                symbols = [str(symbol) for symbol in message.get('symbols', [])]
+                portfolios = [int(portfolio_id) for portfolio_id in message.get('portfolios', [])]
+                if action == 'subscribe':
+                    live_hub.subscribe(connection, symbols, portfolios)
+                elif action == 'unsubscribe':
+                    live_hub.unsubscribe(connection, symbols, portfolios)
+                else:
+                    raise ValueError('action must be "subscribe" or "unsubscribe"')
+                connection.send(json.dumps({
+                    'type': 'subscriptions',
+                    'symbols': sorted(connection.symbols),
+                    'portfolios': sorted(connection.portfolios)
+                }))
+            except (ValueError, TypeError, AttributeError, PoolError) as e:
+                connection.send(json.dumps({'type': 'error', 'message': str(e)}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_hub.disconnect(connection)
+
+@router.get("/sse")
+async def live_events(symbols: str = Query(default=''), portfolios: str = Query(default='')):
+    """Server-sent events fallback for clients that cannot open a WebSocket"""
+    try:
+        connection = live_hub.connect()
+        live_hub.subscribe(connection, parse_symbols(symbols), parse_portfolios(portfolios))
+    except ValueError as e:
+        live_hub.disconnect(connection)
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolError as e:
+        live_hub.disconnect(connection)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        live_hub.disconnect(connection)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(connection.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'data: {message}\n\n'
+        finally:
+            live_hub.disconnect(connection)
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@router.get("/stats")
+async def get_live_stats():
+    """Connected clients and subscriptions on this worker"""
+    return live_hub.get_stats()
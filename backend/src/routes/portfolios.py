@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
 from ..config.database import get_db
 from ..models.Portfolio import Portfolio
 from ..models.Holding import Holding
 from ..services.RiskService import get_risk_service
+from ..services.PerformanceService import get_performance_service, RESOLUTIONS
+from ..services.CorrelationService import get_correlation_service
+from ..services.ValuationService import get_valuation_service
 
 router = APIRouter()
 risk_service = get_risk_service()
+performance_service = get_performance_service()
+correlation_service = get_correlation_service()
+valuation_service = get_valuation_service()
 
 class CreatePortfolioRequest(BaseModel):
     name: str
@@ -40,8 +46,7 @@ async def get_portfolios(conn=Depends(get_db)):
         enriched = []
         for p in portfolios:
             try:
-                holdings = Holding.find_by_portfolio_id(conn, p['id'])
-                portfolio_value = await risk_service.calculate_portfolio_value(conn, holdings)
+                portfolio_value = await valuation_service.get_valuation(conn, p['id'])
                 enriched.append({**p, **portfolio_value})
             except Exception:
                 # If calculation fails for a portfolio, still include base portfolio
@@ -60,8 +65,7 @@ async def get_portfolio(portfolio_id: int, conn=Depends(get_db)):
         if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
-        portfolio_value = await risk_service.calculate_portfolio_value(conn, holdings)
+        portfolio_value = await valuation_service.get_valuation(conn, portfolio_id)
         
         return {
             **portfolio,
@@ -82,23 +86,62 @@ async def get_portfolio_with_analytics(portfolio_id: int, conn=Depends(get_db)):
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
         holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
-        portfolio_value = await risk_service.calculate_portfolio_value(conn, holdings)
+        portfolio_value = await valuation_service.get_valuation(conn, portfolio_id)
         beta = await risk_service.calculate_portfolio_beta(conn, holdings)
         var_data = await risk_service.calculate_value_at_risk(conn, holdings)
-        sectors = await risk_service.analyze_sector_concentration(conn, holdings)
+        sectors = await risk_service.analyze_concentration(conn, holdings, 'sector', portfolio_value)
+        industries = await risk_service.analyze_concentration(conn, holdings, 'industry', portfolio_value)
+        exchanges = await risk_service.analyze_concentration(conn, holdings, 'exchange', portfolio_value)
         
         return {
             **portfolio,
             **portfolio_value,
             'beta': beta,
             **var_data,
-            'sectors': sectors
+            'sectors': sectors,
+            'industries': industries,
+            'exchanges': exchanges
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{portfolio_id}/performance")
+async def get_portfolio_performance(portfolio_id: int, resolution: str = Query(default='1M'), conn=Depends(get_db)):
+    """Get portfolio value, P&L and drawdown time series"""
+    try:
+        if resolution not in RESOLUTIONS:
+            raise HTTPException(status_code=400, detail=f"Resolution must be one of {', '.join(RESOLUTIONS)}")
+        
+        portfolio = Portfolio.find_by_id(conn, portfolio_id)
+        
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
+        return performance_service.calculate_performance(conn, portfolio_id, holdings, resolution)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{portfolio_id}/correlation")
+async def get_portfolio_correlation(portfolio_id: int, window: int = Query(default=90, ge=2, le=365), conn=Depends(get_db)):
+    """Get the correlation matrix of daily returns between holdings"""
+    try:
+        portfolio = Portfolio.find_by_id(conn, portfolio_id)
+        
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
+        return correlation_service.calculate_correlation_matrix(conn, holdings, window)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/{portfolio_id}")
 async def update_portfolio(portfolio_id: int, request: UpdatePortfolioRequest, conn=Depends(get_db)):
     """Update portfolio"""
@@ -113,6 +156,7 @@ async def delete_portfolio(portfolio_id: int, conn=Depends(get_db)):
     """Delete portfolio"""
     try:
         Portfolio.delete(conn, portfolio_id)
+        valuation_service.drop(portfolio_id)
         return {"message": "Portfolio deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
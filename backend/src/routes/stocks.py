@@ -1,10 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from datetime import datetime
+from typing import Optional
 from ..config.database import get_db
-from ..services.StockService import get_stock_service
+from ..services.StockService import get_stock_service, QuoteUnavailableError
+from ..services.PollingScheduler import get_price_poller
+from ..services.CircuitBreaker import CircuitOpenError
+from ..providers.QuoteProvider import InvalidSymbolError
+from ..services.Downsample import downsample as downsample_series, METHODS as DOWNSAMPLE_METHODS
 
 router = APIRouter()
 stock_service = get_stock_service()
+price_poller = get_price_poller()
+
+@router.get("/polling/status")
+async def get_polling_status():
+    """Get polling priorities, target refresh intervals and per-symbol staleness"""
+    try:
+        return price_poller.get_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{symbol}")
 async def get_stock_price(symbol: str, conn=Depends(get_db)):
@@ -12,15 +26,32 @@ async def get_stock_price(symbol: str, conn=Depends(get_db)):
     try:
         price_data = await stock_service.get_stock_price(symbol, conn)
         return price_data
+    except InvalidSymbolError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (CircuitOpenError, QuoteUnavailableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def check_downsample(method: str):
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"Downsample must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+
 @router.get("/{symbol}/history")
-async def get_price_history(symbol: str, limit: int = Query(default=100), conn=Depends(get_db)):
-    """Get price history for a symbol"""
+async def get_price_history(
+    symbol: str,
+    limit: int = Query(default=100),
+    maxPoints: Optional[int] = Query(default=None, ge=4),
+    downsample: str = Query(default='lttb'),
+    conn=Depends(get_db)
+):
+    """Get price history for a symbol, reduced to maxPoints for charting if given"""
     try:
+        check_downsample(downsample)
         history = stock_service.get_price_history(conn, symbol, limit)
-        return history
+        return downsample_series(history, maxPoints, downsample)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -29,16 +60,21 @@ async def get_price_history_range(
     symbol: str,
     startDate: str = Query(...),
     endDate: str = Query(...),
+    maxPoints: Optional[int] = Query(default=None, ge=4),
+    downsample: str = Query(default='lttb'),
     conn=Depends(get_db)
 ):
-    """Get price history for a symbol within a date range"""
+    """Get price history for a symbol within a date range, reduced to maxPoints for charting if given"""
     try:
         from ..models.PriceHistory import PriceHistory
         
+        check_downsample(downsample)
         start = datetime.fromisoformat(startDate)
         end = datetime.fromisoformat(endDate)
         
         history = PriceHistory.find_by_symbol_and_date_range(conn, symbol, start, end)
-        return history
+        return downsample_series(history, maxPoints, downsample)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,48 +1,46 @@
 import os
+import time
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from .config.database import db
 from .config.redis import redis_client
-from .services.StockService import get_stock_service
+from .config.metrics import HTTP_REQUEST_DURATION, monitor_event_loop, render_metrics, mark_process_dead
+from .config import tracing
+from .config.tracing import get_trace_exporter
 from .services.AlertService import get_alert_service
-from .routes import portfolios, holdings, stocks, alerts
+from .services.StockService import get_stock_service
+from .services.SymbolIndex import get_symbol_index
+from .services.EmailDispatcher import get_email_dispatcher
+from .services.ClusterMembership import get_cluster_membership
+from .services.ClusterBus import get_cluster_bus
+from .services.Scheduler import get_job_scheduler
+from .services.PollingScheduler import get_price_poller
+from .services.TickStream import get_tick_stream, WORKER_GROUP_PREFIX
+from .services.LiveHub import get_live_hub
+from .services.BatchValuationService import get_batch_valuation_service
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.tracing import TracingMiddleware
+from .routes import portfolios, holdings, stocks, alerts, live, internal
 
 load_dotenv()
 
-# Background task for price updates
-async def price_update_loop():
-    """Background task for updating stock prices"""
-    stock_service = get_stock_service()
-    default_symbols = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA']
-    update_interval = int(os.getenv('STOCK_UPDATE_INTERVAL', '30000')) / 1000  # Convert ms to seconds
-    
-    print(f'Starting price update loop for {len(default_symbols)} symbols every {update_interval}s')
-    
-    while True:
-        conn = db.get_connection()
-        try:
-            for symbol in default_symbols:
-                try:
-                    await stock_service.get_stock_price(symbol, conn)
-                    # Rate limit: wait between requests
-                    await asyncio.sleep(0.2)
-                except Exception as e:
-                    print(f'Failed to update price for {symbol}: {e}')
-        finally:
-            db.return_connection(conn)
-        
-        await asyncio.sleep(update_interval)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     print("Starting Stock Portfolio Tracker API...")
     
+    # Watch for blocking work on the event loop
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    
+    # Export finished trace spans when TRACE_EXPORTER is set
+    trace_exporter = get_trace_exporter()
+    trace_exporter.start()
+    
     # Connect to database
     db.connect()
     print("Connected to PostgreSQL")
@@ -51,21 +49,68 @@ async def lifespan(app: FastAPI):
     redis_client.connect()
     print("Connected to Redis")
     
-    # Start background tasks
-    price_task = asyncio.create_task(price_update_loop())
+    # Load symbol reference data
+    symbol_index = get_symbol_index()
+    symbol_index.start()
+    
+    # Join the cluster so symbols are partitioned across live workers
+    cluster_membership = get_cluster_membership()
+    cluster_membership.start()
+    cluster_bus = get_cluster_bus()
+    cluster_bus.start()
+    
+    # Start background jobs; each runs on exactly one process cluster-wide
+    job_scheduler = get_job_scheduler()
+    tick_stream = get_tick_stream()
+    worker_group = f'{WORKER_GROUP_PREFIX}{cluster_membership.worker_id}'
+    if tick_stream.enabled:
+        # Quotes are fetched by the ingestion worker (python -m src.ingest); fan its ticks out locally
+        tick_stream.consume(worker_group, cluster_membership.worker_id, tick_stream.deliver_locally)
+        job_scheduler.register(
+            'tick_stream_gc',
+            lambda: asyncio.to_thread(tick_stream.prune_worker_groups, cluster_membership.members()),
+            60
+        )
+    else:
+        poll_tick = float(os.getenv('POLL_TICK_SECONDS', '1'))
+        job_scheduler.register('price_poll', get_price_poller().poll, poll_tick)
+    batch_valuation_service = get_batch_valuation_service()
+    job_scheduler.register(
+        'batch_revaluation',
+        lambda: asyncio.to_thread(batch_valuation_service.run_with_connection),
+        batch_valuation_service.interval
+    )
+    job_scheduler.start()
+    
+    # Start email dispatch workers before anything can trigger alerts
+    email_dispatcher = get_email_dispatcher()
+    email_dispatcher.start()
     
     # Start alert monitoring
     alert_service = get_alert_service()
-    alert_service.start_monitoring(60000)  # Check every minute
+    alert_service.start_monitoring()
+    
+    # Push ticks and valuation deltas to WebSocket/SSE clients
+    live_hub = get_live_hub()
+    live_hub.start()
     
     yield
     
     # Shutdown
     print("Shutting down...")
-    price_task.cancel()
+    job_scheduler.stop()
+    symbol_index.stop()
     alert_service.stop_monitoring()
+    live_hub.stop()
+    tick_stream.stop(drop_groups=[worker_group] if tick_stream.enabled else [])
+    await email_dispatcher.stop()
+    cluster_bus.stop()
+    cluster_membership.stop()
+    loop_monitor.cancel()
+    await trace_exporter.stop()
     db.close_all()
     redis_client.close()
+    mark_process_dead()
     print("Shutdown complete")
 
 # Create FastAPI app
@@ -85,16 +130,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in profiling: per request via the X-Profile header, sampled, or automatically for slow requests
+if os.getenv('PROFILING_ENABLED', 'false').lower() == 'true':
+    app.add_middleware(ProfilingMiddleware)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Per-route latency histogram, labelled by route template to keep cardinality bounded"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        HTTP_REQUEST_DURATION.labels(
+            request.method, route.path if route else 'unmatched', status
+        ).observe(time.perf_counter() - started)
+
+# Added last so it is outermost: the request span covers every other middleware
+if tracing.ENABLED:
+    app.add_middleware(TracingMiddleware)
+
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "OK", "timestamp": asyncio.get_event_loop().time()}
 
+@app.get("/health/jobs")
+async def job_health():
+    """Leader, run duration and lag for each scheduled job"""
+    return get_job_scheduler().get_stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this worker, or for all workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/health/provider")
+async def provider_health():
+    """Active quote provider, its counters and circuit breaker state"""
+    return get_stock_service().get_provider_stats()
+
+@app.get("/health/ingest")
+async def ingest_health():
+    """Tick stream length and backlog per consumer group"""
+    return get_tick_stream().get_stats()
+
 # Include routers
 app.include_router(portfolios.router, prefix="/api/portfolios", tags=["portfolios"])
 app.include_router(holdings.router, prefix="/api/holdings", tags=["holdings"])
 app.include_router(stocks.router, prefix="/api/stocks", tags=["stocks"])
 app.include_router(alerts.router, prefix="/api/alerts", tags=["alerts"])
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+app.include_router(internal.router, prefix="/api/internal", tags=["internal"])
 
 # 404 handler
 @app.get("/{full_path:path}")
@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Iterable
+
+class ThresholdBook:
+    """Alerts for one symbol and condition, kept sorted by threshold"""
+
+    __slots__ = ('thresholds', 'ids')
+
+    def __init__(self):
+        self.thresholds = array('d')
+        self.ids = array('q')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, threshold: float, alert_id: int):
+        """Insert an alert keeping thresholds sorted"""
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.ids.insert(i, alert_id)
+
+    def remove(self, threshold: float, alert_id: int) -> bool:
+        """Remove an alert, searching only among equal thresholds"""
+        lo = bisect_left(self.thresholds, threshold)
+        hi = bisect_right(self.thresholds, threshold, lo)
+        for i in range(lo, hi):
+            if self.ids[i] == alert_id:
+                del self.thresholds[i]
+                del self.ids[i]
+                return True
+        return False
+
+    def below(self, price: float) -> array:
+        """Ids of alerts with threshold < price"""
+        return self.ids[:bisect_left(self.thresholds, price)]
+
+    def above(self, price: float) -> array:
+        """Ids of alerts with threshold > price"""
+        return self.ids[bisect_right(self.thresholds, price):]
+
+    def nearest(self, price: float):
+        """Threshold closest to price, or None when empty"""
+        if not self.thresholds:
+            return None
+        i = bisect_left(self.thresholds, price)
+        candidates = self.thresholds[max(i - 1, 0):i + 1]
+        return min(candidates, key=lambda threshold: abs(threshold - price))
+
+    def between(self, low: float, high: float) -> array:
+        """Ids of alerts with low <= threshold < high"""
+        return self.ids[bisect_left(self.thresholds, low):bisect_left(self.thresholds, high)]
+
+    def between_right(self, low: float, high: float) -> array:
+        """Ids of alerts with low < threshold <= high"""
+        return self.ids[bisect_right(self.thresholds, low):bisect_right(self.thresholds, high)]
+
+class AlertIndex:
+    """In-memory index of active alerts with O(log n + k) trigger matching"""
+
+    def __init__(self):
+        self.alerts: Dict[int, Dict] = {}
+        self.books: Dict[str, Dict[str, ThresholdBook]] = {}
+        self.last_prices: Dict[str, float] = {}
+        # Alerts added since the last price for their symbol, checked once against the next price
+        self.pending: Dict[str, set] = {}
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def load(self, alerts: Iterable[Dict]):
+        """Replace the index contents with the given active alerts"""
+        self.alerts = {}
+        self.books = {}
+        self.pending = {}
+        for alert in alerts:
+            self.add(alert)
+
+    def add(self, alert: Dict):
+        """Index an active alert"""
+        if not alert or alert.get('is_active') is False or alert.get('condition') not in ('above', 'below'):
+            return
+
+        if alert['id'] in self.alerts:
+            self.remove(alert['id'])
+
+        books = self.books.get(alert['symbol'])
+        if books is None:
+            books = self.books[alert['symbol']] = {'above': ThresholdBook(), 'below': ThresholdBook()}
+
+        books[alert['condition']].add(float(alert['price_threshold']), alert['id'])
+        self.alerts[alert['id']] = alert
+        if alert['symbol'] in self.last_prices:
+            self.pending.setdefault(alert['symbol'], set()).add(alert['id'])
+
+    def remove(self, alert_id: int):
+        """Drop an alert from the index"""
+        alert = self.alerts.pop(alert_id, None)
+        if not alert:
+            return None
+
+        books = self.books.get(alert['symbol'])
+        if books:
+            books[alert['condition']].remove(float(alert['price_threshold']), alert_id)
+            if not len(books['above']) and not len(books['below']):
+                del self.books[alert['symbol']]
+                self.last_prices.pop(alert['symbol'], None)
+        self.pending.get(alert['symbol'], set()).discard(alert_id)
+        return alert
+
+    def symbols(self) -> List[str]:
+        """Symbols that have at least one active alert"""
+        return list(self.books)
+
+    def match(self, symbol: str, price: float) -> List[Dict]:
+        """Alerts whose condition holds at the given price"""
+        books = self.books.get(symbol)
+        if not books:
+            return []
+
+        # 'above' fires when price > threshold, 'below' when price < threshold
+        ids = books['above'].below(price) + books['below'].above(price)
+        return [self.alerts[alert_id] for alert_id in ids]
+
+    def nearest_distance(self, symbol: str, price: float):
+        """Relative distance from price to the closest alert threshold of a symbol"""
+        books = self.books.get(symbol)
+        if not books or not price:
+            return None
+        nearest = [t for t in (books['above'].nearest(price), books['below'].nearest(price)) if t is not None]
+        if not nearest:
+            return None
+        return min(abs(t - price) for t in nearest) / price
+
+    def holds(self, alert: Dict, price: float) -> bool:
+        """Whether an alert's condition holds at the given price"""
+        if alert['condition'] == 'above':
+            return price > alert['price_threshold']
+        return price < alert['price_threshold']
+
+    def observe(self, symbol: str, price: float):
+        """Record a price without evaluating, so crossings stay correct if evaluation moves here later"""
+        if symbol in self.books:
+            self.last_prices[symbol] = price
+            self.pending.pop(symbol, None)
+
+    def crossed(self, symbol: str, price: float, previous: float = None) -> List[Dict]:
+        """Alerts whose condition became true since the previous price for the symbol.
+
+        The first price seen for a symbol behaves like match(). Afterwards only
+        thresholds between the previous and the new price are visited. Callers
+        that carry the previous price with the tick can pass it explicitly.
+        """
+        books = self.books.get(symbol)
+        if not books:
+            return []
+
+        if previous is None:
+            previous = self.last_prices.get(symbol)
+        self.last_prices[symbol] = price
+        if previous is None:
+            self.pending.pop(symbol, None)
+            return self.match(symbol, price)
+
+        if price > previous:
+            ids = books['above'].between(previous, price)
+        elif price < previous:
+            ids = books['below'].between_right(price, previous)
+        else:
+            ids = []
+        crossed = [self.alerts[alert_id] for alert_id in ids]
+
+        pending = self.pending.pop(symbol, None)
+        if pending:
+            seen = set(ids)
+            crossed.extend(
+                self.alerts[alert_id] for alert_id in pending
+                if alert_id not in seen and alert_id in self.alerts and self.holds(self.alerts[alert_id], price)
+            )
+        return crossed
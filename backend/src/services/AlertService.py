@@ -1,17 +1,43 @@
+import time
 import asyncio
+from collections import deque
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 from ..models.Alert import Alert
 from ..services.StockService import get_stock_service
-from ..config.email import get_email_service
+from ..services.AlertIndex import AlertIndex
+from ..services.AlertState import get_alert_state_store
+from ..services.EventBus import get_event_bus, PRICE_TICK
+from ..services.ClusterMembership import get_cluster_membership
+from ..services.ClusterBus import get_cluster_bus, ALERTS_CHANNEL
+from ..services.EmailDispatcher import get_email_dispatcher
+from ..services.TickStream import get_tick_stream, ALERT_GROUP
 from ..config.database import db
+from ..config.metrics import ALERT_EVALUATIONS
 
 class AlertService:
     def __init__(self):
-        self.email_service = get_email_service()
+        self.email_dispatcher = get_email_dispatcher()
         self.stock_service = get_stock_service()
+        self.event_bus = get_event_bus()
+        self.index = AlertIndex()
+        self.state_store = get_alert_state_store()
+        self.membership = get_cluster_membership()
+        self.cluster_bus = get_cluster_bus()
+        self.cluster_bus.on(ALERTS_CHANNEL, self.apply_change)
+        self.tick_stream = get_tick_stream()
+        self.stream_consumer = None
         self.is_monitoring = False
-        self.monitoring_task = None
+        self.evaluation_task = None
+        self.tick_queue = None
+        
+        # Engine stats: counters plus recent evaluation times and latencies (seconds)
+        self.evaluations = 0
+        self.triggered = 0
+        self.suppressed = 0
+        self.skipped = 0
+        self.evaluation_times = deque(maxlen=10000)
+        self.latencies = deque(maxlen=1000)
     
     async def send_alert(self, alert: Dict, current_price: float):
         """Send price alert email"""
@@ -24,82 +50,151 @@ class AlertService:
                 <p><strong>Triggered at:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
             """
             
-            self.email_service.send_email(
+            self.email_dispatcher.enqueue(
                 alert['email'],
                 f"Price Alert: {alert['symbol']} {alert['condition']} ${alert['price_threshold']}",
                 message
             )
             
-            print(f"Alert sent to {alert['email']} for {alert['symbol']}")
+            print(f"Alert queued for {alert['email']} for {alert['symbol']}")
         except Exception as e:
             print(f'Error sending alert email: {e}')
     
-    async def check_alerts(self):
-        """Check all active alerts"""
+    def load_index(self):
+        """Build the in-memory alert index from active alerts"""
+        conn = db.get_connection()
         try:
-            conn = db.get_connection()
-            try:
-                active_alerts = Alert.find_active(conn)
-                
-                if len(active_alerts) == 0:
-                    return
-                
-                # Group by symbol to minimize API calls
-                alerts_by_symbol = {}
-                for alert in active_alerts:
-                    symbol = alert['symbol']
-                    if symbol not in alerts_by_symbol:
-                        alerts_by_symbol[symbol] = []
-                    alerts_by_symbol[symbol].append(alert)
-                
-                # Check each symbol
-                for symbol, alerts in alerts_by_symbol.items():
-                    try:
-                        stock_data = await self.stock_service.get_stock_price(symbol, conn)
-                        current_price = stock_data['price']
-                        
-                        # Check each alert for this symbol
-                        for alert in alerts:
-                            condition_met = (
-                                (alert['condition'] == 'above' and current_price > alert['price_threshold']) or
-                                (alert['condition'] == 'below' and current_price < alert['price_threshold'])
-                            )
-                            
-                            if condition_met:
-                                await self.send_alert(alert, current_price)
-                                # Deactivate alert after sending (optional)
-                                # Alert.deactivate(conn, alert['id'])
-                    except Exception as e:
-                        print(f'Error checking alerts for {symbol}: {e}')
-            finally:
-                db.return_connection(conn)
-        except Exception as e:
-            print(f'Error in alert check: {e}')
+            self.index.load(Alert.find_active(conn))
+            print(f'Alert index loaded with {len(self.index)} active alerts')
+        finally:
+            db.return_connection(conn)
+    
+    def add_alert(self, alert: Dict):
+        """Index a new alert here and on every other worker"""
+        self.index.add(alert)
+        self.cluster_bus.publish(ALERTS_CHANNEL, {'op': 'add', 'alert': alert})
+    
+    def remove_alert(self, alert_id: int):
+        """Drop an alert from the index and forget its firing state, here and on every other worker"""
+        alert = self.index.remove(alert_id)
+        if alert:
+            self.state_store.clear(alert)
+        self.cluster_bus.publish(ALERTS_CHANNEL, {'op': 'remove', 'id': alert_id})
+    
+    def apply_change(self, change: Dict):
+        """Apply an alert change made on another worker"""
+        if change['op'] == 'add':
+            self.index.add(change['alert'])
+        elif change['op'] == 'remove':
+            self.index.remove(change['id'])
+    
+    async def handle_tick(self, tick: Dict):
+        """Evaluate the alerts of one symbol against a new price tick"""
+        symbol = tick['symbol']
+        current_price = tick['price']
+        
+        # Every worker sees every tick; only the symbol's owner evaluates it
+        if not self.membership.owns(symbol):
+            self.index.observe(symbol, current_price)
+            self.skipped += 1
+            ALERT_EVALUATIONS.labels('skipped').inc()
+            return
+        
+        await self.evaluate(tick)
+    
+    async def handle_stream_ticks(self, ticks: List[Dict]):
+        """Evaluate ticks delivered to this worker by the alert-engine consumer group"""
+        # The group hands each tick to one worker, so crossings use the previous price carried by the tick
+        for tick in ticks:
+            await self.evaluate(tick, tick.get('previousPrice'))
     
-    async def monitoring_loop(self, interval_seconds: int = 60):
-        """Monitoring loop for alerts"""
-        while self.is_monitoring:
-            await self.check_alerts()
-            await asyncio.sleep(interval_seconds)
+    async def evaluate(self, tick: Dict, previous: float = None):
+        """Fire the armed alerts a tick crossed"""
+        symbol = tick['symbol']
+        current_price = tick['price']
+        crossed = self.index.crossed(symbol, current_price, previous)
+        
+        # Only armed alerts fire; fired ones re-arm after leaving the hysteresis band and cooling down
+        self.state_store.rearm(symbol, self.index.alerts, current_price)
+        triggered = self.state_store.try_fire(symbol, crossed)
+        for alert in triggered:
+            await self.send_alert(alert, current_price)
+        
+        finished = time.time()
+        self.evaluations += 1
+        self.triggered += len(triggered)
+        self.suppressed += len(crossed) - len(triggered)
+        ALERT_EVALUATIONS.labels('evaluated').inc()
+        ALERT_EVALUATIONS.labels('triggered').inc(len(triggered))
+        ALERT_EVALUATIONS.labels('suppressed').inc(len(crossed) - len(triggered))
+        self.evaluation_times.append(finished)
+        try:
+            tick_time = datetime.fromisoformat(tick['timestamp']).timestamp()
+            self.latencies.append(finished - tick_time)
+        except (KeyError, ValueError):
+            pass
+    
+    def get_stats(self) -> Dict:
+        """Alert engine throughput and tick-to-evaluation latency"""
+        now = time.time()
+        recent = [t for t in self.evaluation_times if now - t <= 60]
+        latencies = sorted(self.latencies)
+        
+        def percentile(pct):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))] * 1000, 2)
+        
+        return {
+            'activeAlerts': len(self.index),
+            'symbols': len(self.index.symbols()),
+            'evaluations': self.evaluations,
+            'triggered': self.triggered,
+            'suppressed': self.suppressed,
+            'skippedNotOwned': self.skipped,
+            'worker': self.membership.worker_id,
+            'workers': len(self.membership.members()),
+            'ownedSymbols': sum(1 for symbol in self.index.symbols() if self.membership.owns(symbol)),
+            'cooldownSeconds': self.state_store.cooldown_seconds,
+            'rearmBand': self.state_store.rearm_band,
+            'evaluationsPerSecond': round(len(recent) / 60, 3),
+            'latencyMs': {
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99)
+            },
+            'queueDepth': self.tick_queue.qsize() if self.tick_queue else 0
+        }
     
-    def start_monitoring(self, interval_ms: int = 60000):
+    def start_monitoring(self):
         """Start alert monitoring"""
         if self.is_monitoring:
             print('Alert monitoring already running')
             return
         
         self.is_monitoring = True
-        interval_seconds = interval_ms / 1000
-        print(f'Starting alert monitoring every {interval_ms}ms')
+        self.load_index()
+        print('Starting alert monitoring on price ticks')
+        
+        if self.tick_stream.enabled:
+            # Ticks come from the ingestion worker; the shared group delivers each one to a single worker
+            self.stream_consumer = self.tick_stream.consume(ALERT_GROUP, self.membership.worker_id, self.handle_stream_ticks)
+            return
         
-        # Create monitoring task
-        self.monitoring_task = asyncio.create_task(self.monitoring_loop(interval_seconds))
+        # Evaluate alerts as ticks are published by StockService; the price poller keeps alerted symbols fresh
+        self.tick_queue = self.event_bus.subscribe(PRICE_TICK)
+        self.evaluation_task = asyncio.create_task(self.event_bus.consume(self.tick_queue, self.handle_tick))
     
     def stop_monitoring(self):
         """Stop alert monitoring"""
-        if self.monitoring_task:
-            self.is_monitoring = False
-            self.monitoring_task.cancel()
+        self.is_monitoring = False
+        if self.stream_consumer and self.stream_consumer.task:
+            self.stream_consumer.task.cancel()
+            self.stream_consumer = None
+            print('Alert monitoring stopped')
+        if self.evaluation_task:
+            self.evaluation_task.cancel()
+            self.event_bus.unsubscribe(PRICE_TICK, self.tick_queue)
             print('Alert monitoring stopped')
 
 # Singleton instance
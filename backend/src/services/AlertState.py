@@ -0,0 +1,123 @@
+import os
+import time
+from typing import Dict, List
+from dotenv import load_dotenv
+from ..config.redis import get_redis
+
+load_dotenv()
+
+# Firing states. Armed alerts have no entry at all, which keeps the store small.
+ARMED = 'armed'
+FIRED = 'fired'
+COOLDOWN = 'cooldown'
+
+STATE_KEY = 'alerts:state'
+
+# Atomically move armed (or cooled-down) alerts to fired, returning the ids that moved.
+# Running as one script means concurrent evaluators can never both fire the same alert.
+FIRE_SCRIPT = """
+local fired = {}
+local now = tonumber(ARGV[1])
+local cooldown = tonumber(ARGV[2])
+for i = 3, #ARGV do
+    local current = redis.call('HGET', KEYS[1], ARGV[i])
+    local eligible = not current
+    if current then
+        local state, fired_at = string.match(current, '^(%a+)|(%d+)$')
+        eligible = state == 'cooldown' and now - tonumber(fired_at) >= cooldown
+    end
+    if eligible then
+        redis.call('HSET', KEYS[1], ARGV[i], 'fired|' .. ARGV[1])
+        redis.call('SADD', KEYS[2], ARGV[i])
+        table.insert(fired, ARGV[i])
+    end
+end
+return fired
+"""
+
+class AlertStateStore:
+    """Per-alert armed/fired/cooldown state with cooldown and re-arm hysteresis, held in Redis"""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.cooldown_seconds = int(os.getenv('ALERT_COOLDOWN_SECONDS', '3600'))
+        # Fraction the price must move back past the threshold before an alert can re-arm
+        self.rearm_band = float(os.getenv('ALERT_REARM_BAND', '0.01'))
+        self.fire_script = self.redis.register_script(FIRE_SCRIPT)
+
+    def fired_key(self, symbol: str) -> str:
+        """Set of alert ids for a symbol that are not armed"""
+        return f'alerts:fired:{symbol}'
+
+    def try_fire(self, symbol: str, alerts: List[Dict], now: int = None) -> List[Dict]:
+        """Transition the given crossed alerts to fired, returning only those that were armed"""
+        if not alerts:
+            return []
+        now = int(now or time.time())
+        fired = self.fire_script(
+            keys=[STATE_KEY, self.fired_key(symbol)],
+            args=[now, self.cooldown_seconds, *[alert['id'] for alert in alerts]]
+        )
+        fired = {int(alert_id) for alert_id in fired}
+        return [alert for alert in alerts if alert['id'] in fired]
+
+    def has_exited_band(self, alert: Dict, price: float) -> bool:
+        """Whether the price has moved back far enough past the threshold to re-arm"""
+        threshold = alert['price_threshold']
+        if alert['condition'] == 'above':
+            return price <= threshold * (1 - self.rearm_band)
+        return price >= threshold * (1 + self.rearm_band)
+
+    def rearm(self, symbol: str, alerts: Dict[int, Dict], price: float, now: int = None):
+        """Advance fired alerts of a symbol towards armed once the price leaves the hysteresis band"""
+        fired_ids = self.redis.smembers(self.fired_key(symbol))
+        if not fired_ids:
+            return
+
+        now = int(now or time.time())
+        fired_ids = list(fired_ids)
+        states = self.redis.hmget(STATE_KEY, fired_ids)
+
+        pipe = self.redis.pipeline()
+        for alert_id, current in zip(fired_ids, states):
+            alert = alerts.get(int(alert_id))
+            if not alert or not current:
+                # Alert was removed or its state expired
+                pipe.srem(self.fired_key(symbol), alert_id)
+                pipe.hdel(STATE_KEY, alert_id)
+                continue
+
+            state, fired_at = current.split('|')
+            if not self.has_exited_band(alert, price):
+                continue
+
+            if now - int(fired_at) >= self.cooldown_seconds:
+                pipe.hdel(STATE_KEY, alert_id)
+                pipe.srem(self.fired_key(symbol), alert_id)
+            elif state == FIRED:
+                pipe.hset(STATE_KEY, alert_id, f'{COOLDOWN}|{fired_at}')
+        pipe.execute()
+
+    def get_state(self, alert_id: int) -> Dict:
+        """Current firing state of an alert"""
+        current = self.redis.hget(STATE_KEY, alert_id)
+        if not current:
+            return {'state': ARMED, 'firedAt': None}
+        state, fired_at = current.split('|')
+        if state == COOLDOWN and time.time() - int(fired_at) >= self.cooldown_seconds:
+            state = ARMED
+        return {'state': state, 'firedAt': int(fired_at)}
+
+    def clear(self, alert: Dict):
+        """Forget the state of a removed alert"""
+        pipe = self.redis.pipeline()
+        pipe.hdel(STATE_KEY, alert['id'])
+        pipe.srem(self.fired_key(alert['symbol']), alert['id'])
+        pipe.execute()
+
+# Singleton instance
+alert_state_store = AlertStateStore()
+
+def get_alert_state_store() -> AlertStateStore:
+    """Get alert state store instance"""
+    return alert_state_store
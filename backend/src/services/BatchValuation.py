@@ -0,0 +1,57 @@
+import numpy as np
+from typing import Dict, NamedTuple
+
+class Positions(NamedTuple):
+    """Sparse portfolio x symbol holdings in COO form with duplicate entries summed"""
+    portfolios: np.ndarray  # portfolio id per row
+    symbols: np.ndarray  # symbol per column
+    row: np.ndarray  # row index per position, sorted
+    col: np.ndarray  # column index per position
+    quantity: np.ndarray
+    cost: np.ndarray
+
+def build_positions(portfolio_ids, symbols, quantities, costs) -> Positions:
+    """Index raw holdings into a portfolio x symbol matrix, merging repeated lots of a symbol"""
+    portfolios, row = np.unique(np.asarray(portfolio_ids, dtype=np.int64), return_inverse=True)
+    # Dictionary coding is much cheaper than sorting an object array of symbol strings
+    codes: Dict[str, int] = {}
+    col = np.fromiter((codes.setdefault(symbol, len(codes)) for symbol in symbols), dtype=np.int64, count=len(symbols))
+    names = np.array(list(codes), dtype=object)
+    width = max(len(names), 1)
+    # One entry per (portfolio, symbol); unique keys also leave positions grouped by portfolio
+    keys, position = np.unique(row.astype(np.int64) * width + col, return_inverse=True)
+    return Positions(
+        portfolios=portfolios,
+        symbols=names,
+        row=keys // width,
+        col=keys % width,
+        quantity=np.bincount(position, weights=np.asarray(quantities, dtype=float), minlength=len(keys)),
+        cost=np.bincount(position, weights=np.asarray(costs, dtype=float), minlength=len(keys))
+    )
+
+def revalue(positions: Positions, prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """Value, cost, P&L per portfolio and allocation per position; NaN prices count as unpriced"""
+    count = len(positions.portfolios)
+    line_prices = prices[positions.col]
+    priced = ~np.isnan(line_prices)
+    line_values = np.where(priced, positions.quantity * np.nan_to_num(line_prices), 0.0)
+
+    values = np.bincount(positions.row, weights=line_values, minlength=count)
+    cost = np.bincount(positions.row, weights=positions.cost, minlength=count)
+    unpriced = np.bincount(positions.row, weights=~priced, minlength=count).astype(int)
+    pnl = values - cost
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pnl_percent = np.where(cost > 0, pnl / cost * 100, 0.0)
+        portfolio_values = values[positions.row]
+        allocation = np.where(portfolio_values > 0, line_values / portfolio_values * 100, 0.0)
+
+    return {
+        'value': values,
+        'cost': cost,
+        'pnl': pnl,
+        'pnlPercent': pnl_percent,
+        'unpriced': unpriced,
+        'lineValue': line_values,
+        'allocation': allocation
+    }
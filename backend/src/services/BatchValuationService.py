@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import numpy as np
+from typing import Dict, List
+from dotenv import load_dotenv
+from ..models.Holding import Holding
+from ..config.database import db
+from ..config.redis import get_redis
+from ..services.BatchValuation import Positions, build_positions, revalue
+
+load_dotenv()
+
+SNAPSHOT_KEY = 'valuations:batch'
+SNAPSHOT_META_KEY = 'valuations:batch:meta'
+
+class BatchValuationService:
+    """Revalues every portfolio at once from a sparse holdings matrix and one price vector"""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.interval = float(os.getenv('BATCH_REVALUATION_INTERVAL', '3600'))
+
+    def load_positions(self, conn) -> Positions:
+        rows = Holding.find_all_positions(conn)
+        if not rows:
+            return build_positions([], [], [], [])
+        portfolio_ids, symbols, quantities, costs = zip(*rows)
+        return build_positions(portfolio_ids, symbols, quantities, costs)
+
+    def load_prices(self, symbols: np.ndarray) -> np.ndarray:
+        """Cached quote per symbol, falling back to the last fetched one; NaN when neither exists"""
+        prices = np.full(len(symbols), np.nan)
+        for start in range(0, len(symbols), 1000):
+            chunk = symbols[start:start + 1000].tolist()
+            pipe = self.redis.pipeline()
+            pipe.mget([f'stock:{symbol}' for symbol in chunk])
+            pipe.mget([f'stock:last:{symbol}' for symbol in chunk])
+            cached, last = pipe.execute()
+            for i, (quote, fallback) in enumerate(zip(cached, last)):
+                if quote or fallback:
+                    prices[start + i] = json.loads(quote or fallback)['price']
+        return prices
+
+    def store_snapshot(self, positions: Positions, result: Dict[str, np.ndarray]):
+        """Write per-portfolio results to Redis"""
+        # Positions are grouped by portfolio, so each portfolio's lines are one contiguous slice
+        bounds = np.searchsorted(positions.row, np.arange(len(positions.portfolios) + 1)).tolist()
+        symbols = positions.symbols[positions.col].tolist()
+        allocations = np.round(result['allocation'], 4).tolist()
+        values, cost, pnl = result['value'].tolist(), result['cost'].tolist(), result['pnl'].tolist()
+        pnl_percent, unpriced = result['pnlPercent'].tolist(), result['unpriced'].tolist()
+
+        entries = {}
+        for i, portfolio_id in enumerate(positions.portfolios.tolist()):
+            entries[portfolio_id] = json.dumps({
+                'totalValue': round(values[i], 2),
+                'totalCostBasis': round(cost[i], 2),
+                'totalPnL': round(pnl[i], 2),
+                'totalPnLPercent': round(pnl_percent[i], 2),
+                'unpricedHoldings': unpriced[i],
+                'allocations': dict(zip(symbols[bounds[i]:bounds[i + 1]], allocations[bounds[i]:bounds[i + 1]]))
+            })
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(SNAPSHOT_KEY)
+        items = list(entries.items())
+        for start in range(0, len(items), 10000):
+            pipe.hset(SNAPSHOT_KEY, mapping=dict(items[start:start + 10000]))
+        pipe.execute()
+
+    def run(self, conn) -> Dict:
+        """Revalue all portfolios and store the snapshot; returns run metadata"""
+        started = time.perf_counter()
+        positions = self.load_positions(conn)
+        loaded = time.perf_counter()
+        prices = self.load_prices(positions.symbols)
+        priced = time.perf_counter()
+        result = revalue(positions, prices)
+        computed = time.perf_counter()
+
+        meta = {
+            'computedAt': time.time(),
+            'portfolios': len(positions.portfolios),
+            'positions': len(positions.row),
+            'symbols': len(positions.symbols),
+            'unpricedSymbols': int(np.isnan(prices).sum()),
+            'totalValue': round(float(result['value'].sum()), 2),
+            'totalCostBasis': round(float(result['cost'].sum()), 2),
+            'timingsMs': {
+                'loadHoldings': round((loaded - started) * 1000, 2),
+                'loadPrices': round((priced - loaded) * 1000, 2),
+                'compute': round((computed - priced) * 1000, 2)
+            }
+        }
+        self.store_snapshot(positions, result)
+        meta['timingsMs']['store'] = round((time.perf_counter() - computed) * 1000, 2)
+        self.redis.set(SNAPSHOT_META_KEY, json.dumps(meta))
+        return meta
+
+    def run_with_connection(self) -> Dict:
+        conn = db.get_connection()
+        try:
+            return self.run(conn)
+        finally:
+            db.return_connection(conn)
+
+    def get_snapshot(self, portfolio_ids: List[int] = None) -> Dict:
+        """Latest run metadata, plus results for the requested portfolios"""
+        meta = self.redis.get(SNAPSHOT_META_KEY)
+        snapshot = {'meta': json.loads(meta) if meta else None}
+        if portfolio_ids:
+            entries = self.redis.hmget(SNAPSHOT_KEY, portfolio_ids)
+            snapshot['portfolios'] = {
+                portfolio_id: json.loads(entry) if entry else None
+                for portfolio_id, entry in zip(portfolio_ids, entries)
+            }
+        return snapshot
+
+# Singleton instance
+batch_valuation_service = BatchValuationService()
+
+def get_batch_valuation_service() -> BatchValuationService:
+    """Get batch valuation service instance"""
+    return batch_valuation_service
@@ -0,0 +1,151 @@
+import time
+from collections import OrderedDict
+from typing import Dict
+from ..config.metrics import (
+    CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS, CIRCUIT_BREAKER_REJECTIONS, SYMBOL_BREAKERS_OPEN
+)
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+
+# Gauge values for circuit_breaker_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """A call was short-circuited because its breaker is open"""
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around calls to one dependency.
+
+    Opens after `failure_threshold` consecutive failures (or at once for a
+    tripping failure such as an exhausted quota). After `reset_timeout`
+    seconds it lets `probes` calls through half-open: a success closes it,
+    a failure opens it again. Rejected calls fail immediately.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30,
+                 probes: int = 1, export: bool = True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        # Per-symbol breakers are too many to label individually
+        self.export = export
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self.probe_started = 0.0
+        if export:
+            CIRCUIT_BREAKER_STATE.labels(name).set(0)
+
+    def transition(self, state: str):
+        if state == self.state:
+            return
+        print(f'Circuit breaker {self.name}: {self.state} -> {state}')
+        self.state = state
+        if self.export:
+            CIRCUIT_BREAKER_STATE.labels(self.name).set(STATE_VALUES[state])
+            CIRCUIT_BREAKER_TRANSITIONS.labels(self.name, state).inc()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; callers must report its outcome"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.transition(HALF_OPEN)
+            self.in_flight = 0
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) must not wedge the breaker
+            if self.in_flight >= self.probes and time.monotonic() - self.probe_started >= self.reset_timeout:
+                self.in_flight = 0
+            if self.in_flight < self.probes:
+                self.in_flight += 1
+                self.probe_started = time.monotonic()
+                return True
+        return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        if not self.allow():
+            CIRCUIT_BREAKER_REJECTIONS.labels(self.name if self.export else 'symbol').inc()
+            raise CircuitOpenError(f'Circuit {self.name} is open')
+
+    def record_success(self):
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.transition(CLOSED)
+
+    def record_failure(self, trip: bool = False):
+        self.failures += 1
+        if self.state == HALF_OPEN or trip or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.in_flight = 0
+            self.transition(OPEN)
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def get_stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutiveFailures': self.failures,
+            'retryInSeconds': round(self.retry_in(), 1)
+        }
+
+class SymbolBreakers:
+    """Per-symbol breakers for symbols that keep failing while the provider itself is healthy.
+
+    Only symbols with recent failures have a breaker; the least recently
+    used closed ones are dropped past `max_size`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, max_size: int = 10000):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_size = max_size
+        self.breakers: 'OrderedDict[str, CircuitBreaker]' = OrderedDict()
+
+    def get(self, symbol: str) -> CircuitBreaker:
+        breaker = self.breakers.get(symbol)
+        if breaker is None:
+            breaker = self.breakers[symbol] = CircuitBreaker(
+                f'symbol:{symbol}', self.failure_threshold, self.reset_timeout, export=False
+            )
+            if len(self.breakers) > self.max_size:
+                for name, candidate in list(self.breakers.items()):
+                    if candidate.state == CLOSED and name != symbol:
+                        del self.breakers[name]
+                        break
+        self.breakers.move_to_end(symbol)
+        return breaker
+
+    def check(self, symbol: str):
+        breaker = self.breakers.get(symbol)
+        if breaker:
+            breaker.check()
+            self.update_gauge()
+
+    def record_success(self, symbol: str):
+        breaker = self.breakers.pop(symbol, None)
+        if breaker and breaker.state != CLOSED:
+            breaker.record_success()
+            self.update_gauge()
+
+    def record_failure(self, symbol: str):
+        self.get(symbol).record_failure()
+        self.update_gauge()
+
+    def open_symbols(self) -> Dict[str, Dict]:
+        return {
+            breaker.name.split(':', 1)[1]: breaker.get_stats()
+            for breaker in self.breakers.values() if breaker.state != CLOSED
+        }
+
+    def update_gauge(self):
+        SYMBOL_BREAKERS_OPEN.set(sum(1 for breaker in self.breakers.values() if breaker.state != CLOSED))
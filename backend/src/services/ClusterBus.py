@@ -0,0 +1,109 @@
+import json
+import time
+import asyncio
+import threading
+from typing import Dict, Callable
+from ..config.redis import get_redis
+from ..services.EventBus import get_event_bus, PRICE_TICK
+from ..services.ClusterMembership import get_cluster_membership
+
+TICKS_CHANNEL = 'cluster:ticks'
+ALERTS_CHANNEL = 'cluster:alerts'
+HOLDINGS_CHANNEL = 'cluster:holdings'
+
+class ClusterBus:
+    """Relays events between workers over Redis pub/sub.
+
+    Locally published price ticks are forwarded to every other worker and
+    re-published on their in-process event bus, so each worker sees every
+    tick regardless of which process fetched it.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.event_bus = get_event_bus()
+        self.membership = get_cluster_membership()
+        self.handlers: Dict[str, Callable[[Dict], None]] = {TICKS_CHANNEL: self.receive_tick}
+        self.loop = None
+        self.thread = None
+        self.running = False
+        self.relay_task = None
+
+    def on(self, channel: str, handler: Callable[[Dict], None]):
+        """Register a handler for messages from other workers; call before start()"""
+        self.handlers[channel] = handler
+
+    def publish(self, channel: str, payload: Dict):
+        """Send a message to every other worker"""
+        message = {'origin': self.membership.worker_id, 'payload': payload}
+        self.redis.publish(channel, json.dumps(message, default=str))
+
+    def receive_tick(self, tick: Dict):
+        """Re-publish a tick fetched by another worker on the local bus"""
+        self.event_bus.publish(PRICE_TICK, {**tick, 'remote': True})
+
+    async def relay_tick(self, tick: Dict):
+        """Forward a tick fetched by this worker to the rest of the cluster"""
+        if tick.get('remote'):
+            return
+        try:
+            self.publish(TICKS_CHANNEL, tick)
+        except Exception as e:
+            print(f'Error relaying tick for {tick.get("symbol")}: {e}')
+
+    async def relay_ticks(self):
+        """Relay every local tick until cancelled"""
+        queue = self.event_bus.subscribe(PRICE_TICK)
+        try:
+            await self.event_bus.consume(queue, self.relay_tick)
+        finally:
+            self.event_bus.unsubscribe(PRICE_TICK, queue)
+
+    def listen(self):
+        """Blocking pub/sub reader; runs in a daemon thread and hands messages to the event loop"""
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(*self.handlers)
+        while self.running:
+            try:
+                message = pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                print(f'Error reading cluster messages: {e}')
+                time.sleep(1)
+                continue
+            if not message:
+                continue
+
+            # A bad message is skipped; letting it escape would end the thread and all cross-worker sync
+            try:
+                data = json.loads(message['data'])
+                if data['origin'] == self.membership.worker_id:
+                    continue
+                handler = self.handlers.get(message['channel'])
+                if handler:
+                    self.loop.call_soon_threadsafe(handler, data['payload'])
+            except Exception as e:
+                print(f'Skipping malformed cluster message on {message.get("channel")}: {e}')
+        pubsub.close()
+
+    def start(self):
+        """Start relaying events between workers"""
+        if self.running:
+            return
+        self.running = True
+        self.loop = asyncio.get_running_loop()
+        self.relay_task = asyncio.create_task(self.relay_ticks())
+        self.thread = threading.Thread(target=self.listen, name='cluster-bus', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop relaying events"""
+        self.running = False
+        if self.relay_task:
+            self.relay_task.cancel()
+
+# Singleton instance
+cluster_bus = ClusterBus()
+
+def get_cluster_bus() -> ClusterBus:
+    """Get cluster bus instance"""
+    return cluster_bus
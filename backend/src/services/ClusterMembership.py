@@ -0,0 +1,108 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import hashlib
+from bisect import bisect_right
+from typing import List, Dict
+from dotenv import load_dotenv
+from ..config.redis import get_redis
+
+load_dotenv()
+
+WORKERS_KEY = 'cluster:workers'
+
+def ring_hash(value: str) -> int:
+    """Stable 64-bit hash shared by every process"""
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, members: List[str], vnodes: int = 160):
+        self.members = sorted(members)
+        points = sorted((ring_hash(f'{member}#{i}'), member) for member in self.members for i in range(vnodes))
+        self.hashes = [point for point, _ in points]
+        self.owners = [member for _, member in points]
+
+    def owner(self, key: str):
+        """Member responsible for a key"""
+        if not self.hashes:
+            return None
+        i = bisect_right(self.hashes, ring_hash(key)) % len(self.hashes)
+        return self.owners[i]
+
+class ClusterMembership:
+    """Tracks live workers via Redis heartbeats and partitions symbols among them"""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.heartbeat_interval = float(os.getenv('CLUSTER_HEARTBEAT_INTERVAL', '5'))
+        self.heartbeat_ttl = float(os.getenv('CLUSTER_HEARTBEAT_TTL', '15'))
+        # A single-member ring until the first heartbeat, so a lone worker owns everything
+        self.ring = HashRing([self.worker_id])
+        self.owner_cache: Dict[str, str] = {}
+        self.heartbeat_task = None
+        self.rebalances = 0
+
+    def heartbeat(self):
+        """Publish this worker's heartbeat and refresh the ring if membership changed"""
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zadd(WORKERS_KEY, {self.worker_id: now})
+        pipe.zremrangebyscore(WORKERS_KEY, '-inf', now - self.heartbeat_ttl)
+        pipe.zrange(WORKERS_KEY, 0, -1)
+        members = pipe.execute()[2]
+
+        if sorted(members) != self.ring.members:
+            self.ring = HashRing(members)
+            self.owner_cache = {}
+            self.rebalances += 1
+            print(f'Cluster membership changed: {len(members)} live workers')
+
+    def owns(self, key: str) -> bool:
+        """Whether this worker is responsible for a key (e.g. a symbol)"""
+        owner = self.owner_cache.get(key)
+        if owner is None:
+            owner = self.owner_cache[key] = self.ring.owner(key)
+        return owner == self.worker_id
+
+    def members(self) -> List[str]:
+        """Live workers as of the last heartbeat"""
+        return self.ring.members
+
+    async def heartbeat_loop(self):
+        """Heartbeat until cancelled"""
+        while True:
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f'Error sending cluster heartbeat: {e}')
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def start(self):
+        """Join the cluster"""
+        if self.heartbeat_task:
+            return
+        self.heartbeat()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat_loop())
+        print(f'Joined cluster as {self.worker_id}')
+
+    def stop(self):
+        """Leave the cluster so peers rebalance immediately"""
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+        try:
+            self.redis.zrem(WORKERS_KEY, self.worker_id)
+        except Exception as e:
+            print(f'Error leaving cluster: {e}')
+
+# Singleton instance
+cluster_membership = ClusterMembership()
+
+def get_cluster_membership() -> ClusterMembership:
+    """Get cluster membership instance"""
+    return cluster_membership
@@ -0,0 +1,125 @@
+import json
+import numpy as np
+from datetime import datetime, timedelta
+from typing import List, Dict
+from ..models.PriceHistory import PriceHistory
+from ..services.PerformanceService import align_series, to_epoch
+from ..config.redis import get_redis
+from ..services.TickDedup import HISTORY_VERSION_KEY
+from ..config.metrics import CACHE_REQUESTS
+from ..config.tracing import traced
+
+DAY_SECONDS = 86400
+
+class CorrelationService:
+    def __init__(self):
+        self.redis = get_redis()
+        self.cache_ttl = 3600
+
+    def pair_key(self, symbol_a: str, symbol_b: str, window: int) -> str:
+        """Cache key for a symbol pair, independent of pair order"""
+        first, second = sorted((symbol_a, symbol_b))
+        return f'corr:{window}:{first}:{second}'
+
+    def window_end(self) -> datetime:
+        """Start of the current, still incomplete, daily bucket; correlations use only the days before it"""
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @traced()
+    def compute_pairs(self, conn, symbols: List[str], pairs: List[tuple], window: int, end_date: datetime) -> Dict[tuple, Dict]:
+        """Compute correlations of daily returns over the completed days before end_date"""
+        start_date = end_date - timedelta(days=window + 1)
+        grid = np.arange(to_epoch(start_date), to_epoch(end_date), DAY_SECONDS, dtype=np.int64)
+
+        rows = PriceHistory.find_bucketed_by_symbols(
+            conn, symbols, start_date, end_date - timedelta(microseconds=1), DAY_SECONDS
+        )
+        seeds = {row['symbol']: row['price'] for row in PriceHistory.get_latest_prices_before(conn, symbols, start_date)}
+        prices = align_series(grid, symbols, rows, seeds)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(prices), axis=0)
+
+        # Standardize each column once; a pair's correlation is then a dot product
+        valid = ~np.isnan(returns).any(axis=0)
+        std = returns.std(axis=0)
+        usable = valid & (std > 0)
+        z = np.zeros_like(returns)
+        z[:, usable] = (returns[:, usable] - returns[:, usable].mean(axis=0)) / std[usable]
+
+        column = {symbol: i for i, symbol in enumerate(symbols)}
+        results = {}
+        for symbol_a, symbol_b in pairs:
+            a, b = column[symbol_a], column[symbol_b]
+            corr = None
+            if usable[a] and usable[b] and len(returns) > 1:
+                corr = round(float(np.clip(z[:, a] @ z[:, b] / len(returns), -1, 1)), 4)
+            results[(symbol_a, symbol_b)] = {'corr': corr, 'n': len(returns)}
+
+        return results
+
+    @traced()
+    def calculate_correlation_matrix(self, conn, holdings: List[Dict], window: int = 90) -> Dict:
+        """Calculate the holdings correlation matrix, recomputing only pairs whose inputs changed"""
+        symbols = sorted({holding['symbol'] for holding in holdings})
+        pairs = [(symbols[i], symbols[j]) for i in range(len(symbols)) for j in range(i + 1, len(symbols))]
+
+        if not pairs:
+            return {'symbols': symbols, 'window': window, 'format': 'condensed', 'values': [], 'recomputed': 0}
+
+        # A pair is current for the same window end while neither symbol gained rows in the completed
+        # days: new days move the latest date, backfills into older days bump the history version.
+        # Intraday ticks only touch today's bucket, which the window leaves out
+        end_date = self.window_end()
+        latest = PriceHistory.get_latest_dates(conn, symbols, end_date)
+        history_versions = dict(zip(symbols, self.redis.hmget(HISTORY_VERSION_KEY, symbols)))
+        versions = {
+            symbol: [latest[symbol].isoformat() if latest.get(symbol) else None, history_versions[symbol]]
+            for symbol in symbols
+        }
+        day = end_date.date().isoformat()
+
+        keys = [self.pair_key(a, b, window) for a, b in pairs]
+        cached = self.redis.mget(keys)
+
+        values = {}
+        stale = []
+        outdated = 0
+        for pair, entry in zip(pairs, cached):
+            if entry:
+                entry = json.loads(entry)
+                if entry.get('versions') == [day, versions[pair[0]], versions[pair[1]]]:
+                    values[pair] = entry['corr']
+                    continue
+                outdated += 1
+            stale.append(pair)
+        CACHE_REQUESTS.labels('correlation', 'hit').inc(len(values))
+        CACHE_REQUESTS.labels('correlation', 'stale').inc(outdated)
+        CACHE_REQUESTS.labels('correlation', 'miss').inc(len(stale) - outdated)
+
+        if stale:
+            stale_symbols = sorted({symbol for pair in stale for symbol in pair})
+            computed = self.compute_pairs(conn, stale_symbols, stale, window, end_date)
+
+            pipe = self.redis.pipeline()
+            for pair, stats in computed.items():
+                values[pair] = stats['corr']
+                stats['versions'] = [day, versions[pair[0]], versions[pair[1]]]
+                pipe.setex(self.pair_key(pair[0], pair[1], window), self.cache_ttl, json.dumps(stats))
+            pipe.execute()
+
+        return {
+            'symbols': symbols,
+            'window': window,
+            # Row-major upper triangle without the diagonal, as in scipy's squareform
+            'format': 'condensed',
+            'values': [values[pair] for pair in pairs],
+            'recomputed': len(stale)
+        }
+
+# Singleton instance
+correlation_service = CorrelationService()
+
+def get_correlation_service() -> CorrelationService:
+    """Get correlation service instance"""
+    return correlation_service
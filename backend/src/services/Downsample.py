@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Dict, List
+
+METHODS = ('lttb', 'minmax')
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps, first and last included.
+
+    Bucket bounds and averages are computed for all buckets at once; only the
+    choice within each bucket, which depends on the point picked before it,
+    runs bucket by bucket over array slices.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Seconds since the first point keep triangle areas well conditioned
+    x = x - x[0]
+
+    # The n - 2 interior points split into threshold - 2 non-empty buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    # Each bucket's triangle closes on the next bucket's average, the last one on the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = starts[i], ends[i]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def first_match(values: np.ndarray, targets: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+    """Index of the first element per bucket equal to that bucket's target"""
+    matches = np.flatnonzero(values == targets[bucket])
+    _, first = np.unique(bucket[matches], return_index=True)
+    return matches[first]
+
+def min_max(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of each bucket's lowest and highest point plus the endpoints, in order"""
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    if n <= max_points or buckets < 1:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    lows = first_match(y, np.minimum.reduceat(y, edges[:-1]), bucket)
+    highs = first_match(y, np.maximum.reduceat(y, edges[:-1]), bucket)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+def downsample(rows: List[Dict], max_points: int, method: str = 'lttb') -> List[Dict]:
+    """At most max_points of a price series ({'price', 'date'} rows, oldest first), keeping its shape"""
+    if method not in METHODS:
+        raise ValueError(f'Unsupported downsampling method {method}')
+    if not max_points or len(rows) <= max_points:
+        return rows
+    y = np.fromiter((row['price'] for row in rows), dtype=float, count=len(rows))
+    if method == 'minmax':
+        keep = min_max(y, max_points)
+    else:
+        x = np.fromiter((row['date'].timestamp() for row in rows), dtype=float, count=len(rows))
+        keep = lttb(x, y, max_points)
+    return [rows[i] for i in keep.tolist()]
@@ -0,0 +1,170 @@
+import os
+import time
+import smtplib
+import asyncio
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from ..config.email import get_email_service
+
+load_dotenv()
+
+class SmtpSession:
+    """One reusable SMTP connection owned by a single dispatch worker"""
+
+    def __init__(self, email_service, idle_timeout: float):
+        self.email_service = email_service
+        self.idle_timeout = idle_timeout
+        self.server: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def send(self, to: str, subject: str, html_content: str):
+        """Send a message, (re)connecting only when needed. Runs in a worker thread."""
+        if self.server and time.monotonic() - self.last_used > self.idle_timeout:
+            # Servers drop idle sessions; reconnect instead of failing on the next send
+            self.close()
+        if not self.server:
+            self.server = self.email_service.open_connection()
+
+        message = self.email_service.build_message(to, subject, html_content)
+        try:
+            self.server.send_message(message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.close()
+            raise
+        self.last_used = time.monotonic()
+
+    def close(self):
+        """Close the connection, ignoring errors from a dead socket"""
+        if self.server:
+            try:
+                self.server.quit()
+            except Exception:
+                self.server.close()
+            self.server = None
+
+class EmailDispatcher:
+    """Bounded email queue drained by workers that reuse their SMTP sessions"""
+
+    def __init__(self):
+        self.email_service = get_email_service()
+        self.worker_count = int(os.getenv('EMAIL_WORKERS', '2'))
+        self.max_queue_size = int(os.getenv('EMAIL_QUEUE_SIZE', '1000'))
+        self.max_retries = int(os.getenv('EMAIL_MAX_RETRIES', '3'))
+        self.retry_backoff = float(os.getenv('EMAIL_RETRY_BACKOFF', '1.0'))
+        self.idle_timeout = float(os.getenv('EMAIL_IDLE_TIMEOUT', '60'))
+        # Seconds to hold a recipient's messages so they go out as one digest; 0 disables
+        self.digest_window = float(os.getenv('EMAIL_DIGEST_WINDOW', '0'))
+        self.queue: Optional[asyncio.Queue] = None
+        self.pending: Dict[str, List[Dict]] = {}
+        self.workers = []
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0, 'digests': 0}
+
+    def start(self):
+        """Start the dispatch workers"""
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.workers = [asyncio.create_task(self.worker(i)) for i in range(self.worker_count)]
+        print(f'Email dispatcher started with {self.worker_count} workers')
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush pending digests, wait briefly for the queue to drain and stop the workers"""
+        if not self.workers:
+            return
+        for to in list(self.pending):
+            self.flush(to)
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f'Email dispatcher stopped with {self.queue.qsize()} messages unsent')
+        for task in self.workers:
+            task.cancel()
+        self.workers = []
+
+    def enqueue(self, to: str, subject: str, html_content: str) -> bool:
+        """Queue a message without blocking the caller"""
+        if not self.workers:
+            # Dispatcher not running (e.g. one-off scripts): send inline
+            return self.email_service.send_email(to, subject, html_content)
+
+        message = {'subject': subject, 'html': html_content}
+        self.stats['queued'] += 1
+
+        if self.digest_window <= 0:
+            return self.put(to, [message])
+
+        if to in self.pending:
+            self.pending[to].append(message)
+            return True
+
+        self.pending[to] = [message]
+        asyncio.get_running_loop().call_later(self.digest_window, self.flush, to)
+        return True
+
+    def flush(self, to: str):
+        """Move a recipient's held messages onto the send queue"""
+        messages = self.pending.pop(to, None)
+        if messages:
+            self.put(to, messages)
+
+    def put(self, to: str, messages: List[Dict]) -> bool:
+        """Put a batch on the queue, dropping it if the queue is full"""
+        try:
+            self.queue.put_nowait((to, messages))
+            return True
+        except asyncio.QueueFull:
+            self.stats['dropped'] += len(messages)
+            print(f'Email queue full, dropping {len(messages)} messages for {to}')
+            return False
+
+    def compose(self, messages: List[Dict]):
+        """Merge several messages for one recipient into a digest"""
+        if len(messages) == 1:
+            return messages[0]['subject'], messages[0]['html']
+
+        self.stats['digests'] += 1
+        subject = f'{len(messages)} Price Alerts Triggered'
+        items = ''.join(f"<h3>{m['subject']}</h3>{m['html']}<hr/>" for m in messages)
+        return subject, f'<h2>{subject}</h2>{items}'
+
+    async def worker(self, worker_id: int):
+        """Send queued messages over this worker's own SMTP session"""
+        session = SmtpSession(self.email_service, self.idle_timeout)
+        try:
+            while True:
+                to, messages = await self.queue.get()
+                try:
+                    subject, html_content = self.compose(messages)
+                    await self.deliver(session, to, subject, html_content, len(messages))
+                finally:
+                    self.queue.task_done()
+        finally:
+            session.close()
+
+    async def deliver(self, session: SmtpSession, to: str, subject: str, html_content: str, count: int):
+        """Send one message with exponential backoff between attempts"""
+        if self.email_service.transport == 'console':
+            self.email_service.send_email(to, subject, html_content)
+            self.stats['sent'] += count
+            return
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(session.send, to, subject, html_content)
+                self.stats['sent'] += count
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.stats['failed'] += count
+                    print(f'Error sending email to {to} after {attempt + 1} attempts: {e}')
+                    return
+                self.stats['retries'] += 1
+                await asyncio.to_thread(session.close)
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+# Singleton instance
+email_dispatcher = EmailDispatcher()
+
+def get_email_dispatcher() -> EmailDispatcher:
+    """Get email dispatcher instance"""
+    return email_dispatcher
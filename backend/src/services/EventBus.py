@@ -0,0 +1,52 @@
+import asyncio
+from typing import Dict, List, Callable, Awaitable
+from ..config.tracing import span, current_context
+
+class EventBus:
+    """In-process publish/subscribe over bounded asyncio queues"""
+
+    def __init__(self, max_queue_size: int = 10000):
+        self.max_queue_size = max_queue_size
+        self.subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        """Register a new subscriber queue for a topic"""
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.subscribers.setdefault(topic, []).append(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        """Remove a subscriber queue"""
+        queues = self.subscribers.get(topic, [])
+        if queue in queues:
+            queues.remove(queue)
+
+    def publish(self, topic: str, event: Dict):
+        """Deliver an event to every subscriber without blocking the publisher"""
+        for queue in self.subscribers.get(topic, []):
+            if queue.full():
+                # Slow subscriber: drop its oldest event rather than stall ingestion
+                queue.get_nowait()
+            # The publisher's trace context travels with the event so handlers continue its trace
+            queue.put_nowait((event, current_context()))
+
+    async def consume(self, queue: asyncio.Queue, handler: Callable[[Dict], Awaitable[None]]):
+        """Run a handler for every event on a subscriber queue"""
+        name = getattr(handler, '__qualname__', 'event handler')
+        while True:
+            event, context = await queue.get()
+            try:
+                with span(name, 'consumer', parent=context):
+                    await handler(event)
+            except Exception as e:
+                print(f'Error handling event: {e}')
+
+# Topic for normalized quote ticks ({'symbol', 'price', 'volume', 'timestamp', ...})
+PRICE_TICK = 'price.tick'
+
+# Singleton instance
+event_bus = EventBus()
+
+def get_event_bus() -> EventBus:
+    """Get event bus instance"""
+    return event_bus
@@ -0,0 +1,262 @@
+import os
+import json
+import asyncio
+from typing import Dict, List, Set, Iterable
+from dotenv import load_dotenv
+from ..models.Holding import Holding
+from ..config.database import db
+from ..config.redis import get_redis
+from ..services.EventBus import get_event_bus, PRICE_TICK
+from ..services.ClusterBus import get_cluster_bus, HOLDINGS_CHANNEL
+
+load_dotenv()
+
+class LiveConnection:
+    """One WebSocket or SSE client: its subscriptions and a bounded outbox of serialized messages"""
+
+    def __init__(self, max_queue_size: int):
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.symbols: Set[str] = set()
+        self.portfolios: Set[int] = set()
+        self.dropped = 0
+
+    def send(self, message: str):
+        """Queue a message without blocking; a slow client loses its oldest messages"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+class PortfolioBook:
+    """Per-symbol quantity, cost and last price of a subscribed portfolio, kept current by ticks"""
+
+    def __init__(self, portfolio_id: int, holdings: List[Dict], prices: Dict[str, float]):
+        self.portfolio_id = portfolio_id
+        self.lines: Dict[str, Dict] = {}
+        for holding in holdings:
+            line = self.lines.setdefault(holding['symbol'], {'quantity': 0.0, 'costBasis': 0.0, 'price': None})
+            line['quantity'] += float(holding['quantity'])
+            line['costBasis'] += float(holding['quantity']) * float(holding['purchase_price'])
+        for symbol, line in self.lines.items():
+            line['price'] = prices.get(symbol)
+        self.total_cost = sum(line['costBasis'] for line in self.lines.values())
+        self.total_value = sum(line['quantity'] * line['price'] for line in self.lines.values() if line['price'] is not None)
+
+    def apply(self, symbol: str, price: float) -> float:
+        """Move one line to a new price and return the change in portfolio value"""
+        line = self.lines[symbol]
+        delta = line['quantity'] * (price - line['price'] if line['price'] is not None else price)
+        line['price'] = price
+        self.total_value += delta
+        return delta
+
+    def totals(self) -> Dict:
+        pnl = self.total_value - self.total_cost
+        return {
+            'totalValue': round(self.total_value, 2),
+            'totalCostBasis': round(self.total_cost, 2),
+            'totalPnL': round(pnl, 2),
+            'totalPnLPercent': round(pnl / self.total_cost * 100, 2) if self.total_cost > 0 else 0
+        }
+
+    def snapshot(self) -> Dict:
+        return {
+            'portfolioId': self.portfolio_id,
+            **self.totals(),
+            'lines': [{
+                'symbol': symbol,
+                'quantity': line['quantity'],
+                'price': line['price'],
+                'value': round(line['quantity'] * line['price'], 2) if line['price'] is not None else None
+            } for symbol, line in sorted(self.lines.items())]
+        }
+
+class LiveHub:
+    """Pushes price ticks and portfolio valuation deltas to subscribed clients on this worker.
+
+    Every worker's event bus already receives every tick through the cluster
+    bus (or the tick stream), so one bus subscription per worker is fanned out
+    in-process. Idle connections cost a small queue and no Redis traffic.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.event_bus = get_event_bus()
+        self.cluster_bus = get_cluster_bus()
+        self.cluster_bus.on(HOLDINGS_CHANNEL, self.reload_portfolio)
+        self.max_queue_size = int(os.getenv('LIVE_QUEUE_SIZE', '100'))
+        self.max_subscriptions = int(os.getenv('LIVE_MAX_SUBSCRIPTIONS', '200'))
+        self.connections: Set[LiveConnection] = set()
+        self.symbol_subscribers: Dict[str, Set[LiveConnection]] = {}
+        self.portfolio_subscribers: Dict[int, Set[LiveConnection]] = {}
+        self.books: Dict[int, PortfolioBook] = {}
+        # Subscribed portfolios holding each symbol
+        self.symbol_portfolios: Dict[str, Set[int]] = {}
+        self.tick_queue = None
+        self.task = None
+
+    def connect(self) -> LiveConnection:
+        connection = LiveConnection(self.max_queue_size)
+        self.connections.add(connection)
+        return connection
+
+    def disconnect(self, connection: LiveConnection):
+        self.unsubscribe(connection, list(connection.symbols), list(connection.portfolios))
+        self.connections.discard(connection)
+
+    def current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Cached quote per symbol, falling back to the last fetched one"""
+        if not symbols:
+            return {}
+        pipe = self.redis.pipeline()
+        pipe.mget([f'stock:{symbol}' for symbol in symbols])
+        pipe.mget([f'stock:last:{symbol}' for symbol in symbols])
+        cached, last = pipe.execute()
+        prices = {}
+        for symbol, quote, fallback in zip(symbols, cached, last):
+            if quote or fallback:
+                prices[symbol] = json.loads(quote or fallback)['price']
+        return prices
+
+    def load_book(self, portfolio_id: int) -> PortfolioBook:
+        """Build a portfolio's book from its holdings and current prices"""
+        # Runs on the event loop: fail fast rather than block it waiting for a connection
+        conn = db.get_connection(wait=False)
+        try:
+            holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
+        finally:
+            db.return_connection(conn)
+        return PortfolioBook(portfolio_id, holdings, self.current_prices(sorted({h['symbol'] for h in holdings})))
+
+    def index_book(self, book: PortfolioBook):
+        self.books[book.portfolio_id] = book
+        for symbol in book.lines:
+            self.symbol_portfolios.setdefault(symbol, set()).add(book.portfolio_id)
+
+    def unindex_book(self, portfolio_id: int):
+        book = self.books.pop(portfolio_id, None)
+        if not book:
+            return
+        for symbol in book.lines:
+            portfolios = self.symbol_portfolios.get(symbol)
+            if portfolios:
+                portfolios.discard(portfolio_id)
+                if not portfolios:
+                    del self.symbol_portfolios[symbol]
+
+    def subscribe(self, connection: LiveConnection, symbols: Iterable[str] = (), portfolios: Iterable[int] = ()):
+        """Add subscriptions; each new portfolio gets a valuation snapshot first"""
+        symbols = {symbol.upper() for symbol in symbols} - connection.symbols
+        portfolios = set(portfolios) - connection.portfolios
+        if len(connection.symbols) + len(connection.portfolios) + len(symbols) + len(portfolios) > self.max_subscriptions:
+            raise ValueError(f'At most {self.max_subscriptions} subscriptions per connection')
+
+        for symbol in symbols:
+            self.symbol_subscribers.setdefault(symbol, set()).add(connection)
+        connection.symbols |= symbols
+
+        for portfolio_id in portfolios:
+            if portfolio_id not in self.books:
+                self.index_book(self.load_book(portfolio_id))
+            self.portfolio_subscribers.setdefault(portfolio_id, set()).add(connection)
+            connection.send(json.dumps({'type': 'snapshot', **self.books[portfolio_id].snapshot()}))
+        connection.portfolios |= portfolios
+
+    def unsubscribe(self, connection: LiveConnection, symbols: Iterable[str] = (), portfolios: Iterable[int] = ()):
+        """Drop subscriptions, forgetting portfolio books nobody on this worker watches"""
+        for symbol in symbols:
+            symbol = symbol.upper()
+            connection.symbols.discard(symbol)
+            subscribers = self.symbol_subscribers.get(symbol)
+            if subscribers:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.symbol_subscribers[symbol]
+
+        for portfolio_id in portfolios:
+            connection.portfolios.discard(portfolio_id)
+            subscribers = self.portfolio_subscribers.get(portfolio_id)
+            if subscribers:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.portfolio_subscribers[portfolio_id]
+                    self.unindex_book(portfolio_id)
+
+    def broadcast(self, subscribers: Iterable[LiveConnection], message: Dict):
+        # Serialize once however many clients receive it
+        payload = json.dumps(message, default=str)
+        for connection in subscribers:
+            connection.send(payload)
+
+    async def handle_tick(self, tick: Dict):
+        """Forward a tick to symbol subscribers and a valuation delta to portfolio subscribers"""
+        symbol = tick['symbol']
+        subscribers = self.symbol_subscribers.get(symbol)
+        if subscribers:
+            self.broadcast(subscribers, {
+                'type': 'tick',
+                **{key: value for key, value in tick.items() if key not in ('remote', 'previousPrice')}
+            })
+
+        for portfolio_id in self.symbol_portfolios.get(symbol, ()):
+            book = self.books[portfolio_id]
+            delta = book.apply(symbol, tick['price'])
+            if not delta:
+                continue
+            line = book.lines[symbol]
+            self.broadcast(self.portfolio_subscribers.get(portfolio_id, ()), {
+                'type': 'valuation',
+                'portfolioId': portfolio_id,
+                'symbol': symbol,
+                'price': tick['price'],
+                'value': round(line['quantity'] * tick['price'], 2),
+                'delta': round(delta, 2),
+                **book.totals(),
+                'timestamp': tick.get('timestamp')
+            })
+
+    def reload_portfolio(self, change: Dict):
+        """Rebuild a watched portfolio's book after its holdings changed"""
+        portfolio_id = change['portfolioId']
+        if portfolio_id not in self.portfolio_subscribers:
+            return
+        try:
+            self.unindex_book(portfolio_id)
+            self.index_book(self.load_book(portfolio_id))
+        except Exception as e:
+            print(f'Error reloading portfolio {portfolio_id}: {e}')
+            return
+        self.broadcast(self.portfolio_subscribers[portfolio_id], {'type': 'snapshot', **self.books[portfolio_id].snapshot()})
+
+    def holdings_changed(self, portfolio_id: int):
+        """Refresh live valuations of a portfolio here and on every other worker"""
+        self.reload_portfolio({'portfolioId': portfolio_id})
+        self.cluster_bus.publish(HOLDINGS_CHANNEL, {'portfolioId': portfolio_id})
+
+    def get_stats(self) -> Dict:
+        return {
+            'connections': len(self.connections),
+            'symbols': len(self.symbol_subscribers),
+            'portfolios': len(self.books),
+            'dropped': sum(connection.dropped for connection in self.connections)
+        }
+
+    def start(self):
+        """Start fanning ticks out to clients"""
+        if self.task:
+            return
+        self.tick_queue = self.event_bus.subscribe(PRICE_TICK)
+        self.task = asyncio.create_task(self.event_bus.consume(self.tick_queue, self.handle_tick))
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            self.event_bus.unsubscribe(PRICE_TICK, self.tick_queue)
+
+# Singleton instance
+live_hub = LiveHub()
+
+def get_live_hub() -> LiveHub:
+    """Get live hub instance"""
+    return live_hub
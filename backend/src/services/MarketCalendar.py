@@ -0,0 +1,110 @@
+import os
+import json
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from ..services.SymbolIndex import get_symbol_index
+
+load_dotenv()
+
+DEFAULT_CALENDAR = os.path.join(os.path.dirname(__file__), '..', 'config', 'market_calendar.json')
+
+def parse_time(value: str) -> time:
+    hours, minutes = value.split(':')
+    return time(int(hours), int(minutes))
+
+class ExchangeCalendar:
+    """Regular sessions, weekends, holidays and early closes for one exchange"""
+
+    def __init__(self, name: str, config: Dict):
+        self.name = name
+        self.tz = ZoneInfo(config['timezone'])
+        self.open = parse_time(config['open'])
+        self.close = parse_time(config['close'])
+        self.holidays = {date.fromisoformat(d) for d in config.get('holidays', [])}
+        self.early_closes = {date.fromisoformat(d): parse_time(t) for d, t in config.get('earlyCloses', {}).items()}
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Open and close times for a trading day, or None if the market is closed all day"""
+        if day.weekday() >= 5 or day in self.holidays:
+            return None
+        close = self.early_closes.get(day, self.close)
+        return datetime.combine(day, self.open, self.tz), datetime.combine(day, close, self.tz)
+
+    def is_open(self, now: datetime) -> bool:
+        """Whether the regular session is in progress"""
+        local = now.astimezone(self.tz)
+        session = self.session(local.date())
+        return bool(session) and session[0] <= local < session[1]
+
+    def next_open(self, now: datetime) -> datetime:
+        """Start of the next regular session after now"""
+        local = now.astimezone(self.tz)
+        day = local.date()
+        for _ in range(15):
+            session = self.session(day)
+            if session and session[0] > local:
+                return session[0]
+            day += timedelta(days=1)
+        # Calendar gap longer than two weeks; treat as open tomorrow rather than never
+        return datetime.combine(local.date() + timedelta(days=1), self.open, self.tz)
+
+class MarketCalendar:
+    """Market-hours policy for quote caching and polling, loaded from a local calendar file"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('MARKET_CALENDAR_PATH', DEFAULT_CALENDAR)
+        self.symbol_index = get_symbol_index()
+        self.open_ttl = int(os.getenv('QUOTE_TTL_OPEN', '300'))
+        self.closed_ttl_max = int(os.getenv('QUOTE_TTL_CLOSED_MAX', '43200'))
+        self.warmup = timedelta(minutes=float(os.getenv('MARKET_WARMUP_MINUTES', '15')))
+        self.exchanges: Dict[str, ExchangeCalendar] = {}
+        self.default = None
+        self.load()
+
+    def load(self):
+        """Read exchange calendars from the calendar file"""
+        with open(self.path) as f:
+            config = json.load(f)
+
+        raw = config['exchanges']
+        for name, exchange in raw.items():
+            self.exchanges[name] = ExchangeCalendar(name, raw[exchange['same_as']] if 'same_as' in exchange else exchange)
+        self.default = self.exchanges[config['default']]
+
+    def for_symbol(self, symbol: str) -> ExchangeCalendar:
+        """Calendar of the exchange a symbol trades on"""
+        exchange = self.symbol_index.lookup(symbol, 'exchange', None)
+        return self.exchanges.get(exchange, self.default)
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def is_open(self, symbol: str, now: datetime = None) -> bool:
+        """Whether the symbol's market is in its regular session"""
+        return self.for_symbol(symbol).is_open(now or self.now())
+
+    def warmup_start(self, symbol: str, now: datetime = None) -> datetime:
+        """When the pre-open warm-up fetch for the next session becomes due"""
+        return self.for_symbol(symbol).next_open(now or self.now()) - self.warmup
+
+    def in_warmup(self, symbol: str, now: datetime = None) -> bool:
+        """Whether we are inside the warm-up window before the next open"""
+        now = now or self.now()
+        return not self.is_open(symbol, now) and now >= self.warmup_start(symbol, now)
+
+    def quote_ttl(self, symbol: str, now: datetime = None) -> int:
+        """Cache lifetime for a quote: short while trading, until the warm-up fetch while closed"""
+        now = now or self.now()
+        if self.is_open(symbol, now):
+            return self.open_ttl
+        until_warmup = (self.warmup_start(symbol, now) - now).total_seconds()
+        return int(min(max(until_warmup, self.open_ttl), self.closed_ttl_max))
+
+# Singleton instance
+market_calendar = MarketCalendar()
+
+def get_market_calendar() -> MarketCalendar:
+    """Get market calendar instance"""
+    return market_calendar
@@ -0,0 +1,140 @@
+import json
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict
+from ..models.PriceHistory import PriceHistory
+from ..config.metrics import CACHE_REQUESTS
+from ..config.redis import get_redis
+from ..config.tracing import traced
+
+# Chart window and grid step (seconds) for each supported resolution
+RESOLUTIONS = {
+    '1D': {'span': timedelta(days=1), 'step': 300},
+    '1W': {'span': timedelta(weeks=1), 'step': 1800},
+    '1M': {'span': timedelta(days=30), 'step': 14400},
+    '1Y': {'span': timedelta(days=365), 'step': 86400},
+}
+
+def to_epoch(value: datetime) -> int:
+    """Convert a naive timestamp to epoch seconds the way Postgres does"""
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+def forward_fill(grid: np.ndarray, times: np.ndarray, prices: np.ndarray, seed: float = np.nan) -> np.ndarray:
+    """Sample a price series on a time grid, carrying the last observation forward"""
+    if len(times) == 0:
+        return np.full(len(grid), seed, dtype=float)
+
+    idx = np.searchsorted(times, grid, side='right') - 1
+    filled = prices[np.clip(idx, 0, None)]
+
+    # Before the first observation fall back to the seed, or the first observed price
+    fallback = seed if not np.isnan(seed) else prices[0]
+    return np.where(idx >= 0, filled, fallback)
+
+def align_series(grid: np.ndarray, symbols: List[str], rows: List[Dict], seeds: Dict[str, float] = None) -> np.ndarray:
+    """Build a (len(grid) x len(symbols)) price matrix from bucketed rows sorted by symbol and bucket"""
+    seeds = seeds or {}
+    matrix = np.full((len(grid), len(symbols)), np.nan)
+
+    by_symbol = {}
+    for row in rows:
+        by_symbol.setdefault(row['symbol'], []).append((row['bucket'], row['price']))
+
+    for col, symbol in enumerate(symbols):
+        series = by_symbol.get(symbol, [])
+        times = np.array([t for t, _ in series], dtype=np.int64)
+        prices = np.array([p for _, p in series], dtype=float)
+        matrix[:, col] = forward_fill(grid, times, prices, seeds.get(symbol, np.nan))
+
+    return matrix
+
+class PerformanceService:
+    def __init__(self):
+        self.redis = get_redis()
+
+    def get_holdings_version(self, portfolio_id: int) -> int:
+        """Get the current holdings version for a portfolio"""
+        version = self.redis.get(f'portfolio:{portfolio_id}:holdings_version')
+        return int(version) if version else 0
+
+    def bump_holdings_version(self, portfolio_id: int) -> int:
+        """Invalidate cached performance series after holdings change"""
+        return self.redis.incr(f'portfolio:{portfolio_id}:holdings_version')
+
+    @traced()
+    def calculate_performance(self, conn, portfolio_id: int, holdings: List[Dict], resolution: str = '1M') -> Dict:
+        """Calculate the portfolio value, P&L and drawdown series for a chart resolution"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f'Unsupported resolution {resolution}')
+
+        version = self.get_holdings_version(portfolio_id)
+        cache_key = f'portfolio:{portfolio_id}:performance:{resolution}:v{version}'
+        cached = self.redis.get(cache_key)
+        if cached:
+            CACHE_REQUESTS.labels('performance', 'hit').inc()
+            return json.loads(cached)
+        CACHE_REQUESTS.labels('performance', 'miss').inc()
+
+        step = RESOLUTIONS[resolution]['step']
+        end_date = datetime.now()
+        start_date = end_date - RESOLUTIONS[resolution]['span']
+        start_epoch = to_epoch(start_date)
+        end_epoch = to_epoch(end_date)
+        grid = np.arange(start_epoch - start_epoch % step, end_epoch - end_epoch % step + 1, step, dtype=np.int64)
+
+        # Aggregate lots so each symbol is a single column
+        quantities_by_symbol = {}
+        cost_basis = 0.0
+        for holding in holdings:
+            symbol = holding['symbol']
+            quantities_by_symbol[symbol] = quantities_by_symbol.get(symbol, 0.0) + float(holding['quantity'])
+            cost_basis += float(holding['quantity']) * float(holding['purchase_price'])
+
+        symbols = sorted(quantities_by_symbol)
+        quantities = np.array([quantities_by_symbol[s] for s in symbols], dtype=float)
+
+        if symbols:
+            rows = PriceHistory.find_bucketed_by_symbols(conn, symbols, start_date, end_date, step)
+            seeds = {row['symbol']: row['price'] for row in PriceHistory.get_latest_prices_before(conn, symbols, start_date)}
+            prices = align_series(grid, symbols, rows, seeds)
+
+            # Symbols without any history are carried at their average purchase price
+            purchase_prices = {}
+            for holding in holdings:
+                purchase_prices.setdefault(holding['symbol'], []).append(float(holding['purchase_price']))
+            missing = np.isnan(prices)
+            if missing.any():
+                fallback = np.array([np.mean(purchase_prices[s]) for s in symbols])
+                prices = np.where(missing, fallback, prices)
+
+            values = prices @ quantities
+        else:
+            values = np.zeros(len(grid))
+
+        pnl = values - cost_basis
+        running_peak = np.maximum.accumulate(values) if len(values) else values
+        drawdown = np.divide(values, running_peak, out=np.ones_like(values), where=running_peak > 0) - 1
+
+        result = {
+            'portfolioId': portfolio_id,
+            'resolution': resolution,
+            'step': step,
+            'costBasis': round(cost_basis, 2),
+            'timestamps': np.datetime_as_string(grid.astype('datetime64[s]')).tolist(),
+            'value': np.round(values, 2).tolist(),
+            'pnl': np.round(pnl, 2).tolist(),
+            'drawdown': np.round(drawdown, 4).tolist(),
+            'maxDrawdown': round(float(drawdown.min()), 4) if len(drawdown) else 0
+        }
+
+        # Cache until the next grid point is due
+        self.redis.setex(cache_key, max(step, 60), json.dumps(result))
+
+        return result
+
+# Singleton instance
+performance_service = PerformanceService()
+
+def get_performance_service() -> PerformanceService:
+    """Get performance service instance"""
+    return performance_service
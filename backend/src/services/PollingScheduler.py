@@ -0,0 +1,230 @@
+import os
+import json
+import time
+from typing import Dict, List
+from dotenv import load_dotenv
+from ..models.Holding import Holding
+from ..models.Alert import Alert
+from ..services.StockService import get_stock_service, REQUESTS_KEY, REFRESHED_KEY
+from ..services.AlertService import get_alert_service
+from ..services.MarketCalendar import get_market_calendar
+from ..config.database import db
+from ..config.redis import get_redis
+from ..config.metrics import PROVIDER_QUOTA_REMAINING
+
+load_dotenv()
+
+STATUS_KEY = 'poller:status'
+
+def allocate_rates(priorities: Dict[str, float], budget: float, max_rate: float) -> Dict[str, float]:
+    """Split a refresh budget (calls/s) across symbols in proportion to priority.
+
+    Symbols that would exceed max_rate are capped and the excess is handed to
+    the others (water-filling), so the whole budget is used when possible.
+    """
+    rates = {}
+    remaining = dict(priorities)
+    left = budget
+    while remaining and left > 1e-12:
+        total = sum(remaining.values())
+        if total <= 0:
+            break
+        capped = {s: max_rate for s, p in remaining.items() if left * p / total >= max_rate}
+        if not capped:
+            rates.update({s: left * p / total for s, p in remaining.items()})
+            break
+        rates.update(capped)
+        left -= max_rate * len(capped)
+        for symbol in capped:
+            del remaining[symbol]
+    return rates
+
+class PricePoller:
+    """Refreshes held and alerted symbols by priority within the provider rate limit"""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.stock_service = get_stock_service()
+        self.alert_index = get_alert_service().index
+        self.market_calendar = get_market_calendar()
+        self.calls_per_minute = float(os.getenv('PROVIDER_CALLS_PER_MINUTE', '5'))
+        self.min_interval = float(os.getenv('POLL_MIN_INTERVAL', '15'))
+        self.plan_interval = float(os.getenv('POLL_PLAN_INTERVAL', '30'))
+        self.weights = {
+            'value': float(os.getenv('POLL_WEIGHT_VALUE', '0.5')),
+            'alert': float(os.getenv('POLL_WEIGHT_ALERT', '0.3')),
+            'demand': float(os.getenv('POLL_WEIGHT_DEMAND', '0.2')),
+        }
+        # Every symbol keeps a small share of the budget so none starves
+        self.base_priority = 0.05
+        self.plan: Dict[str, Dict] = {}
+        self.planned_at = 0.0
+        self.tokens = 1.0
+        self.tokens_at = time.monotonic()
+        # Last poll attempt per symbol, so a symbol whose fetches keep failing cannot hog the budget
+        self.attempted: Dict[str, float] = {}
+
+    def last_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Last cached price per symbol"""
+        cached = self.redis.mget([f'stock:{symbol}' for symbol in symbols])
+        return {symbol: json.loads(value)['price'] for symbol, value in zip(symbols, cached) if value}
+
+    def compute_priorities(self, conn) -> Dict[str, Dict]:
+        """Score the live universe of held, alerted and recently requested symbols"""
+        # Halve request counts every planning cycle so demand reflects recent traffic
+        pipe = self.redis.pipeline()
+        pipe.zrangebyscore(REQUESTS_KEY, 1, '+inf', withscores=True)
+        pipe.zunionstore(REQUESTS_KEY, {REQUESTS_KEY: 0.5})
+        requests = dict(pipe.execute()[0])
+
+        quantities = Holding.find_quantities_by_symbol(conn)
+        # Requested symbols matter when API workers only serve ingested quotes (INGEST_MODE=stream)
+        symbols = sorted(set(quantities) | set(Alert.find_active_symbols(conn)) | set(requests))
+        if not symbols:
+            return {}
+
+        prices = self.last_prices(symbols)
+
+        values = {s: quantities.get(s, 0) * prices[s] for s in symbols if s in prices}
+        max_value = max(values.values(), default=0) or 1
+        max_requests = max(requests.values(), default=0) or 1
+
+        scores = {}
+        for symbol in symbols:
+            # Held symbols without any quote yet are treated as most valuable so they get one soon
+            value = values[symbol] / max_value if symbol in values else (1.0 if symbol in quantities else 0.0)
+            distance = self.alert_index.nearest_distance(symbol, prices.get(symbol))
+            if distance is not None:
+                proximity = 1 / (1 + distance / 0.01)
+            else:
+                # Alerted but not priced yet counts as close to a threshold
+                proximity = 1.0 if symbol in self.alert_index.books else 0.0
+            demand = requests.get(symbol, 0) / max_requests
+
+            scores[symbol] = {
+                'priority': round(self.base_priority
+                                  + self.weights['value'] * value
+                                  + self.weights['alert'] * proximity
+                                  + self.weights['demand'] * demand, 4),
+                'value': round(value, 4),
+                'alertProximity': round(proximity, 4),
+                'demand': round(demand, 4)
+            }
+        return scores
+
+    def replan(self, conn):
+        """Recompute priorities and target refresh intervals"""
+        scores = self.compute_priorities(conn)
+        # Closed markets get no share of the budget; their warm-up fetch is handled in poll()
+        rates = allocate_rates(
+            {symbol: score['priority'] for symbol, score in scores.items() if self.market_calendar.is_open(symbol)},
+            self.calls_per_minute / 60,
+            1 / self.min_interval
+        )
+        self.plan = {
+            symbol: {**score, 'interval': 1 / rates[symbol] if rates.get(symbol) else None}
+            for symbol, score in scores.items()
+        }
+        self.planned_at = time.monotonic()
+
+    def take_token(self) -> bool:
+        """Token bucket matching the provider's per-minute limit"""
+        now = time.monotonic()
+        rate = self.calls_per_minute / 60
+        self.tokens = min(max(1.0, rate * 5), self.tokens + (now - self.tokens_at) * rate)
+        self.tokens_at = now
+        taken = self.tokens >= 1
+        if taken:
+            self.tokens -= 1
+        PROVIDER_QUOTA_REMAINING.labels(self.stock_service.provider.name).set(self.tokens)
+        return taken
+
+    async def poll(self):
+        """Refresh the most overdue symbols the rate limit allows; run as a scheduled job"""
+        # Connections are held only for the queries, never across provider calls
+        if not self.plan or time.monotonic() - self.planned_at >= self.plan_interval:
+            conn = await db.get_connection_async()
+            try:
+                self.replan(conn)
+            finally:
+                db.return_connection(conn)
+        if not self.plan:
+            return
+
+        symbols = list(self.plan)
+        refreshed = dict(zip(symbols, self.redis.hmget(REFRESHED_KEY, symbols)))
+        now = time.time()
+
+        status = []
+        for symbol in symbols:
+            plan = self.plan[symbol]
+            last = max(float(refreshed[symbol] or 0), self.attempted.get(symbol, 0))
+            age = now - last if last else None
+            market_open = self.market_calendar.is_open(symbol)
+            if market_open and plan['interval']:
+                overdue = age / plan['interval'] if age is not None else float('inf')
+            elif not market_open and self.market_calendar.in_warmup(symbol):
+                # One fetch per symbol before the open, then wait for the session
+                overdue = float('inf') if last < self.market_calendar.warmup_start(symbol).timestamp() else 0
+            else:
+                overdue = 0
+            status.append({**plan, 'symbol': symbol, 'age': age, 'overdue': overdue, 'marketOpen': market_open})
+
+        fetched = []
+        for entry in sorted(status, key=lambda e: e['overdue'], reverse=True):
+            # While the provider's breaker is open, keep the tokens for when it recovers
+            if entry['overdue'] < 1 or self.stock_service.provider_open() or not self.take_token():
+                break
+            self.attempted[entry['symbol']] = time.time()
+            try:
+                price_data = await self.stock_service.get_stock_price(entry['symbol'], refresh=True)
+                entry['age'] = 0.0
+                entry['overdue'] = 0.0
+                if not price_data.get('stale') and not price_data.get('isMock'):
+                    fetched.append(price_data)
+            except Exception as e:
+                print(f'Failed to update price for {entry["symbol"]}: {e}')
+
+        # With the tick stream on, the ingestion worker's history writer records them instead
+        if fetched and not self.stock_service.tick_stream.enabled:
+            try:
+                conn = await db.get_connection_async()
+                try:
+                    self.stock_service.record_history(conn, fetched)
+                finally:
+                    db.return_connection(conn)
+            except Exception as e:
+                print(f'Failed to write price history: {e}')
+
+        self.publish_status(status)
+
+    def publish_status(self, status: List[Dict]):
+        """Store per-symbol staleness so any worker can report it"""
+        report = {
+            'updatedAt': time.time(),
+            'callsPerMinute': self.calls_per_minute,
+            'symbols': sorted([{
+                'symbol': entry['symbol'],
+                'priority': entry['priority'],
+                'value': entry['value'],
+                'alertProximity': entry['alertProximity'],
+                'demand': entry['demand'],
+                'targetIntervalSeconds': round(entry['interval'], 1) if entry['interval'] else None,
+                'ageSeconds': round(entry['age'], 1) if entry['age'] is not None else None,
+                'marketOpen': entry['marketOpen'],
+                'stale': entry['overdue'] >= 1
+            } for entry in status], key=lambda e: e['priority'], reverse=True)
+        }
+        self.redis.setex(STATUS_KEY, 300, json.dumps(report))
+
+    def get_status(self) -> Dict:
+        """Latest polling plan and per-symbol staleness"""
+        report = self.redis.get(STATUS_KEY)
+        return json.loads(report) if report else {'updatedAt': None, 'symbols': []}
+
+# Singleton instance
+price_poller = PricePoller()
+
+def get_price_poller() -> PricePoller:
+    """Get price poller instance"""
+    return price_poller
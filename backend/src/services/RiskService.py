@@ -3,13 +3,17 @@ import math
 from typing import List, Dict
 from ..services.StockService import get_stock_service
 from ..models.PriceHistory import PriceHistory
+from ..services.SymbolIndex import get_symbol_index
 from ..config.redis import get_redis
+from ..config.tracing import traced
 
 class RiskService:
     def __init__(self):
         self.stock_service = get_stock_service()
         self.redis = get_redis()
+        self.symbol_index = get_symbol_index()
     
+    @traced()
     async def calculate_portfolio_value(self, conn, holdings: List[Dict]) -> Dict:
         """Calculate portfolio P&L and value"""
         if not holdings or len(holdings) == 0:
@@ -83,6 +87,7 @@ class RiskService:
             'holdings': updated_holdings
         }
     
+    @traced()
     async def calculate_portfolio_beta(self, conn, holdings: List[Dict]) -> float:
         """Calculate portfolio beta (weighted average)"""
         try:
@@ -113,6 +118,7 @@ class RiskService:
             print(f'Error calculating portfolio beta: {e}')
             raise e
     
+    @traced()
     async def calculate_value_at_risk(self, conn, holdings: List[Dict], confidence_level: float = 0.95) -> Dict:
         """Calculate Value at Risk (VaR) at 95% confidence level"""
         try:
@@ -178,71 +184,40 @@ class RiskService:
             print(f'Error calculating VaR: {e}')
             raise e
     
-    async def analyze_sector_concentration(self, conn, holdings: List[Dict]) -> Dict:
-        """Analyze sector concentration"""
+    @traced()
+    async def analyze_concentration(self, conn, holdings: List[Dict], field: str = 'sector', portfolio_value: Dict = None) -> Dict:
+        """Analyze concentration by a symbol reference field (sector, industry or exchange)"""
         try:
-            cache_key = 'portfolio:sectors'
-            cached = self.redis.get(cache_key)
-            if cached:
-                return json.loads(cached)
-            
-            sector_map = {
-                # Technology
-                'AAPL': 'Technology',
-                'MSFT': 'Technology',
-                'GOOGL': 'Technology',
-                'META': 'Technology',
-                'NVDA': 'Technology',
-                # Finance
-                'JPM': 'Finance',
-                'BAC': 'Finance',
-                'GS': 'Finance',
-                # Healthcare
-                'JNJ': 'Healthcare',
-                'UNH': 'Healthcare',
-                'PFE': 'Healthcare',
-                # Consumer
-                'AMZN': 'Consumer',
-                'WMT': 'Consumer',
-                'KO': 'Consumer',
-                # Energy
-                'XOM': 'Energy',
-                'CVX': 'Energy',
-                # Industrial
-                'BA': 'Industrial',
-                'CAT': 'Industrial',
-                # Auto
-                'TSLA': 'Auto',
-            }
-            
-            portfolio_value = await self.calculate_portfolio_value(conn, holdings)
-            sector_concentration = {}
+            if portfolio_value is None:
+                portfolio_value = await self.calculate_portfolio_value(conn, holdings)
+            concentration = {}
             
             for holding in portfolio_value['holdings']:
                 if holding.get('currentValue'):
-                    sector = sector_map.get(holding['symbol'], 'Other')
-                    if sector not in sector_concentration:
-                        sector_concentration[sector] = {
+                    group = self.symbol_index.lookup(holding['symbol'], field)
+                    if group not in concentration:
+                        concentration[group] = {
                             'value': 0,
                             'percent': 0,
                             'stocks': []
                         }
-                    sector_concentration[sector]['value'] += holding['currentValue']
-                    sector_concentration[sector]['stocks'].append(holding['symbol'])
+                    concentration[group]['value'] += holding['currentValue']
+                    concentration[group]['stocks'].append(holding['symbol'])
             
             # Calculate percentages
-            for sector in sector_concentration:
-                sector_concentration[sector]['percent'] = round(
-                    (sector_concentration[sector]['value'] / portfolio_value['totalValue']) * 100, 2
+            for group in concentration:
+                concentration[group]['percent'] = round(
+                    (concentration[group]['value'] / portfolio_value['totalValue']) * 100, 2
                 )
             
-            # Cache for 24 hours
-            self.redis.setex(cache_key, 86400, json.dumps(sector_concentration))
-            
-            return sector_concentration
+            return concentration
         except Exception as e:
-            print(f'Error analyzing sector concentration: {e}')
+            print(f'Error analyzing {field} concentration: {e}')
             raise e
+    
+    async def analyze_sector_concentration(self, conn, holdings: List[Dict], portfolio_value: Dict = None) -> Dict:
+        """Analyze sector concentration"""
+        return await self.analyze_concentration(conn, holdings, 'sector', portfolio_value)
 
 # Singleton instance
 risk_service = RiskService()
@@ -0,0 +1,226 @@
+import os
+import time
+import asyncio
+from typing import Dict, Callable, Awaitable
+from dotenv import load_dotenv
+from ..config.redis import get_redis
+from ..services.ClusterMembership import get_cluster_membership
+from ..config.metrics import JOB_RUN_DURATION, JOB_LAG, JOB_FAILURES
+from ..config.tracing import span
+
+load_dotenv()
+
+# Extend the lease only if this process still holds it
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class LeaderLease:
+    """Redis lease that at most one process holds at a time"""
+
+    def __init__(self, redis, name: str, owner: str, lease_seconds: float):
+        self.redis = redis
+        self.key = f'scheduler:lease:{name}'
+        self.owner = owner
+        self.lease_ms = int(lease_seconds * 1000)
+        self.renew_script = redis.register_script(RENEW_SCRIPT)
+        self.release_script = redis.register_script(RELEASE_SCRIPT)
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free, or extend it if already held"""
+        if self.renew_script(keys=[self.key], args=[self.owner, self.lease_ms]):
+            return True
+        return bool(self.redis.set(self.key, self.owner, nx=True, px=self.lease_ms))
+
+    def release(self):
+        """Give the lease up so another process can take over immediately"""
+        self.release_script(keys=[self.key], args=[self.owner])
+
+    def holder(self):
+        """Current lease holder, if any"""
+        return self.redis.get(self.key)
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Awaitable[None]], interval_seconds: float, lease: LeaderLease):
+        self.name = name
+        self.func = func
+        self.interval = interval_seconds
+        self.lease = lease
+        self.is_leader = False
+        self.task = None
+
+class JobScheduler:
+    """Runs each periodic job on exactly one process cluster-wide, with lease-based failover"""
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.membership = get_cluster_membership()
+        self.lease_seconds = float(os.getenv('SCHEDULER_LEASE_SECONDS', '15'))
+        self.jobs: Dict[str, Job] = {}
+
+    def register(self, name: str, func: Callable[[], Awaitable[None]], interval_seconds: float):
+        """Register a periodic job; call before start()"""
+        lease = LeaderLease(self.redis, name, self.membership.worker_id, self.lease_seconds)
+        self.jobs[name] = Job(name, func, interval_seconds, lease)
+
+    def stats_key(self, name: str) -> str:
+        return f'scheduler:stats:{name}'
+
+    def record_run(self, job: Job, lag: float, duration: float, error: Exception = None):
+        """Store run stats in Redis so any process can report them"""
+        JOB_RUN_DURATION.labels(job.name).observe(duration)
+        JOB_LAG.labels(job.name).observe(lag)
+        if error:
+            JOB_FAILURES.labels(job.name).inc()
+
+        pipe = self.redis.pipeline()
+        key = self.stats_key(job.name)
+        pipe.hset(key, mapping={
+            'leader': job.lease.owner,
+            'lastRunAt': time.time(),
+            'lastDurationMs': round(duration * 1000, 2),
+            'lastLagMs': round(lag * 1000, 2),
+            'lastError': str(error) if error else ''
+        })
+        pipe.hincrby(key, 'runs', 1)
+        pipe.hincrbyfloat(key, 'totalDurationMs', duration * 1000)
+        if error:
+            pipe.hincrby(key, 'failures', 1)
+        pipe.execute()
+
+    async def run_once(self, job: Job, lag: float):
+        """Run a job while keeping its lease alive, cancelling the run if the lease is lost"""
+        renew_every = self.lease_seconds / 3
+        lost = False
+
+        async def keep_lease():
+            nonlocal lost
+            renewed = time.monotonic()
+            while True:
+                await asyncio.sleep(renew_every)
+                try:
+                    if not job.lease.acquire():
+                        break
+                    renewed = time.monotonic()
+                except Exception as e:
+                    print(f'Error renewing lease for {job.name}: {e}')
+                    # Give up before the unrenewed lease expires and another process takes the job
+                    if time.monotonic() - renewed >= self.lease_seconds - renew_every:
+                        break
+            print(f'Lost leadership of job {job.name} during a run; cancelling it')
+            lost = True
+            job.is_leader = False
+            run.cancel()
+
+        started = time.monotonic()
+        error = None
+        try:
+            # Each run is the root of its own trace; tasks it creates inherit the context
+            with span(f'job {job.name}', root=True, attributes={'job.lag_ms': round(lag * 1000, 2)}):
+                run = asyncio.create_task(job.func())
+                keeper = asyncio.create_task(keep_lease())
+                try:
+                    await run
+                finally:
+                    keeper.cancel()
+        except asyncio.CancelledError:
+            if not lost:
+                raise
+            error = RuntimeError('lease lost during the run')
+        except Exception as e:
+            error = e
+            print(f'Scheduled job {job.name} failed: {e}')
+        try:
+            self.record_run(job, lag, time.monotonic() - started, error)
+        except Exception as e:
+            print(f'Error recording run of job {job.name}: {e}')
+
+    async def job_loop(self, job: Job):
+        """Contend for the job's lease and run it on schedule while holding it"""
+        renew_every = self.lease_seconds / 3
+        next_run = time.monotonic()
+
+        while True:
+            try:
+                try:
+                    is_leader = job.lease.acquire()
+                except Exception as e:
+                    print(f'Error acquiring lease for {job.name}: {e}')
+                    is_leader = False
+
+                if is_leader != job.is_leader:
+                    print(f"{'Acquired' if is_leader else 'Lost'} leadership of job {job.name}")
+                    job.is_leader = is_leader
+                    next_run = min(next_run, time.monotonic())
+
+                now = time.monotonic()
+                if is_leader and now >= next_run:
+                    await self.run_once(job, now - next_run)
+                    # Skip runs missed while the job was slow instead of bursting to catch up
+                    next_run = max(next_run + job.interval, time.monotonic())
+                    continue
+
+                # Followers poll for failover; the leader wakes to renew or run, whichever is sooner
+                wait = renew_every if not is_leader else min(renew_every, next_run - now)
+            except Exception as e:
+                # The loop must outlive any one failure, or this process never runs the job again
+                print(f'Scheduler loop for job {job.name} failed: {e}')
+                wait = renew_every
+            await asyncio.sleep(max(wait, 0.01))
+
+    def get_stats(self) -> Dict:
+        """Cluster-wide stats for every registered job"""
+        result = {}
+        for name, job in self.jobs.items():
+            stats = self.redis.hgetall(self.stats_key(name))
+            runs = int(stats.get('runs', 0))
+            result[name] = {
+                'intervalSeconds': job.interval,
+                'leader': job.lease.holder(),
+                'isLeader': job.is_leader,
+                'runs': runs,
+                'failures': int(stats.get('failures', 0)),
+                'lastRunAt': float(stats['lastRunAt']) if stats.get('lastRunAt') else None,
+                'lastDurationMs': float(stats['lastDurationMs']) if stats.get('lastDurationMs') else None,
+                'avgDurationMs': round(float(stats.get('totalDurationMs', 0)) / runs, 2) if runs else None,
+                'lastLagMs': float(stats['lastLagMs']) if stats.get('lastLagMs') else None,
+                'lastError': stats.get('lastError') or None
+            }
+        return result
+
+    def start(self):
+        """Start contending for every registered job"""
+        for job in self.jobs.values():
+            if not job.task:
+                job.task = asyncio.create_task(self.job_loop(job))
+        print(f'Scheduler started for jobs: {", ".join(self.jobs)}')
+
+    def stop(self):
+        """Stop all jobs and hand their leases to other processes"""
+        for job in self.jobs.values():
+            if job.task:
+                job.task.cancel()
+                job.task = None
+            if job.is_leader:
+                try:
+                    job.lease.release()
+                except Exception as e:
+                    print(f'Error releasing lease for {job.name}: {e}')
+                job.is_leader = False
+
+# Singleton instance
+job_scheduler = JobScheduler()
+
+def get_job_scheduler() -> JobScheduler:
+    """Get job scheduler instance"""
+    return job_scheduler
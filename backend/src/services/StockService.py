@@ -1,73 +1,209 @@
 import os
 import json
-import httpx
+import time
 import random
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Callable
 from dotenv import load_dotenv
 from ..config.redis import get_redis
 from ..config.database import get_db
 from ..models.PriceHistory import PriceHistory
+from ..services.EventBus import get_event_bus, PRICE_TICK
+from ..services.MarketCalendar import get_market_calendar
+from ..services.TickStream import get_tick_stream
+from ..services.TickDedup import get_tick_deduper
+from ..providers.QuoteProvider import QuoteProvider, InvalidSymbolError, create_provider
+from ..services.CircuitBreaker import CircuitBreaker, CircuitOpenError, SymbolBreakers, OPEN
+from ..config.metrics import CACHE_REQUESTS, PROVIDER_REQUEST_DURATION, PROVIDER_ERRORS, record_time
+from ..config.tracing import span, traced
 
 load_dotenv()
 
+# Decaying per-symbol request counts and last provider refresh times, read by the price poller
+REQUESTS_KEY = 'stocks:requests'
+REFRESHED_KEY = 'stocks:refreshed'
+
+def last_key(symbol: str) -> str:
+    """Last fetched quote for a symbol, kept without expiry"""
+    return f'stock:last:{symbol}'
+
+def invalid_key(symbol: str) -> str:
+    """Negative cache entry for a symbol the provider does not know"""
+    return f'stock:invalid:{symbol}'
+
+class QuoteUnavailableError(Exception):
+    """No quote has been ingested for a symbol and this process may not fetch one itself"""
+
 class StockService:
     def __init__(self):
-        self.api_key = os.getenv('ALPHA_VANTAGE_API_KEY', '')
-        self.base_url = 'https://www.alphavantage.co/query'
+        # Selected by QUOTE_PROVIDER; benchmarks swap in their own
+        self.provider: QuoteProvider = create_provider()
+        # Off: provider failures propagate instead of being papered over with random prices.
+        # Defaults off for the replay provider, whose injected faults must stay reproducible
+        default_fallback = 'false' if self.provider.name == 'replay' else 'true'
+        self.mock_fallback = os.getenv('QUOTE_MOCK_FALLBACK', default_fallback).lower() == 'true'
+        # One breaker per provider, plus per-symbol breakers for symbols that keep failing on their own
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.breaker_failures = int(os.getenv('PROVIDER_BREAKER_FAILURES', '5'))
+        self.breaker_reset = float(os.getenv('PROVIDER_BREAKER_RESET', '30'))
+        self.symbol_breakers = SymbolBreakers(
+            int(os.getenv('SYMBOL_BREAKER_FAILURES', '3')),
+            float(os.getenv('SYMBOL_BREAKER_RESET', '300'))
+        )
+        self.invalid_symbol_ttl = int(os.getenv('INVALID_SYMBOL_TTL', '300'))
         self.update_interval = int(os.getenv('STOCK_UPDATE_INTERVAL', '30000'))
         self.redis = get_redis()
+        self.event_bus = get_event_bus()
+        self.market_calendar = get_market_calendar()
+        self.tick_stream = get_tick_stream()
+        self.tick_deduper = get_tick_deduper()
+        # Called once for every quote this process fetches, wherever its tick is delivered afterwards
+        self.tick_listeners: List[Callable[[Dict], None]] = []
+    
+    def on_tick(self, listener: Callable[[Dict], None]):
+        """Register a listener for quotes fetched by this process"""
+        self.tick_listeners.append(listener)
+    
+    def provider_breaker(self) -> CircuitBreaker:
+        name = self.provider.name
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(name, self.breaker_failures, self.breaker_reset)
+        return self.breakers[name]
+    
+    def provider_open(self) -> bool:
+        """Whether the provider's breaker is open and not yet due for a probe"""
+        breaker = self.provider_breaker()
+        return breaker.state == OPEN and breaker.retry_in() > 0
+    
+    def get_provider_stats(self) -> Dict:
+        return {
+            **self.provider.get_stats(),
+            'breaker': self.provider_breaker().get_stats(),
+            'openSymbols': self.symbol_breakers.open_symbols()
+        }
+    
+    def notify_tick(self, price_data: Dict):
+        for listener in self.tick_listeners:
+            try:
+                listener(price_data)
+            except Exception as e:
+                print(f'Error handling tick for {price_data["symbol"]}: {e}')
+    
+    def record_history(self, conn, quotes: List[Dict]):
+        """Write freshly fetched quotes to price_history, skipping unchanged ones"""
+        quotes = self.tick_deduper.filter(quotes)
+        for quote in quotes:
+            PriceHistory.create(conn, quote['symbol'], quote['price'], quote['volume'])
+        self.tick_deduper.mark_written(quotes)
     
-    async def get_stock_price(self, symbol: str, conn=None) -> Dict:
-        """Get current stock price"""
+    @traced()
+    async def get_stock_price(self, symbol: str, conn=None, refresh: bool = False) -> Dict:
+        """Get current stock price; refresh=True bypasses the cache (used by the poller)"""
+        last_price = None
         try:
-            # Check cache first
-            cached_price = self.redis.get(f'stock:{symbol}')
-            if cached_price:
-                return json.loads(cached_price)
-            
-            # Fetch from Alpha Vantage
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        'function': 'GLOBAL_QUOTE',
-                        'symbol': symbol,
-                        'apikey': self.api_key
-                    }
-                )
-                data = response.json()
-            
-            quote_data = data.get('Global Quote', {})
-            if not quote_data or '05. price' not in quote_data:
-                raise Exception(f'Invalid response for symbol {symbol}')
-            
-            price = float(quote_data['05. price'])
-            volume = int(quote_data.get('06. volume', 0))
-            change = float(quote_data.get('09. change', 0))
-            change_percent_str = quote_data.get('10. change percent', '0%').replace('%', '')
-            change_percent = float(change_percent_str)
+            if not refresh:
+                # Check cache first, counting demand for the poller's priorities in the same round trip
+                pipe = self.redis.pipeline()
+                pipe.get(f'stock:{symbol}')
+                pipe.zincrby(REQUESTS_KEY, 1, symbol)
+                pipe.get(last_key(symbol))
+                pipe.exists(invalid_key(symbol))
+                cached_price, _, last_price, invalid = pipe.execute()
+                if cached_price:
+                    CACHE_REQUESTS.labels('quote', 'hit').inc()
+                    return json.loads(cached_price)
+                
+                # With a dedicated ingestion worker, API processes never call the provider;
+                # serve the last ingested quote and let the recorded demand get the symbol polled
+                if self.tick_stream.enabled:
+                    if last_price:
+                        CACHE_REQUESTS.labels('quote', 'stale').inc()
+                        return {**json.loads(last_price), 'stale': True}
+                    CACHE_REQUESTS.labels('quote', 'miss').inc()
+                    raise QuoteUnavailableError(f'No quote ingested yet for {symbol}')
+                CACHE_REQUESTS.labels('quote', 'miss').inc()
+            else:
+                invalid = self.redis.exists(invalid_key(symbol))
             
-            price_data = {
-                'symbol': symbol,
-                'price': price,
-                'volume': volume,
-                'change': change,
-                'changePercent': change_percent,
-                'timestamp': datetime.now().isoformat()
-            }
+            if invalid:
+                CACHE_REQUESTS.labels('invalid_symbol', 'hit').inc()
+                raise InvalidSymbolError(f'Unknown symbol {symbol} (cached)')
+            
+            # Fail fast instead of waiting out timeouts while the provider or this symbol keeps failing
+            provider = self.provider
+            breaker = self.provider_breaker()
+            self.symbol_breakers.check(symbol)
+            breaker.check()
             
-            # Cache for 5 minutes
-            self.redis.setex(f'stock:{symbol}', 300, json.dumps(price_data))
+            # Fetch from the quote provider
+            started = time.perf_counter()
+            try:
+                with span(f'{provider.name} quote', 'client', {'symbol': symbol}):
+                    price_data = await provider.fetch_quote(symbol)
+            except Exception as e:
+                PROVIDER_REQUEST_DURATION.labels(provider.name, 'error').observe(time.perf_counter() - started)
+                reason = getattr(e, 'reason', 'http')
+                PROVIDER_ERRORS.labels(provider.name, reason).inc()
+                record_time('http', time.perf_counter() - started)
+                if reason == 'invalid_symbol':
+                    # The provider answered; remember the symbol is bad for a while
+                    breaker.record_success()
+                    self.redis.setex(invalid_key(symbol), self.invalid_symbol_ttl, 1)
+                elif reason == 'invalid_response':
+                    breaker.record_success()
+                    self.symbol_breakers.record_failure(symbol)
+                else:
+                    # An exhausted quota will not recover on the next call: open at once
+                    breaker.record_failure(trip=reason == 'rate_limited')
+                raise
+            breaker.record_success()
+            self.symbol_breakers.record_success(symbol)
+            PROVIDER_REQUEST_DURATION.labels(provider.name, 'ok').observe(time.perf_counter() - started)
+            record_time('http', time.perf_counter() - started)
+            price, volume = price_data['price'], price_data['volume']
+            
+            # Cache for 5 minutes while trading, until the pre-open warm-up otherwise,
+            # and record when the symbol was last refreshed
+            pipe = self.redis.pipeline()
+            pipe.setex(f'stock:{symbol}', self.market_calendar.quote_ttl(symbol), json.dumps(price_data))
+            pipe.hset(REFRESHED_KEY, symbol, datetime.now().timestamp())
+            pipe.set(last_key(symbol), json.dumps(price_data), get=True)
+            previous = pipe.execute()[2]
+            self.notify_tick(price_data)
+            
+            if self.tick_stream.enabled:
+                # The history writer and alert engine consume the stream; the previous price
+                # lets the alert engine detect crossings on whichever worker receives the tick
+                self.tick_stream.publish({**price_data, 'previousPrice': json.loads(previous)['price'] if previous else None})
+                return price_data
             
             # Save to database
             if conn:
-                PriceHistory.create(conn, symbol, price, volume)
+                self.record_history(conn, [price_data])
+            
+            self.event_bus.publish(PRICE_TICK, price_data)
             
             return price_data
             
+        except QuoteUnavailableError:
+            # Nothing was fetched, so there is nothing to fall back on and no price may be invented
+            raise
         except Exception as e:
-            print(f'Error fetching price for {symbol}: {e}')
+            if not isinstance(e, CircuitOpenError):
+                print(f'Error fetching price for {symbol}: {e}')
+            
+            # Unknown symbols get no price at all, so the negative cache answers next time
+            if isinstance(e, InvalidSymbolError):
+                raise
+            
+            # Last known good quote while the provider fails
+            last = last_price or self.redis.get(last_key(symbol))
+            if last:
+                CACHE_REQUESTS.labels('quote', 'stale').inc()
+                return {**json.loads(last), 'stale': True}
+            # An open breaker fails fast; a mock price would hide the outage
+            if not self.mock_fallback or isinstance(e, CircuitOpenError):
+                raise
             
             # DEVELOPMENT FALLBACK: Return mock prices
             mock_prices = {
@@ -96,11 +232,13 @@ class StockService:
             
             print(f'Using mock price for {symbol}: ${price}')
             
-            # Cache mock price for 1 minute
+            # Cache mock price for 1 minute; it is never published as a tick, so alerts,
+            # live clients and materialized valuations only ever see real prices
             self.redis.setex(f'stock:{symbol}', 60, json.dumps(price_data))
             
             return price_data
     
+    @traced()
     async def get_multiple_prices(self, symbols: List[str], conn=None) -> List[Dict]:
         """Get prices for multiple symbols"""
         results = []
@@ -109,6 +247,7 @@ class StockService:
             results.append(price_data)
         return results
     
+    @traced()
     def get_price_history(self, conn, symbol: str, limit: int = 100) -> List[Dict]:
         """Get price history for a symbol"""
         try:
@@ -117,6 +256,7 @@ class StockService:
             print(f'Error getting price history for {symbol}: {e}')
             raise e
     
+    @traced()
     async def get_stock_beta(self, symbol: str) -> float:
         """Get stock beta (simplified)"""
         try:
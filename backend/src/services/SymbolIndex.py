@@ -0,0 +1,100 @@
+import os
+import asyncio
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Mapping
+from dotenv import load_dotenv
+from ..models.Symbol import Symbol
+from ..config.database import db
+
+load_dotenv()
+
+class SymbolInfo(NamedTuple):
+    symbol: str
+    name: Optional[str]
+    sector: Optional[str]
+    industry: Optional[str]
+    exchange: Optional[str]
+    currency: Optional[str]
+
+class SymbolIndex:
+    """Immutable in-process snapshot of the symbols reference table.
+
+    Lookups never touch Postgres or Redis; the snapshot is swapped
+    wholesale when the table version changes.
+    """
+
+    def __init__(self):
+        self.entries: Mapping[str, SymbolInfo] = MappingProxyType({})
+        self.version = None
+        self.refresh_interval = int(os.getenv('SYMBOLS_REFRESH_INTERVAL', '300'))
+        self.refresh_task = None
+
+    def load(self, conn):
+        """Load a fresh snapshot from the database"""
+        version = Symbol.get_version(conn)
+        entries = {
+            row['symbol']: SymbolInfo(
+                row['symbol'], row['name'], row['sector'], row['industry'], row['exchange'], row['currency']
+            )
+            for row in Symbol.find_all(conn)
+        }
+        self.entries = MappingProxyType(entries)
+        self.version = version
+        print(f'Symbol index loaded with {len(entries)} symbols')
+
+    def refresh_if_changed(self, conn) -> bool:
+        """Reload the snapshot if the table version changed"""
+        if Symbol.get_version(conn) == self.version:
+            return False
+        self.load(conn)
+        return True
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        """Get reference data for a symbol"""
+        return self.entries.get(symbol.upper())
+
+    def lookup(self, symbol: str, field: str, default: str = 'Other') -> str:
+        """Get one reference field for a symbol, e.g. its sector"""
+        info = self.entries.get(symbol.upper())
+        value = getattr(info, field, None) if info else None
+        return value or default
+
+    async def refresh_loop(self):
+        """Periodically pick up changes to the symbols table"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                conn = await db.get_connection_async()
+            except Exception as e:
+                print(f'Error refreshing symbol index: {e}')
+                continue
+            try:
+                self.refresh_if_changed(conn)
+            except Exception as e:
+                print(f'Error refreshing symbol index: {e}')
+            finally:
+                db.return_connection(conn)
+
+    def start(self):
+        """Load the index and start watching for version changes"""
+        conn = db.get_connection()
+        try:
+            self.load(conn)
+        except Exception as e:
+            print(f'Error loading symbol index: {e}')
+        finally:
+            db.return_connection(conn)
+
+        self.refresh_task = asyncio.create_task(self.refresh_loop())
+
+    def stop(self):
+        """Stop watching for version changes"""
+        if self.refresh_task:
+            self.refresh_task.cancel()
+
+# Singleton instance
+symbol_index = SymbolIndex()
+
+def get_symbol_index() -> SymbolIndex:
+    """Get symbol index instance"""
+    return symbol_index
@@ -0,0 +1,86 @@
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+from dotenv import load_dotenv
+from ..config.redis import get_redis
+from ..config.metrics import HISTORY_TICKS
+
+load_dotenv()
+
+# symbol -> "price|volume|epoch" of the last tick written to price_history, shared by every writer
+LAST_WRITTEN_KEY = 'history:last_written'
+# symbol -> counter bumped when rows are inserted into past days (backfills), so caches built
+# from completed days can tell their inputs changed even though the latest date did not
+HISTORY_VERSION_KEY = 'history:version'
+
+def bump_history_versions(redis, symbols: List[str]):
+    """Mark symbols whose past history gained rows"""
+    if not symbols:
+        return
+    pipe = redis.pipeline()
+    for symbol in symbols:
+        pipe.hincrby(HISTORY_VERSION_KEY, symbol, 1)
+    pipe.execute()
+
+def tick_time(tick: Dict) -> float:
+    """Epoch seconds of a tick, falling back to now for ticks without a timestamp"""
+    stamp = tick.get('timestamp')
+    if not stamp:
+        return time.time()
+    return datetime.fromisoformat(str(stamp)).timestamp()
+
+class TickDeduper:
+    """Drops ticks identical to the last one written for their symbol, keeping one per heartbeat.
+
+    A tick is written when its price or volume differs from the symbol's
+    last written tick, or when HISTORY_HEARTBEAT_SECONDS have passed since
+    then, so flat stretches still show up in history at that resolution.
+    Callers mark ticks written only after the insert succeeds, so a failed
+    batch is not suppressed when it is retried.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.enabled = os.getenv('HISTORY_DEDUP', 'true').lower() == 'true'
+        self.heartbeat = float(os.getenv('HISTORY_HEARTBEAT_SECONDS', '900'))
+
+    def filter(self, ticks: List[Dict]) -> List[Dict]:
+        """The ticks worth writing, in order"""
+        if not self.enabled or not ticks:
+            return ticks
+        symbols = list(dict.fromkeys(tick['symbol'] for tick in ticks))
+        last = {}
+        for symbol, value in zip(symbols, self.redis.hmget(LAST_WRITTEN_KEY, symbols)):
+            if value:
+                price, volume, written_at = value.split('|')
+                last[symbol] = (float(price), int(volume), float(written_at))
+
+        kept = []
+        for tick in ticks:
+            symbol, price, volume = tick['symbol'], float(tick['price']), int(tick.get('volume') or 0)
+            at = tick_time(tick)
+            previous = last.get(symbol)
+            if previous and previous[:2] == (price, volume) and at - previous[2] < self.heartbeat:
+                continue
+            last[symbol] = (price, volume, at)
+            kept.append(tick)
+
+        HISTORY_TICKS.labels('written').inc(len(kept))
+        HISTORY_TICKS.labels('suppressed').inc(len(ticks) - len(kept))
+        return kept
+
+    def mark_written(self, ticks: List[Dict]):
+        """Record the last tick written per symbol"""
+        if not self.enabled or not ticks:
+            return
+        latest = {}
+        for tick in ticks:
+            latest[tick['symbol']] = f"{float(tick['price'])}|{int(tick.get('volume') or 0)}|{tick_time(tick)}"
+        self.redis.hset(LAST_WRITTEN_KEY, mapping=latest)
+
+# Singleton instance
+tick_deduper = TickDeduper()
+
+def get_tick_deduper() -> TickDeduper:
+    return tick_deduper
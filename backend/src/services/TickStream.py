@@ -0,0 +1,199 @@
+import os
+import json
+import asyncio
+from typing import Dict, List, Callable, Awaitable
+from dotenv import load_dotenv
+from redis.exceptions import ResponseError
+from ..config.redis import get_redis
+from ..services.EventBus import get_event_bus, PRICE_TICK
+from ..config.tracing import span
+
+load_dotenv()
+
+STREAM_KEY = 'ticks:stream'
+
+# Shared groups: each tick is handled by exactly one member of the group
+HISTORY_GROUP = 'history-writer'
+ALERT_GROUP = 'alert-engine'
+
+# Per-worker fan-out groups are named after the worker so every API process sees every tick
+WORKER_GROUP_PREFIX = 'api:'
+
+class StreamConsumer:
+    """Reads one consumer group in batches, hands the ticks to a handler and acknowledges them"""
+
+    def __init__(self, redis, group: str, consumer: str, handler: Callable[[List[Dict]], Awaitable[None]],
+                 batch_size: int, block_ms: int, claim_idle_ms: int):
+        self.redis = redis
+        self.group = group
+        self.consumer = consumer
+        self.handler = handler
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.task = None
+        self.processed = 0
+        self.failures = 0
+
+    async def read(self, last_id: str):
+        """Next batch for this consumer: '>' for new entries, '0' for its own unacknowledged ones"""
+        response = await asyncio.to_thread(
+            self.redis.xreadgroup, self.group, self.consumer, {STREAM_KEY: last_id},
+            count=self.batch_size, block=self.block_ms if last_id == '>' else None
+        )
+        return response[0][1] if response else []
+
+    async def process(self, entries) -> bool:
+        """Run the handler on a batch; entries stay pending for redelivery if it fails"""
+        entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+        if not entries:
+            return True
+        try:
+            with span(f'stream {self.group}', 'consumer', {'stream.entries': len(entries)}, root=True):
+                await self.handler([json.loads(fields['tick']) for _, fields in entries])
+        except Exception as e:
+            self.failures += 1
+            print(f'Error handling ticks for group {self.group}: {e}')
+            return False
+        self.redis.xack(STREAM_KEY, self.group, *[entry_id for entry_id, _ in entries])
+        self.processed += len(entries)
+        return True
+
+    def claim(self):
+        """Take over entries left pending by consumers that died mid-batch"""
+        _, entries, *_ = self.redis.xautoclaim(
+            STREAM_KEY, self.group, self.consumer, self.claim_idle_ms, start_id='0-0', count=self.batch_size
+        )
+        return entries
+
+    async def run(self):
+        """Consume until cancelled"""
+        # Finish whatever this consumer name was handed before a restart
+        while True:
+            entries = await self.read('0')
+            if not entries or not await self.process(entries):
+                break
+
+        claim_every = self.claim_idle_ms / 1000
+        loop = asyncio.get_running_loop()
+        next_claim = loop.time() + claim_every
+        while True:
+            try:
+                if loop.time() >= next_claim:
+                    await self.process(self.claim())
+                    next_claim = loop.time() + claim_every
+                await self.process(await self.read('>'))
+            except asyncio.CancelledError:
+                raise
+            except ResponseError as e:
+                if 'NOGROUP' not in str(e):
+                    print(f'Error reading tick stream for group {self.group}: {e}')
+                    await asyncio.sleep(1)
+                    continue
+                # The group was pruned (e.g. while this worker looked dead); rejoin at the tail
+                print(f'Consumer group {self.group} is gone; recreating it')
+                self.redis.xgroup_create(STREAM_KEY, self.group, id='$', mkstream=True)
+            except Exception as e:
+                print(f'Error reading tick stream for group {self.group}: {e}')
+                await asyncio.sleep(1)
+
+class TickStream:
+    """Normalized price ticks published by the ingestion worker and read through consumer groups.
+
+    With INGEST_MODE=stream, `python -m src.ingest` owns provider calls and
+    appends every tick here; API workers, the history writer and the alert
+    engine each consume it through their own consumer group.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.event_bus = get_event_bus()
+        self.enabled = os.getenv('INGEST_MODE', 'embedded') == 'stream'
+        self.maxlen = int(os.getenv('TICK_STREAM_MAXLEN', '100000'))
+        self.batch_size = int(os.getenv('TICK_STREAM_BATCH', '100'))
+        self.block_ms = int(os.getenv('TICK_STREAM_BLOCK_MS', '1000'))
+        self.claim_idle_ms = int(os.getenv('TICK_STREAM_CLAIM_IDLE_MS', '30000'))
+        self.consumers: List[StreamConsumer] = []
+
+    def publish(self, tick: Dict) -> str:
+        """Append a tick, trimming the stream to roughly maxlen entries"""
+        return self.redis.xadd(STREAM_KEY, {'tick': json.dumps(tick)}, maxlen=self.maxlen, approximate=True)
+
+    def ensure_group(self, group: str, start: str = '$'):
+        """Create a consumer group unless it already exists"""
+        try:
+            self.redis.xgroup_create(STREAM_KEY, group, id=start, mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def consume(self, group: str, consumer: str, handler: Callable[[List[Dict]], Awaitable[None]], start: str = '$') -> StreamConsumer:
+        """Start consuming a group; a new group begins at `start` ('$' for new ticks, '0' for the whole stream)"""
+        self.ensure_group(group, start)
+        stream_consumer = StreamConsumer(
+            self.redis, group, consumer, handler, self.batch_size, self.block_ms, self.claim_idle_ms
+        )
+        stream_consumer.task = asyncio.create_task(stream_consumer.run())
+        self.consumers.append(stream_consumer)
+        print(f'Consuming tick stream as {consumer} in group {group}')
+        return stream_consumer
+
+    async def deliver_locally(self, ticks: List[Dict]):
+        """Fan stream ticks out on this worker's event bus"""
+        for tick in ticks:
+            # Marked remote so the cluster bus does not relay them a second time
+            self.event_bus.publish(PRICE_TICK, {**tick, 'remote': True})
+
+    def prune_worker_groups(self, live_workers: List[str]) -> int:
+        """Drop fan-out groups of workers that are no longer alive"""
+        live = {f'{WORKER_GROUP_PREFIX}{worker}' for worker in live_workers}
+        pruned = 0
+        for group in self.redis.xinfo_groups(STREAM_KEY):
+            if group['name'].startswith(WORKER_GROUP_PREFIX) and group['name'] not in live:
+                self.redis.xgroup_destroy(STREAM_KEY, group['name'])
+                pruned += 1
+        return pruned
+
+    def get_stats(self) -> Dict:
+        """Stream length plus backlog per consumer group"""
+        try:
+            groups = self.redis.xinfo_groups(STREAM_KEY)
+        except ResponseError:
+            groups = []
+        return {
+            'mode': 'stream' if self.enabled else 'embedded',
+            'length': self.redis.xlen(STREAM_KEY),
+            'groups': [{
+                'name': group['name'],
+                'consumers': group['consumers'],
+                'pending': group['pending'],
+                'lag': group.get('lag'),
+                'lastDeliveredId': group['last-delivered-id']
+            } for group in groups],
+            'local': [{
+                'group': consumer.group,
+                'consumer': consumer.consumer,
+                'processed': consumer.processed,
+                'failures': consumer.failures
+            } for consumer in self.consumers]
+        }
+
+    def stop(self, drop_groups: List[str] = ()):
+        """Stop every local consumer, removing the given groups (e.g. this worker's fan-out group)"""
+        for consumer in self.consumers:
+            if consumer.task:
+                consumer.task.cancel()
+                consumer.task = None
+        self.consumers = []
+        for group in drop_groups:
+            try:
+                self.redis.xgroup_destroy(STREAM_KEY, group)
+            except Exception as e:
+                print(f'Error dropping consumer group {group}: {e}')
+
+# Singleton instance
+tick_stream = TickStream()
+
+def get_tick_stream() -> TickStream:
+    """Get tick stream instance"""
+    return tick_stream
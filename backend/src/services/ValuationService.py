@@ -0,0 +1,178 @@
+import json
+from datetime import datetime, date
+from typing import Dict, List
+from ..models.Holding import Holding
+from ..config.redis import get_redis
+from ..config.metrics import CACHE_REQUESTS
+from ..services.StockService import get_stock_service
+from ..config.tracing import traced
+
+# Apply a tick to every portfolio holding the symbol.
+# KEYS[1] = symbol:{SYM}:portfolios; ARGV = symbol, price, tick timestamp (epoch seconds).
+# Each line remembers the timestamp of the price it carries, so replayed or
+# out-of-order ticks are ignored and the update is idempotent.
+TICK_SCRIPT = """
+local updated = 0
+for _, id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local key = 'portfolio:' .. id .. ':valuation'
+    local line = redis.call('HMGET', key, 'q:' .. ARGV[1], 'p:' .. ARGV[1], 't:' .. ARGV[1])
+    if line[1] and (not line[3] or tonumber(line[3]) < tonumber(ARGV[3])) then
+        local delta = tonumber(line[1]) * (tonumber(ARGV[2]) - tonumber(line[2] or '0'))
+        redis.call('HINCRBYFLOAT', key, 'totalValue', delta)
+        redis.call('HSET', key, 'p:' .. ARGV[1], ARGV[2], 't:' .. ARGV[1], ARGV[3], 'updatedAt', ARGV[3])
+        updated = updated + 1
+    end
+end
+return updated
+"""
+
+def valuation_key(portfolio_id: int) -> str:
+    return f'portfolio:{portfolio_id}:valuation'
+
+def portfolios_key(symbol: str) -> str:
+    """Reverse index: portfolios holding a symbol"""
+    return f'symbol:{symbol}:portfolios'
+
+def encode_value(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+def tick_time(price_data: Dict) -> float:
+    try:
+        return datetime.fromisoformat(price_data['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return datetime.now().timestamp()
+
+class ValuationService:
+    """Materialized per-portfolio valuations in Redis, updated incrementally on ticks.
+
+    Each portfolio has one hash holding its totals, the holding rows, and per
+    symbol the aggregate quantity (q:), cost (c:), price (p:) and price time (t:).
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.stock_service = get_stock_service()
+        self.tick_script = self.redis.register_script(TICK_SCRIPT)
+        self.stock_service.on_tick(self.apply_tick)
+
+    def apply_tick(self, price_data: Dict) -> int:
+        """Move every portfolio holding the symbol to the tick's price"""
+        symbol = price_data['symbol']
+        return self.tick_script(keys=[portfolios_key(symbol)], args=[symbol, price_data['price'], tick_time(price_data)])
+
+    @traced()
+    async def rebuild(self, conn, portfolio_id: int) -> Dict:
+        """Recompute a portfolio's valuation from its holdings, e.g. after they change"""
+        holdings = Holding.find_by_portfolio_id(conn, portfolio_id)
+        lines: Dict[str, Dict] = {}
+        for holding in holdings:
+            line = lines.setdefault(holding['symbol'], {'quantity': 0.0, 'cost': 0.0})
+            line['quantity'] += holding['quantity']
+            line['cost'] += holding['quantity'] * holding['purchase_price']
+
+        for symbol, line in lines.items():
+            try:
+                quote = await self.stock_service.get_stock_price(symbol, conn)
+                line['price'] = quote['price']
+                line['time'] = tick_time(quote)
+            except Exception as e:
+                print(f'Error pricing {symbol} for portfolio {portfolio_id}: {e}')
+
+        key = valuation_key(portfolio_id)
+        fields = {
+            'holdings': json.dumps(holdings, default=encode_value),
+            'totalValue': sum(line['quantity'] * line['price'] for line in lines.values() if 'price' in line),
+            'totalCostBasis': sum(line['cost'] for line in lines.values()),
+            'updatedAt': datetime.now().timestamp()
+        }
+        for symbol, line in lines.items():
+            fields[f'q:{symbol}'] = line['quantity']
+            fields[f'c:{symbol}'] = line['cost']
+            if 'price' in line:
+                fields[f'p:{symbol}'] = line['price']
+                fields[f't:{symbol}'] = line['time']
+
+        previous = {field[2:] for field in self.redis.hkeys(key) if field.startswith('q:')}
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=fields)
+        for symbol in lines:
+            pipe.sadd(portfolios_key(symbol), portfolio_id)
+        for symbol in previous - set(lines):
+            pipe.srem(portfolios_key(symbol), portfolio_id)
+        pipe.execute()
+        return self.to_response(fields)
+
+    def drop(self, portfolio_id: int):
+        """Forget a deleted portfolio's valuation"""
+        key = valuation_key(portfolio_id)
+        symbols = [field[2:] for field in self.redis.hkeys(key) if field.startswith('q:')]
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        for symbol in symbols:
+            pipe.srem(portfolios_key(symbol), portfolio_id)
+        pipe.execute()
+
+    @traced()
+    async def get_valuation(self, conn, portfolio_id: int) -> Dict:
+        """Portfolio value and P&L from a single cache read, building it on first use"""
+        fields = self.redis.hgetall(valuation_key(portfolio_id))
+        if not fields:
+            CACHE_REQUESTS.labels('valuation', 'miss').inc()
+            return await self.rebuild(conn, portfolio_id)
+        CACHE_REQUESTS.labels('valuation', 'hit').inc()
+        return self.to_response(fields)
+
+    def to_response(self, fields: Dict) -> Dict:
+        """Shape a valuation hash like RiskService.calculate_portfolio_value"""
+        total_value = float(fields['totalValue'])
+        total_cost_basis = float(fields['totalCostBasis'])
+        holdings: List[Dict] = json.loads(fields['holdings'])
+
+        updated_holdings = []
+        for holding in holdings:
+            cost_basis = holding['quantity'] * holding['purchase_price']
+            price = fields.get(f'p:{holding["symbol"]}')
+            if price is None:
+                updated_holdings.append({
+                    **holding,
+                    'currentPrice': None,
+                    'currentValue': None,
+                    'costBasis': cost_basis,
+                    'pnl': None,
+                    'pnlPercent': None,
+                    'allocation': 0,
+                    'priceError': True,
+                    'errorMessage': 'Price unavailable'
+                })
+                continue
+
+            current_price = float(price)
+            current_value = holding['quantity'] * current_price
+            pnl = current_value - cost_basis
+            updated_holdings.append({
+                **holding,
+                'currentPrice': current_price,
+                'currentValue': current_value,
+                'costBasis': cost_basis,
+                'pnl': pnl,
+                'pnlPercent': (pnl / cost_basis) * 100 if cost_basis > 0 else 0,
+                'allocation': (current_value / total_value) * 100 if total_value > 0 else 0,
+                'priceError': False
+            })
+
+        total_pnl = total_value - total_cost_basis
+        return {
+            'totalValue': round(total_value, 2),
+            'totalCostBasis': round(total_cost_basis, 2),
+            'totalPnL': round(total_pnl, 2),
+            'totalPnLPercent': round((total_pnl / total_cost_basis) * 100, 2) if total_cost_basis > 0 else 0,
+            'holdings': updated_holdings
+        }
+
+# Singleton instance
+valuation_service = ValuationService()
+
+def get_valuation_service() -> ValuationService:
+    """Get valuation service instance"""
+    return valuation_service
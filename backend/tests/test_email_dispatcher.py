@@ -0,0 +1,116 @@
+"""EmailDispatcher delivery over SMTP against a local aiosmtpd server.
+
+Run from backend/:  pip install -r tests/requirements.txt && python -m pytest tests
+"""
+import asyncio
+import socket
+import pytest
+from aiosmtpd.controller import Controller
+from src.config.email import EmailService
+from src.services.EmailDispatcher import EmailDispatcher
+
+class RecordingHandler:
+    """Accepts messages after rejecting the first `reject` DATA commands; counts sessions"""
+
+    def __init__(self, reject: int = 0):
+        self.reject = reject
+        self.sessions = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject > 0:
+            self.reject -= 1
+            return '451 Try again later'
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        return '250 OK'
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    def start(reject: int = 0):
+        handler = RecordingHandler(reject)
+        controller = Controller(handler, hostname='127.0.0.1', port=free_port())
+        controller.start()
+        servers.append(controller)
+        return handler, controller.port
+    servers = []
+    yield start
+    for controller in servers:
+        controller.stop()
+
+@pytest.fixture
+def dispatcher_for(monkeypatch):
+    def build(port: int, max_retries: int = 3) -> EmailDispatcher:
+        monkeypatch.setenv('NODE_ENV', 'development')
+        monkeypatch.setenv('EMAIL_TRANSPORT', 'smtp')
+        monkeypatch.setenv('EMAIL_SERVICE', '127.0.0.1')
+        monkeypatch.setenv('EMAIL_PORT', str(port))
+        monkeypatch.setenv('EMAIL_USE_TLS', 'false')
+        monkeypatch.setenv('EMAIL_USER', '')
+        monkeypatch.setenv('EMAIL_WORKERS', '1')
+        monkeypatch.setenv('EMAIL_DIGEST_WINDOW', '0')
+        dispatcher = EmailDispatcher()
+        dispatcher.email_service = EmailService()
+        dispatcher.max_retries = max_retries
+        dispatcher.retry_backoff = 0.01
+        return dispatcher
+    return build
+
+async def send_all(dispatcher: EmailDispatcher, count: int):
+    dispatcher.start()
+    for i in range(count):
+        assert dispatcher.enqueue(f'user{i}@example.com', f'Alert {i}', f'<p>Alert {i}</p>')
+    await dispatcher.stop(timeout=10)
+
+def test_transport_selectable_outside_production(monkeypatch):
+    monkeypatch.setenv('NODE_ENV', 'development')
+    monkeypatch.delenv('EMAIL_TRANSPORT', raising=False)
+    assert EmailService().transport == 'console'
+    monkeypatch.setenv('EMAIL_TRANSPORT', 'smtp')
+    assert EmailService().transport == 'smtp'
+    monkeypatch.setenv('NODE_ENV', 'production')
+    monkeypatch.delenv('EMAIL_TRANSPORT')
+    assert EmailService().transport == 'smtp'
+
+def test_worker_reuses_one_smtp_session(smtp_server, dispatcher_for):
+    handler, port = smtp_server()
+    dispatcher = dispatcher_for(port)
+    asyncio.run(send_all(dispatcher, 5))
+
+    assert len(handler.messages) == 5
+    assert handler.sessions == 1
+    assert dispatcher.stats['sent'] == 5
+    assert dispatcher.stats['failed'] == 0
+    recipients, content = handler.messages[0]
+    assert recipients == ['user0@example.com']
+    assert 'Subject: Alert 0' in content
+
+def test_transient_rejection_is_retried_on_a_new_session(smtp_server, dispatcher_for):
+    handler, port = smtp_server(reject=2)
+    dispatcher = dispatcher_for(port)
+    asyncio.run(send_all(dispatcher, 1))
+
+    assert len(handler.messages) == 1
+    assert dispatcher.stats['retries'] == 2
+    assert dispatcher.stats['sent'] == 1
+    # The session is closed before each retry
+    assert handler.sessions == 3
+
+def test_gives_up_after_max_retries(smtp_server, dispatcher_for):
+    handler, port = smtp_server(reject=10)
+    dispatcher = dispatcher_for(port, max_retries=2)
+    asyncio.run(send_all(dispatcher, 1))
+
+    assert handler.messages == []
+    assert dispatcher.stats['retries'] == 2
+    assert dispatcher.stats['failed'] == 1
+    assert dispatcher.stats['sent'] == 0
@@ -18,7 +18,7 @@ import {
 } from '@mui/material';
 import DeleteIcon from '@mui/icons-material/Delete';
 import EditIcon from '@mui/icons-material/Edit';
-import { holdingService, portfolioService } from '../services/api';
+import { holdingService, portfolioService, liveService } from '../services/api';
 import { formatCurrency, formatPercent, getPnLColor } from '../utils/formatters';
 import PortfolioForm from './PortfolioForm';
 
@@ -30,10 +30,48 @@ const HoldingsTable = ({ portfolioId, onRefresh }) => {
 
   useEffect(() => {
     loadPortfolio();
-    const interval = setInterval(loadPortfolio, 30000);
-    return () => clearInterval(interval);
+    // Live valuation deltas keep prices current; the slow poll only resyncs everything else
+    const interval = setInterval(loadPortfolio, 300000);
+    const unsubscribe = liveService.subscribe({ portfolios: [portfolioId] }, (message) => {
+      if (message.type === 'valuation' && message.portfolioId === portfolioId) {
+        setPortfolio((current) => (current ? applyValuation(current, message) : current));
+      }
+    });
+    return () => {
+      clearInterval(interval);
+      unsubscribe();
+    };
   }, [portfolioId]);
 
+  const applyValuation = (current, message) => {
+    const holdings = current.holdings.map((holding) => {
+      if (holding.symbol !== message.symbol) return holding;
+      const currentValue = parseFloat(holding.quantity) * message.price;
+      const pnl = currentValue - holding.costBasis;
+      return {
+        ...holding,
+        currentPrice: message.price,
+        currentValue,
+        pnl,
+        pnlPercent: holding.costBasis > 0 ? (pnl / holding.costBasis) * 100 : 0,
+        priceError: false,
+      };
+    });
+    return {
+      ...current,
+      totalValue: message.totalValue,
+      totalCostBasis: message.totalCostBasis,
+      totalPnL: message.totalPnL,
+      totalPnLPercent: message.totalPnLPercent,
+      holdings: holdings.map((holding) => ({
+        ...holding,
+        allocation: holding.currentValue && message.totalValue > 0
+          ? (holding.currentValue / message.totalValue) * 100
+          : 0,
+      })),
+    };
+  };
+
   const loadPortfolio = async () => {
     try {
       const response = await portfolioService.getPortfolio(portfolioId);
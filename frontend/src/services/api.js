@@ -13,6 +13,10 @@ export const portfolioService = {
   createPortfolio: (name) => api.post('/portfolios', { name }),
   getPortfolio: (id) => api.get(`/portfolios/${id}`),
   getPortfolioAnalytics: (id) => api.get(`/portfolios/${id}/analytics`),
+  getPortfolioPerformance: (id, resolution = '1M') =>
+    api.get(`/portfolios/${id}/performance`, { params: { resolution } }),
+  getPortfolioCorrelation: (id, window = 90) =>
+    api.get(`/portfolios/${id}/correlation`, { params: { window } }),
   updatePortfolio: (id, name) => api.put(`/portfolios/${id}`, { name }),
   deletePortfolio: (id) => api.delete(`/portfolios/${id}`),
 };
@@ -30,11 +34,11 @@ export const holdingService = {
 // Stock endpoints
 export const stockService = {
   getStockPrice: (symbol) => api.get(`/stocks/${symbol}`),
-  getPriceHistory: (symbol, limit = 100) =>
-    api.get(`/stocks/${symbol}/history`, { params: { limit } }),
-  getPriceHistoryRange: (symbol, startDate, endDate) =>
+  getPriceHistory: (symbol, limit = 100, maxPoints) =>
+    api.get(`/stocks/${symbol}/history`, { params: { limit, maxPoints } }),
+  getPriceHistoryRange: (symbol, startDate, endDate, maxPoints = 1000) =>
     api.get(`/stocks/${symbol}/history/range`, {
-      params: { startDate, endDate },
+      params: { startDate, endDate, maxPoints },
     }),
 };
 
@@ -47,4 +51,41 @@ export const alertService = {
   deleteAlert: (id) => api.delete(`/alerts/${id}`),
 };
 
+// Live price ticks and valuation deltas: WebSocket, falling back to server-sent events.
+// Returns a function that closes the subscription.
+export const liveService = {
+  subscribe: ({ symbols = [], portfolios = [] }, onMessage) => {
+    let closed = false;
+    let source = null;
+
+    const openEventSource = () => {
+      const params = new URLSearchParams({ symbols: symbols.join(','), portfolios: portfolios.join(',') });
+      source = new EventSource(`${API_URL}/live/sse?${params}`);
+      source.onmessage = (event) => onMessage(JSON.parse(event.data));
+    };
+
+    if (typeof WebSocket === 'undefined') {
+      openEventSource();
+      return () => source.close();
+    }
+
+    let opened = false;
+    const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/live/ws`);
+    socket.onopen = () => {
+      opened = true;
+      socket.send(JSON.stringify({ action: 'subscribe', symbols, portfolios }));
+    };
+    socket.onmessage = (event) => onMessage(JSON.parse(event.data));
+    socket.onerror = () => {
+      if (!opened && !closed) openEventSource();
+    };
+
+    return () => {
+      closed = true;
+      socket.close();
+      if (source) source.close();
+    };
+  },
+};
+
 export default api;